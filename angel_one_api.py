@@ -1,21 +1,21 @@
-from SmartApi import SmartConnect
-import pyotp
-import pandas as pd
-from datetime import datetime
-import time
+from datetime import datetime, timedelta
 import logging
-import requests
 import os
 import threading
 
-logging.basicConfig(level=logging.INFO, 
-                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+from session import SessionManager, is_auth_error
+
+# SmartApi, pyotp and requests (via price_sources) are imported where they are used so that importing this
+# module stays cheap and never logs in (check with: python -X importtime -c "import angel_one_api")
 logger = logging.getLogger("AngelOneAPI")
 
 API_KEY = os.getenv("ANGEL_API_KEY")
 
 LIVE_TRADING = False
 
+# Ticks older than this are treated as stale and the REST API is used instead
+FEED_MAX_AGE = 5
+
 class AngelOneAPI:
     def __init__(self):
         # Please add your Angel One API credentials below
@@ -32,25 +32,55 @@ class AngelOneAPI:
         self.auth_token = None
         self.refresh_token = None
         self.feed_token = None
+
+        # Login/refresh lifecycle shared by every thread (see connect)
+        self.session = SessionManager(self._login, self._refresh_session)
         
-        # Default token for Reliance Industries
-        self.reliance_token = {
-            "exchange": "NSE",
-            "token": "2885",  # Reliance NSE token
-            "symbol": "RELIANCE-EQ"
-        }
+        # Watchable instruments and their latest quotes (see get_quotes); symbols outside the
+        # default basket are resolved through the on-disk instrument master
+        from symbols import SymbolRegistry, QuoteCache
+        from instruments import get_instrument_master
+        self.symbols = SymbolRegistry(master=get_instrument_master)
+        self.price_cache = QuoteCache()
+
+        # Reliance Industries, the instrument the bot trades
+        self.reliance_token = self.symbols.get("RELIANCE-EQ")
         
         # Connection status
         self.is_connected = False
         
-        # Last price cache
-        self.last_price = None
-        self.last_price_time = None
+        # Streaming market data (see start_market_feed)
+        self.market_feed = None
+
+        # Event-driven trading engine and its order manager (see start_automated_trading)
+        self.trading_engine = None
+        self.order_manager = None
+
+        # Public quote sources raced when ltpData fails (see get_reliance_price_fallback)
+        self.price_racer = None
+
+        # On-disk candle history (see get_candles)
+        self.candle_store = None
+
+        # Append-only record of every order sent through place_order
+        self.journal = None
         
     def connect(self):
-        """Connect to Angel One API"""
+        """
+        Make sure there is a usable Angel One session: log in, or refresh the JWT if it is about
+        to expire. Concurrent callers share one in-flight login (see session.SessionManager).
+        """
+        return self.session.ensure()
+
+    def _login(self):
+        """Full TOTP login; returns the session data (jwtToken, refreshToken, ...) or None"""
         try:
-            self.smart_api = SmartConnect(self.api_key)
+            from SmartApi import SmartConnect
+            import pyotp
+
+            # Reuse the client (and its HTTP connection pool) across logins
+            if self.smart_api is None:
+                self.smart_api = SmartConnect(self.api_key)
             
             # Generate TOTP
             totp = pyotp.TOTP(self.totp_secret).now()
@@ -62,7 +92,7 @@ class AngelOneAPI:
             if data.get('status') == False:
                 logger.error(f"Login Failed: {data['message']}")
                 self.is_connected = False
-                return False
+                return None
             
             # If login is successful
             logger.info("Login Successful!")
@@ -75,117 +105,242 @@ class AngelOneAPI:
             self.feed_token = self.smart_api.getfeedToken()
             
             self.is_connected = True
-            return True
+            return data['data']
             
         except Exception as e:
             logger.error(f"Error connecting to Angel One API: {str(e)}")
             self.is_connected = False
-            return False
+            return None
+
+    def _refresh_session(self, refresh_token):
+        """Renew the JWT with the refresh token (no TOTP login); returns the session data or None"""
+        try:
+            data = self.smart_api.generateToken(refresh_token)
+            if not (data and data.get('status') and data.get('data')):
+                logger.warning(f"Token refresh failed: {data}")
+                return None
+            self.auth_token = data['data']['jwtToken']
+            self.refresh_token = data['data'].get('refreshToken') or refresh_token
+            self.feed_token = data['data'].get('feedToken') or self.feed_token
+            self.is_connected = True
+            logger.info("Session token refreshed.")
+            return data['data']
+        except Exception as e:
+            logger.error(f"Error refreshing session token: {str(e)}")
+            return None
+
+    def request(self, method, *args):
+        """
+        Call a SmartConnect method. If the response says the token is invalid or expired, the
+        session is renewed once (shared with any other thread that hit the same error) and the
+        call is retried.
+        """
+        generation = self.session.generation
+        response = getattr(self.smart_api, method)(*args)
+        if is_auth_error(response) and self.session.reconnect(generation):
+            response = getattr(self.smart_api, method)(*args)
+        return response
             
+    def start_market_feed(self, url=None):
+        """
+        Subscribe to Reliance ticks over the SmartAPI WebSocket.
+        Once running, get_reliance_ltp and get_quote read the latest tick instead of calling ltpData.
+        Pass url (e.g. a market_feed.ReplayServer url) to stream from somewhere other than Angel One.
+        """
+        from market_feed import MarketFeed, FEED_URL
+
+        if self.market_feed:
+            return self.market_feed
+        if url is None and not self.connect():
+            logger.error("Unable to connect to Angel One API for market feed")
+            return None
+
+        # Tokens are read again on every reconnect: the session may have been renewed since
+        credentials = None if url else self._feed_credentials
+        self.market_feed = MarketFeed(self.api_key, self.username, self.feed_token,
+                                      self.auth_token, url=url or FEED_URL, credentials=credentials)
+        self.market_feed.subscribe(self.reliance_token["exchange"], self.reliance_token["token"])
+        self.market_feed.start()
+        return self.market_feed
+
+    def _feed_credentials(self):
+        """Current (feed_token, auth_token), renewing the session first if it is about to expire"""
+        self.connect()
+        return self.feed_token, self.auth_token
+
+    def stop_market_feed(self):
+        """Stop streaming and go back to polling ltpData"""
+        if self.market_feed:
+            self.market_feed.stop()
+            self.market_feed = None
+
     def get_reliance_ltp(self):
-        """Get Last Traded Price for Reliance Industries"""
+        """
+        Get Last Traded Price for Reliance Industries.
+        Served from price_cache for symbols.QUOTE_TTL seconds; when it expires, concurrent callers share
+        a single ltpData request (or fallback race) instead of each sending their own.
+        """
+        try:
+            # Latest streamed tick, if the market feed is running
+            if self.market_feed:
+                price = self.market_feed.get_ltp(self.reliance_token["token"], max_age=FEED_MAX_AGE)
+                if price is not None:
+                    return price
+
+            quote = self.price_cache.get_or_fetch(self.reliance_token["exchange"], self.reliance_token["token"],
+                                                  self._fetch_reliance_quote)
+            return quote['ltp'] if quote else None
+
+        except Exception as e:
+            logger.error(f"Error fetching Reliance LTP: {str(e)}")
+            return None
+
+    def _fetch_reliance_quote(self):
+        """One upstream Reliance LTP lookup (ltpData, then the fallback sources) as a quote dict"""
+        exchange = self.reliance_token["exchange"]
+        token = self.reliance_token["token"]
+        symbol = self.reliance_token["symbol"]
         try:
             # Check if we're connected
-            if not self.is_connected:
-                self.connect()
-                if not self.is_connected:
-                    logger.error("Unable to connect to Angel One API")
-                    return None
-                
-            # Check if we have a recent price (within 5 seconds)
-            current_time = time.time()
-            if self.last_price and self.last_price_time and (current_time - self.last_price_time < 5):
-                return self.last_price
-                
-            # Correct format for ltpData - it needs to be called properly
-            exchange = self.reliance_token["exchange"]
-            token = self.reliance_token["token"]
-            symbol = self.reliance_token["symbol"]
-            
+            if not self.connect():
+                logger.error("Unable to connect to Angel One API")
+                return None
+
             # Fix: Call ltpData correctly with the exchange and the symbol arguments separately
-            ltp_data = self.smart_api.ltpData(exchange, symbol, token)
+            ltp_data = self.request("ltpData", exchange, symbol, token)
             
             if ltp_data and ltp_data.get('status') and ltp_data.get('data'):
                 price = ltp_data['data'].get('ltp')
                 if price:
-                    # Cache the price
-                    self.last_price = price
-                    self.last_price_time = current_time
-                    return price
+                    return {"exchange": exchange, "tradingSymbol": symbol, "symbolToken": token, "ltp": price}
             
             logger.error(f"Error getting LTP data: {ltp_data}")
-            return self.get_reliance_price_fallback()
-            
+
         except Exception as e:
             logger.error(f"Error fetching Reliance LTP: {str(e)}")
-            return self.get_reliance_price_fallback()
+
+        price = self.get_reliance_price_fallback()
+        if price:
+            return {"exchange": exchange, "tradingSymbol": symbol, "symbolToken": token, "ltp": price,
+                    "source": "fallback"}
+        return None
             
     def get_reliance_price_fallback(self):
-        """Alternative method to get Reliance price if API fails"""
-        try:
-            # Try MoneyControl API
-            url_mc = "https://priceapi.moneycontrol.com/pricefeed/nse/equitycash/RIL"
-            response = requests.get(url_mc, timeout=5)
-            if response.status_code == 200:
-                data = response.json()
-                if data and data.get('data') and data['data'].get('pricecurrent'):
-                    price = float(data['data']['pricecurrent'])
-                    self.last_price = price
-                    self.last_price_time = time.time()
-                    return price
-        except Exception as e:
-            logger.warning(f"MoneyControl fallback failed: {str(e)}")
+        """Alternative method to get Reliance price if API fails: race MoneyControl and Yahoo Finance"""
+        if self.price_racer is None:
+            from price_sources import PriceRacer
+            self.price_racer = PriceRacer()
 
-        try:
-            # Try Yahoo Finance API
-            url_yahoo = "https://query1.finance.yahoo.com/v7/finance/quote?symbols=RELIANCE.NS"
-            response = requests.get(url_yahoo, timeout=5)
-            if response.status_code == 200:
-                data = response.json()
-                quote = data.get("quoteResponse", {}).get("result", [])
-                if quote and quote[0].get("regularMarketPrice"):
-                    price = float(quote[0]["regularMarketPrice"])
-                    self.last_price = price
-                    self.last_price_time = time.time()
-                    return price
-        except Exception as e:
-            logger.warning(f"Yahoo Finance fallback failed: {str(e)}")
+        price, source = self.price_racer.get_price()
+        if price:
+            logger.info(f"Fallback price {price} from {source}")
+            return price
 
         logger.error("All fallback methods failed. Price unavailable.")
         return None
             
-    def get_quote(self, exchange="NSE", symbol="RELIANCE-EQ", token="2885"):
-        """Get full quote for a symbol"""
+    def get_quote(self, exchange="NSE", symbol="RELIANCE-EQ", token=None):
+        """Get full quote for a symbol (token is looked up from the symbol if not given)"""
         try:
+            if token is None:
+                token = self.symbols.get(symbol, exchange)["token"]
+
+            # Serve from the market feed when it has a fresh tick for this token
+            if self.market_feed:
+                price = self.market_feed.get_ltp(token, max_age=FEED_MAX_AGE)
+                if price is not None:
+                    return {
+                        "status": True,
+                        "message": "SUCCESS",
+                        "data": {"exchange": exchange, "tradingsymbol": symbol,
+                                 "symboltoken": token, "ltp": price}
+                    }
+
             # Check if we're connected
-            if not self.is_connected:
-                self.connect()
-                if not self.is_connected:
-                    logger.error("Unable to connect to Angel One API")
-                    return None
+            if not self.connect():
+                logger.error("Unable to connect to Angel One API")
+                return None
                     
             # Fix: Call ltpData with correct parameter format
-            quote_data = self.smart_api.ltpData(exchange, symbol, token)
+            quote_data = self.request("ltpData", exchange, symbol, token)
             return quote_data
             
         except Exception as e:
             logger.error(f"Error fetching quote: {str(e)}")
             return None
             
-    def get_historical_data(self, exchange="NSE", symbol="RELIANCE-EQ", token="2885", 
+    def watch(self, symbols):
+        """Stream ticks for several symbols over the single market feed connection"""
+        feed = self.market_feed or self.start_market_feed()
+        if not feed:
+            return None
+        for instrument in self.symbols.resolve(symbols):
+            feed.subscribe(instrument["exchange"], instrument["token"])
+        return feed
+
+    def get_quotes(self, symbols, mode="LTP", max_age=FEED_MAX_AGE):
+        """
+        Quotes for many symbols at once, as {symbol: quote}. Fresh streamed ticks and cached
+        quotes are used first; the remaining instruments are fetched with one getMarketData
+        request per 50 tokens. mode is "LTP", "OHLC" or "FULL" (OHLC/FULL always refetch).
+        """
+        from symbols import batch_tokens
+
+        instruments = self.symbols.resolve(symbols)
+        if mode == "LTP" and self.market_feed:
+            for instrument in instruments:
+                price = self.market_feed.get_ltp(instrument["token"], max_age=max_age)
+                if price is not None:
+                    self.price_cache.set(instrument["exchange"], instrument["token"], {
+                        "exchange": instrument["exchange"], "tradingSymbol": instrument["symbol"],
+                        "symbolToken": instrument["token"], "ltp": price
+                    })
+
+        to_fetch = self.price_cache.stale(instruments, max_age) if mode == "LTP" else instruments
+        if to_fetch:
+            if not self.connect():
+                logger.error("Unable to connect to Angel One API")
+                to_fetch = []
+            for payload in batch_tokens(to_fetch):
+                try:
+                    response = self.request("getMarketData", mode, payload)
+                except Exception as e:
+                    logger.error(f"Error fetching market data: {str(e)}")
+                    continue
+                if not (response and response.get('status') and response.get('data')):
+                    logger.error(f"Error getting market data: {response}")
+                    continue
+                for record in response['data'].get('fetched', []):
+                    self.price_cache.set(record['exchange'], record['symbolToken'], record)
+                if response['data'].get('unfetched'):
+                    logger.warning(f"Quotes not returned for: {response['data']['unfetched']}")
+
+        quotes = {}
+        for instrument in instruments:
+            quote = self.price_cache.get(instrument["exchange"], instrument["token"])
+            if quote is not None:
+                quotes[instrument["symbol"]] = quote
+        return quotes
+
+    def get_ltps(self, symbols, max_age=FEED_MAX_AGE):
+        """Last traded price per symbol, e.g. {"RELIANCE-EQ": 1301.5, "TCS-EQ": 3450.0}"""
+        return {symbol: quote.get('ltp') for symbol, quote in self.get_quotes(symbols, "LTP", max_age).items()}
+
+    def get_historical_data(self, exchange="NSE", symbol="RELIANCE-EQ", token=None,
                            interval="ONE_DAY", from_date=None, to_date=None):
-        """Get historical data for a symbol"""
+        """Get historical data for a symbol (token is looked up from the symbol if not given)"""
         try:
+            if token is None:
+                token = self.symbols.get(symbol, exchange)["token"]
+
             # Check if we're connected
-            if not self.is_connected:
-                self.connect()
-                if not self.is_connected:
-                    logger.error("Unable to connect to Angel One API")
-                    return None
+            if not self.connect():
+                logger.error("Unable to connect to Angel One API")
+                return None
                     
             # Set default dates if not provided
             if not from_date:
-                from_date = (datetime.now().date() - pd.Timedelta(days=30)).strftime("%Y-%m-%d")
+                from_date = (datetime.now().date() - timedelta(days=30)).strftime("%Y-%m-%d")
             if not to_date:
                 to_date = datetime.now().date().strftime("%Y-%m-%d")
                 
@@ -198,18 +353,42 @@ class AngelOneAPI:
                 "todate": to_date
             }
             
-            historical_data = self.smart_api.getCandleData(historical_params)
+            historical_data = self.request("getCandleData", historical_params)
             return historical_data
             
         except Exception as e:
             logger.error(f"Error fetching historical data: {str(e)}")
             return None
+
+    def get_candles(self, symbol="RELIANCE-EQ", interval="FIVE_MINUTE", from_date=None, to_date=None,
+                    exchange="NSE"):
+        """
+        Candles from the local candle store (see candle_store.py); only days not stored yet are
+        requested from getCandleData. Returns a NumPy record array (timestamp in epoch seconds).
+        """
+        from candle_store import CandleStore
+
+        if self.candle_store is None:
+            self.candle_store = CandleStore(api=self)
+        if not to_date:
+            to_date = datetime.now().date().strftime("%Y-%m-%d")
+        if not from_date:
+            from_date = (datetime.strptime(to_date[:10], "%Y-%m-%d").date() - timedelta(days=30)).strftime("%Y-%m-%d")
+        return self.candle_store.load(symbol, interval, from_date, to_date, exchange)
             
     def disconnect(self):
         """Terminate the API session"""
         try:
+            if self.trading_engine:
+                self.trading_engine.stop()
+                self.trading_engine = None
+            if self.order_manager:
+                self.order_manager.stop()
+                self.order_manager = None
+            self.stop_market_feed()
             if self.smart_api:
                 self.smart_api.terminateSession(self.username)
+                self.session.invalidate()
                 self.is_connected = False
                 logger.info("Disconnected from Angel One API")
                 
@@ -219,125 +398,120 @@ class AngelOneAPI:
     def place_order(self, variety, tradingsymbol, symboltoken, transactiontype, exchange, ordertype, producttype, duration, price=0, squareoff=0, stoploss=0, quantity=1):
         """
         Place an order if LIVE_TRADING is True. Otherwise, log and skip.
+        Every order, placed or not, is recorded in the trade journal.
         """
+        order_params = {
+            "variety": variety,
+            "tradingsymbol": tradingsymbol,
+            "symboltoken": symboltoken,
+            "transactiontype": transactiontype,
+            "exchange": exchange,
+            "ordertype": ordertype,
+            "producttype": producttype,
+            "duration": duration,
+            "price": price,
+            "squareoff": squareoff,
+            "stoploss": stoploss,
+            "quantity": quantity
+        }
         if not LIVE_TRADING:
             logger.info(f"Order NOT placed (LIVE_TRADING=False): {transactiontype} {quantity} {tradingsymbol} at {price}")
-            return {"status": False, "message": "LIVE_TRADING is disabled. Order not placed."}
+            response = {"status": False, "message": "LIVE_TRADING is disabled. Order not placed."}
+            self._journal_order(order_params, response, live=False)
+            return response
         try:
-            if not self.is_connected:
-                self.connect()
-                if not self.is_connected:
-                    logger.error("Unable to connect to Angel One API for placing order")
-                    return {"status": False, "message": "Connection failed"}
-            order_params = {
-                "variety": variety,
-                "tradingsymbol": tradingsymbol,
-                "symboltoken": symboltoken,
-                "transactiontype": transactiontype,
-                "exchange": exchange,
-                "ordertype": ordertype,
-                "producttype": producttype,
-                "duration": duration,
-                "price": price,
-                "squareoff": squareoff,
-                "stoploss": stoploss,
-                "quantity": quantity
-            }
-            response = self.smart_api.placeOrder(order_params)
+            if not self.connect():
+                logger.error("Unable to connect to Angel One API for placing order")
+                response = {"status": False, "message": "Connection failed"}
+                self._journal_order(order_params, response, live=True)
+                return response
+            # Not retried on an auth error (see request): renew the session and let the caller decide
+            generation = self.session.generation
+            # placeOrder returns only the order id; the full reply carries status and error codes
+            response = self.smart_api.placeOrderFullResponse(order_params)
+            if is_auth_error(response):
+                self.session.reconnect(generation)
             logger.info(f"Order placed: {response}")
-            return response
         except Exception as e:
             logger.error(f"Error placing order: {str(e)}")
-            return {"status": False, "message": str(e)}
+            response = {"status": False, "message": str(e)}
+        self._journal_order(order_params, response, live=True)
+        return response
+
+    def _journal_order(self, order_params, response, live):
+        try:
+            if self.journal is None:
+                from journal import get_journal
+                self.journal = get_journal()
+            self.journal.record_order(order_params, response, live)
+        except Exception as e:
+            logger.error(f"Error journaling order: {str(e)}")
 
     def start_automated_trading(self, price_threshold=2500, check_interval=60, max_trades_per_day=5, stop_loss_pct=0.02):
         """
-        Start an automated trading loop that buys if price < price_threshold.
-        Adds basic risk management and exit conditions.
+        Start event-driven automated trading: buy if price < price_threshold, with a percent
+        stop-loss and a daily trade cap. Rules are evaluated on every tick from the market feed;
+        check_interval is only used if streaming is unavailable and prices have to be polled.
+        Orders go through an OrderManager, so the engine never waits on the broker and tracks
+        positions at their actual fill prices.
         """
         if not LIVE_TRADING:
             logger.info("Automated trading not started because LIVE_TRADING is False.")
-            return
+            return None
 
-        trades_today = 0
-        last_buy_price = None
-        last_trade_date = datetime.now().date()
+        from clock import WallClock
+        from orders import AngelBroker, OrderManager
+        from trading_engine import TradingEngine, default_rules, run_polling
 
-        def trading_loop():
-            nonlocal trades_today, last_buy_price, last_trade_date
-            logger.info("Automated trading started.")
-            while LIVE_TRADING:
-                try:
-                    # Reset trades if the date has changed
-                    current_date = datetime.now().date()
-                    if current_date != last_trade_date:
-                        trades_today = 0
-                        last_buy_price = None
-                        last_trade_date = current_date
-
-                    if trades_today >= max_trades_per_day:
-                        logger.info("Max trades per day reached. Pausing automated trading until tomorrow.")
-                        time.sleep(60 * 60)  # Sleep for 1 hour before checking again
-                        continue
-
-                    price = self.get_reliance_ltp()
-                    if price is not None:
-                        logger.info(f"Checked Reliance price: {price}")
-
-                        # Risk management: Stop-loss check
-                        if last_buy_price and price < last_buy_price * (1 - stop_loss_pct):
-                            logger.info(f"Stop-loss triggered! Price {price} < {last_buy_price * (1 - stop_loss_pct)}. Placing SELL order.")
-                            self.place_order(
-                                variety="NORMAL",
-                                tradingsymbol=self.reliance_token["symbol"],
-                                symboltoken=self.reliance_token["token"],
-                                transactiontype="SELL",
-                                exchange=self.reliance_token["exchange"],
-                                ordertype="MARKET",
-                                producttype="INTRADAY",
-                                duration="DAY",
-                                quantity=1
-                            )
-                            last_buy_price = None
-                            trades_today += 1
-                            time.sleep(check_interval)
-                            continue
-
-                        # Entry condition
-                        if price < price_threshold:
-                            logger.info(f"Price below threshold ({price} < {price_threshold}), placing BUY order.")
-                            order_resp = self.place_order(
-                                variety="NORMAL",
-                                tradingsymbol=self.reliance_token["symbol"],
-                                symboltoken=self.reliance_token["token"],
-                                transactiontype="BUY",
-                                exchange=self.reliance_token["exchange"],
-                                ordertype="MARKET",
-                                producttype="INTRADAY",
-                                duration="DAY",
-                                quantity=1
-                            )
-                            if order_resp.get("status"):
-                                last_buy_price = price
-                                trades_today += 1
-                        else:
-                            logger.info(f"Price above threshold ({price} >= {price_threshold}), no action.")
-                    else:
-                        logger.warning("Could not fetch Reliance price.")
-                except Exception as e:
-                    logger.error(f"Automated trading loop error: {str(e)}")
-                time.sleep(check_interval)
-        thread = threading.Thread(target=trading_loop, daemon=True)
+        clock = WallClock()
+        self.order_manager = OrderManager(AngelBroker(self), clock=clock).start()
+        engine = TradingEngine(self, default_rules(price_threshold, max_trades_per_day, stop_loss_pct),
+                               orders=self.order_manager, clock=clock)
+        engine.start()
+        self.trading_engine = engine
+
+        feed = self.start_market_feed()
+        if feed:
+            feed.add_listener(engine.on_tick)
+            logger.info("Automated trading started on the market feed.")
+            return engine
+
+        logger.warning(f"Market feed unavailable, polling prices every {check_interval}s.")
+
+        def polling_loop():
+            run_polling(self.get_reliance_ltp, engine.submit_price, clock, check_interval,
+                        lambda: LIVE_TRADING and engine.is_running)
+
+        thread = threading.Thread(target=polling_loop, daemon=True)
         thread.start()
+        return engine
+
+_angel_api = None
+_angel_api_lock = threading.Lock()
+
+
+def get_angel_api():
+    """Shared AngelOneAPI client, created on first use (raises ValueError if credentials are missing)"""
+    global _angel_api
+    if _angel_api is None:
+        with _angel_api_lock:
+            if _angel_api is None:
+                _angel_api = AngelOneAPI()
+    return _angel_api
+
+
+def __getattr__(name):
+    # Keeps `from angel_one_api import angel_api` working without creating the client at import time
+    if name == "angel_api":
+        return get_angel_api()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-# Create a singleton instance
-angel_api = AngelOneAPI()
 
 # Function to get current Reliance price
 def get_reliance_price():
     """Get current price of Reliance Industries stock"""
     try:
-        price = angel_api.get_reliance_ltp()
+        price = get_angel_api().get_reliance_ltp()
         if price:
             return price
         else:
@@ -346,7 +520,25 @@ def get_reliance_price():
         logger.error(f"Error in get_reliance_price: {str(e)}")
         return None
 
-# Start automated trading if LIVE_TRADING is True
-if LIVE_TRADING:
+
+def main():
+    """Entry point for running the trading bot on its own: python angel_one_api.py"""
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    if not LIVE_TRADING:
+        logger.info("LIVE_TRADING is False; set it to True in angel_one_api.py to start automated trading.")
+        return
+
+    api = get_angel_api()
     # You can adjust the threshold, interval, max trades, and stop-loss as needed
-    angel_api.start_automated_trading(price_threshold=2500, check_interval=60, max_trades_per_day=5, stop_loss_pct=0.02)
\ No newline at end of file
+    api.start_automated_trading(price_threshold=2500, check_interval=60, max_trades_per_day=5, stop_loss_pct=0.02)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        logger.info("Stopping automated trading.")
+    finally:
+        api.disconnect()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+import argparse
+import json
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, timedelta
+
+import numpy as np
+
+from candle_store import SESSION_CLOSE, SESSION_OPEN, CandleStore, _to_date, parse_candles, weekdays
+
+logger = logging.getLogger("Backfill")
+
+# Most days getCandleData returns per request, by interval
+INTERVAL_MAX_DAYS = {
+    "ONE_MINUTE": 30,
+    "THREE_MINUTE": 60,
+    "FIVE_MINUTE": 100,
+    "TEN_MINUTE": 100,
+    "FIFTEEN_MINUTE": 200,
+    "THIRTY_MINUTE": 200,
+    "ONE_HOUR": 400,
+    "ONE_DAY": 2000,
+}
+
+# Historical API request limit (per second)
+HISTORICAL_RATE = 3
+
+
+def chunk_range(start, end, interval):
+    """Split [start, end] into consecutive (first, last) day ranges the API accepts in one request"""
+    span = timedelta(days=INTERVAL_MAX_DAYS[interval] - 1)
+    first, end = _to_date(start), _to_date(end)
+    chunks = []
+    while first <= end:
+        last = min(first + span, end)
+        chunks.append((first, last))
+        first = last + timedelta(days=1)
+    return chunks
+
+
+class TokenBucket:
+    """Allows `rate` acquisitions per second on average, with bursts of up to `capacity`"""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class Backfill:
+    """
+    Fetches [start, end] of candles in interval-sized chunks on a thread pool, at most `rate`
+    requests per second, retrying failed chunks with exponential backoff. Completed chunks are
+    written to the candle store and recorded in a JSON checkpoint, so a rerun only fetches what
+    is left.
+    """
+
+    def __init__(self, api, start, end, symbol="RELIANCE-EQ", interval="ONE_MINUTE", exchange="NSE",
+                 store=None, checkpoint_path=None, rate=HISTORICAL_RATE, workers=3, retries=5, backoff=1.0):
+        self.api = api
+        self.symbol = symbol
+        self.interval = interval
+        self.exchange = exchange
+        self.store = store or CandleStore()
+        self.checkpoint_path = checkpoint_path or os.path.join(
+            self.store.root, f"{exchange}_{symbol}", f"{interval}.backfill.json")
+        self.chunks = chunk_range(start, end, interval)
+        # No bursts: the API counts requests over a sliding second
+        self.bucket = TokenBucket(rate, capacity=1)
+        self.workers = workers
+        self.retries = retries
+        self.backoff = backoff
+
+        self.requests = 0
+        self.done = self._load_checkpoint()
+        self._lock = threading.Lock()
+
+    def _load_checkpoint(self):
+        try:
+            with open(self.checkpoint_path) as f:
+                return {tuple(chunk) for chunk in json.load(f)["done"]}
+        except (OSError, ValueError, KeyError):
+            return set()
+
+    def _save_checkpoint(self):
+        os.makedirs(os.path.dirname(self.checkpoint_path) or ".", exist_ok=True)
+        temp_path = self.checkpoint_path + ".tmp"
+        with open(temp_path, "w") as f:
+            json.dump({"symbol": self.symbol, "interval": self.interval, "exchange": self.exchange,
+                       "done": sorted(self.done)}, f)
+        os.replace(temp_path, self.checkpoint_path)
+
+    @staticmethod
+    def _key(chunk):
+        return chunk[0].isoformat(), chunk[1].isoformat()
+
+    def pending(self):
+        """Chunks not in the checkpoint and not already complete in the candle store"""
+        missing = set(self.store.missing_days(self.symbol, self.interval, self.chunks[0][0],
+                                              self.chunks[-1][1], self.exchange)) if self.chunks else set()
+        return [chunk for chunk in self.chunks if self._key(chunk) not in self.done
+                and any(day in missing for day in weekdays(*chunk))]
+
+    def _fetch(self, chunk):
+        """Fetch and store one chunk; returns the candle count, raises after the last retry"""
+        first, last = chunk
+        for attempt in range(self.retries + 1):
+            self.bucket.acquire()
+            with self._lock:
+                self.requests += 1
+            response = self.api.get_historical_data(self.exchange, self.symbol, None, self.interval,
+                                                    f"{first.isoformat()} {SESSION_OPEN}",
+                                                    f"{last.isoformat()} {SESSION_CLOSE}")
+            if response and response.get("status"):
+                candles = parse_candles(response.get("data") or [])
+                self.store.write(self.symbol, self.interval, candles, self.exchange, first, last)
+                with self._lock:
+                    self.done.add(self._key(chunk))
+                    self._save_checkpoint()
+                return len(candles)
+            message = response.get("message") if response else "no response"
+            if attempt < self.retries:
+                delay = self.backoff * 2 ** attempt * (1 + random.random())
+                logger.warning(f"Chunk {first} - {last} failed ({message}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+        raise RuntimeError(f"Chunk {first} - {last} failed after {self.retries + 1} attempts: {message}")
+
+    def run(self):
+        """Fetch every pending chunk; returns a summary dict"""
+        start = time.perf_counter()
+        pending = self.pending()
+        candles, failed = 0, []
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="Backfill") as pool:
+            futures = {pool.submit(self._fetch, chunk): chunk for chunk in pending}
+            for future in as_completed(futures):
+                try:
+                    candles += future.result()
+                except Exception as e:
+                    logger.error(str(e))
+                    failed.append(self._key(futures[future]))
+        return {
+            "chunks": len(self.chunks),
+            "skipped": len(self.chunks) - len(pending),
+            "fetched": len(pending) - len(failed),
+            "failed": failed,
+            "candles": candles,
+            "requests": self.requests,
+            "elapsed_s": round(time.perf_counter() - start, 2),
+        }
+
+
+def _mock_candle_server(rate=HISTORICAL_RATE, error_rate=0.0):
+    """
+    Local stand-in for the getCandleData endpoint (POST JSON body as sent by SmartAPI):
+    synthetic one-minute bars for weekdays, the per-interval day limit, a per-second request
+    limit and optional random failures.
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    minutes = {"ONE_MINUTE": 1, "THREE_MINUTE": 3, "FIVE_MINUTE": 5, "TEN_MINUTE": 10,
+               "FIFTEEN_MINUTE": 15, "THIRTY_MINUTE": 30, "ONE_HOUR": 60, "ONE_DAY": 375}
+    window = []
+    lock = threading.Lock()
+
+    def day_rows(day, step):
+        rng = np.random.default_rng(day.toordinal())
+        closes = 1250 + np.cumsum(rng.normal(0, 0.5, 375 // step))
+        rows = []
+        for index, close in enumerate(closes):
+            minute = 9 * 60 + 15 + index * step
+            stamp = f"{day.isoformat()}T{minute // 60:02d}:{minute % 60:02d}:00+05:30"
+            rows.append([stamp, round(close - 0.3, 2), round(close + 1, 2), round(close - 1, 2),
+                         round(close, 2), int(rng.integers(1000, 50000))])
+        return rows
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def _reply(self, payload, status=200):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            params = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            now = time.monotonic()
+            with lock:
+                while window and now - window[0] > 1:
+                    window.pop(0)
+                throttled = len(window) >= rate
+                if not throttled:
+                    window.append(now)
+            if throttled:
+                return self._reply({"status": False, "message": "Access denied because of exceeding access rate"}, 403)
+            if random.random() < error_rate:
+                return self._reply({"status": False, "message": "Internal server error"}, 500)
+            first, last = date.fromisoformat(params["fromdate"][:10]), date.fromisoformat(params["todate"][:10])
+            if (last - first).days >= INTERVAL_MAX_DAYS[params["interval"]]:
+                return self._reply({"status": False, "message": "Date range too large for interval"}, 400)
+            rows, day = [], first
+            while day <= last:
+                if day.weekday() < 5:
+                    rows.extend(day_rows(day, minutes[params["interval"]]))
+                day += timedelta(days=1)
+            self._reply({"status": True, "message": "SUCCESS", "errorcode": "", "data": rows})
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/"
+
+
+class _MockCandleClient:
+    """get_historical_data() against _mock_candle_server, same signature as AngelOneAPI"""
+
+    def __init__(self, url):
+        import requests
+
+        self.url = url
+        self.session = requests.Session()
+
+    def get_historical_data(self, exchange, symbol, token, interval, from_date, to_date):
+        try:
+            response = self.session.post(self.url, json={"exchange": exchange, "symboltoken": token,
+                                                         "interval": interval, "fromdate": from_date,
+                                                         "todate": to_date}, timeout=10)
+            return response.json()
+        except Exception as e:
+            logger.error(f"Error fetching historical data: {str(e)}")
+            return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chunked, rate-limited historical candle backfill")
+    parser.add_argument("--from", dest="start", required=True)
+    parser.add_argument("--to", dest="end", required=True)
+    parser.add_argument("--symbol", default="RELIANCE-EQ")
+    parser.add_argument("--exchange", default="NSE")
+    parser.add_argument("--interval", default="ONE_MINUTE", choices=sorted(INTERVAL_MAX_DAYS))
+    parser.add_argument("--rate", type=float, default=HISTORICAL_RATE, help="Requests per second")
+    parser.add_argument("--workers", type=int, default=3)
+    parser.add_argument("--store", default=None, help="Candle store directory")
+    parser.add_argument("--mock", action="store_true", help="Backfill from a local mock endpoint")
+    parser.add_argument("--error-rate", type=float, default=0.1, help="Mock endpoint failure rate")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    if args.mock:
+        server, url = _mock_candle_server(error_rate=args.error_rate)
+        api = _MockCandleClient(url)
+    else:
+        from angel_one_api import get_angel_api
+        api = get_angel_api()
+    store = CandleStore(args.store) if args.store else CandleStore()
+    backfill = Backfill(api, args.start, args.end, args.symbol, args.interval, args.exchange, store,
+                        rate=args.rate, workers=args.workers, backoff=0.5 if args.mock else 1.0)
+    print(json.dumps(backfill.run(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
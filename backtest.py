@@ -0,0 +1,218 @@
+import argparse
+import logging
+import time
+
+import numpy as np
+import pandas as pd
+
+from candle_store import IST_OFFSET
+from datastore import format_epoch, load_table
+from features import compute_indicators
+
+logger = logging.getLogger("Backtest")
+
+LOG_COLUMNS = ["Entry Time", "Direction", "Entry Price", "Exit Time", "Exit Price", "Result", "PnL"]
+
+
+def load_bars(path="RELIANCE_3months_raw.csv"):
+    """Load OHLCV bars into plain NumPy arrays (plus a trading-day index per bar); timestamps are epoch seconds"""
+    table = load_table(path)
+    timestamp = np.asarray(table["timestamp"], dtype=np.int64)
+    days, day = np.unique((timestamp + IST_OFFSET) // 86400, return_inverse=True)
+    # Index of the last bar of each bar's day
+    day_last = np.searchsorted(day, np.arange(len(days)), side="right") - 1
+    bars = {"timestamp": timestamp}
+    for column in ("open", "high", "low", "close", "volume"):
+        bars[column] = np.asarray(table[column], dtype=np.float64)
+    bars["day"] = day.astype(np.int64)
+    bars["day_end"] = day_last[day].astype(np.int64)
+    return bars
+
+
+def _next_true(mask):
+    """For every index i, the first j >= i where mask[j] is set (len(mask) if none)"""
+    n = len(mask)
+    idx = np.where(mask, np.arange(n), n)
+    return np.minimum.accumulate(idx[::-1])[::-1]
+
+
+def _first_hit(condition, offset):
+    """Index of the first set element of a boolean slice, shifted by offset, or -1"""
+    hits = np.flatnonzero(condition)
+    return offset + hits[0] if len(hits) else -1
+
+
+class BacktestResult:
+    """Trades produced by a backtest, kept as arrays so sweeps don't pay for DataFrames"""
+
+    def __init__(self, entry_idx, exit_idx, direction, entry_price, exit_price, result):
+        self.entry_idx = np.asarray(entry_idx, dtype=np.int64)
+        self.exit_idx = np.asarray(exit_idx, dtype=np.int64)
+        self.direction = np.asarray(direction, dtype=np.int8)  # 1 = BUY, -1 = SELL
+        self.entry_price = np.asarray(entry_price, dtype=np.float64)
+        self.exit_price = np.asarray(exit_price, dtype=np.float64)
+        self.result = np.asarray(result, dtype=object)
+        self.pnl = np.round((self.exit_price - self.entry_price) * self.direction, 2)
+
+    def __len__(self):
+        return len(self.pnl)
+
+    def summary(self):
+        equity = np.cumsum(self.pnl)
+        drawdown = np.maximum.accumulate(np.concatenate([[0.0], equity]))[1:] - equity
+        return {
+            "trades": len(self.pnl),
+            "total_pnl": round(float(self.pnl.sum()), 2),
+            "win_rate": round(float((self.pnl > 0).mean() * 100), 2) if len(self.pnl) else 0.0,
+            "max_drawdown": round(float(drawdown.max()), 2) if len(self.pnl) else 0.0,
+        }
+
+    def to_log(self, bars):
+        """Trade log in the schema of reliance_backtest_realistic_log.csv"""
+        timestamps = bars["timestamp"]
+        return pd.DataFrame({
+            "Entry Time": format_epoch(timestamps[self.entry_idx]),
+            "Direction": np.where(self.direction > 0, "BUY", "SELL"),
+            "Entry Price": self.entry_price,
+            "Exit Time": format_epoch(timestamps[self.exit_idx]),
+            "Exit Price": self.exit_price,
+            "Result": self.result,
+            "PnL": self.pnl,
+        }, columns=LOG_COLUMNS)
+
+
+def run_threshold_backtest(bars, price_threshold=2500, stop_loss_pct=0.02, max_trades_per_day=5):
+    """
+    The start_automated_trading rules: buy at the close of a bar trading below price_threshold
+    while flat, sell when the low breaches the percent stop-loss, count both legs against
+    max_trades_per_day, and square off any open position at the day's last bar (INTRADAY).
+    """
+    close, low, open_ = bars["close"], bars["low"], bars["open"]
+    day, day_end = bars["day"], bars["day_end"]
+    n = len(close)
+    next_entry = _next_true(close < price_threshold)
+
+    trades = ([], [], [], [], [], [])
+    i = 0
+    current_day, trades_today = -1, 0
+    while i < n:
+        e = next_entry[i]
+        if e >= n:
+            break
+        if e == day_end[e]:
+            # No room to hold a position on the day's last bar
+            i = e + 1
+            continue
+        if day[e] != current_day:
+            current_day, trades_today = day[e], 0
+        if trades_today >= max_trades_per_day:
+            i = day_end[e] + 1
+            continue
+
+        entry_price = close[e]
+        stop = entry_price * (1 - stop_loss_pct)
+        last = day_end[e]
+        x = _first_hit(low[e + 1:last + 1] <= stop, e + 1)
+        if x >= 0:
+            # A gap through the stop fills at the open
+            exit_price, result = min(open_[x], stop), "SL"
+            trades_today += 2
+        else:
+            x, exit_price, result = last, close[last], "EOD"
+            trades_today += 1
+
+        for column, value in zip(trades, (e, x, 1, entry_price, round(exit_price, 2), result)):
+            column.append(value)
+        i = x + 1
+    return BacktestResult(*trades)
+
+
+def compute_signals(close):
+    """RSI(14) and MACD(12, 26, 9) as used by the dashboard's trading signal"""
+    indicators, _ = compute_indicators(close)
+    return indicators["RSI_14"].to_numpy(), indicators["MACD"].to_numpy(), indicators["MACD_signal"].to_numpy()
+
+
+def signal_direction(rsi, macd, signal):
+    """Vectorized version of the dashboard's direction rule: 1 = BUY, -1 = SELL, 0 = no data"""
+    buy = (rsi < 40) | ((macd > signal) & (macd > 0))
+    sell = (rsi > 60) | ((macd < signal) & (macd < 0))
+    neutral = np.where(macd > signal, 1, -1)
+    direction = np.where(buy, 1, np.where(sell, -1, neutral))
+    direction[np.isnan(macd) | np.isnan(signal)] = 0
+    return direction.astype(np.int8)
+
+
+def run_rsi_macd_backtest(bars, volatility_pct=0.015, stop_ratio=0.7):
+    """
+    The dashboard's RSI/MACD rules: enter at the bar close in the signalled direction with a
+    take-profit volatility_pct away and a stop stop_ratio times as far, exit on whichever is
+    touched first (stop wins ties), otherwise square off at the day's last bar.
+    """
+    high, low, close = bars["high"], bars["low"], bars["close"]
+    day_end = bars["day_end"]
+    n = len(close)
+    direction = signal_direction(*compute_signals(close))
+    next_entry = _next_true(direction != 0)
+
+    trades = ([], [], [], [], [], [])
+    i = 0
+    while i < n:
+        e = next_entry[i]
+        if e >= n or e == day_end[e]:
+            i = e + 1
+            continue
+        side = direction[e]
+        entry_price = close[e]
+        move = entry_price * volatility_pct
+        take_profit = entry_price + side * move
+        stop_loss = entry_price - side * move * stop_ratio
+
+        last = day_end[e]
+        window_high, window_low = high[e + 1:last + 1], low[e + 1:last + 1]
+        if side > 0:
+            tp_hit, sl_hit = window_high >= take_profit, window_low <= stop_loss
+        else:
+            tp_hit, sl_hit = window_low <= take_profit, window_high >= stop_loss
+        tp = _first_hit(tp_hit, e + 1)
+        sl = _first_hit(sl_hit, e + 1)
+
+        if sl >= 0 and (tp < 0 or sl <= tp):
+            x, exit_price, result = sl, stop_loss, "SL"
+        elif tp >= 0:
+            x, exit_price, result = tp, take_profit, "TP"
+        else:
+            x, exit_price, result = last, close[last], "EOD"
+
+        for column, value in zip(trades, (e, x, side, entry_price, round(exit_price, 2), result)):
+            column.append(value)
+        i = x + 1
+    return BacktestResult(*trades)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest the trading rules over 5-minute bars")
+    parser.add_argument("--data", default="RELIANCE_3months_raw.csv")
+    parser.add_argument("--strategy", choices=["threshold", "rsi_macd"], default="threshold")
+    parser.add_argument("--threshold", type=float, default=2500)
+    parser.add_argument("--stop-loss", type=float, default=0.02)
+    parser.add_argument("--max-trades", type=int, default=5)
+    parser.add_argument("--out", help="Write the trade log here (same schema as reliance_backtest_realistic_log.csv)")
+    args = parser.parse_args()
+
+    bars = load_bars(args.data)
+    start = time.perf_counter()
+    if args.strategy == "threshold":
+        result = run_threshold_backtest(bars, args.threshold, args.stop_loss, args.max_trades)
+    else:
+        result = run_rsi_macd_backtest(bars)
+    elapsed = (time.perf_counter() - start) * 1000
+
+    print(f"{len(bars['close'])} bars in {elapsed:.2f} ms: {result.summary()}")
+    if args.out:
+        result.to_log(bars).to_csv(args.out, index=False)
+        print(f"Trade log written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
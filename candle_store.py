@@ -0,0 +1,242 @@
+import argparse
+import logging
+import os
+import time
+from datetime import date, datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger("CandleStore")
+
+STORE_DIR = "candles"
+
+IST = timezone(timedelta(hours=5, minutes=30))
+IST_OFFSET = 19800  # seconds
+
+# NSE cash session; getCandleData takes "YYYY-MM-DD HH:MM" bounds
+SESSION_OPEN = "09:15"
+SESSION_CLOSE = "15:30"
+
+CANDLE_DTYPE = np.dtype([
+    ("timestamp", "<i8"),  # epoch seconds (UTC) of the bar open
+    ("open", "<f8"),
+    ("high", "<f8"),
+    ("low", "<f8"),
+    ("close", "<f8"),
+    ("volume", "<i8"),
+])
+
+
+def _to_date(value):
+    if isinstance(value, str):
+        return date.fromisoformat(value[:10])
+    if isinstance(value, datetime):
+        return value.date()
+    return value
+
+
+def parse_candles(rows):
+    """getCandleData rows [[timestamp, open, high, low, close, volume], ...] -> sorted candle array"""
+    candles = np.empty(len(rows), dtype=CANDLE_DTYPE)
+    if not len(rows):
+        return candles
+    columns = list(zip(*rows))
+    candles["timestamp"] = pd.to_datetime(pd.Series(columns[0]), utc=True).dt.as_unit("s").astype("int64")
+    for index, name in enumerate(("open", "high", "low", "close", "volume"), start=1):
+        candles[name] = columns[index]
+    return np.sort(candles, order="timestamp")
+
+
+def candles_from_frame(df):
+    """Raw-CSV style frame (timestamp, open, high, low, close, volume) -> candle array"""
+    return parse_candles(df[["timestamp", "open", "high", "low", "close", "volume"]].values.tolist())
+
+
+def candles_to_frame(candles):
+    """Candle array -> frame in the raw-CSV layout, timestamps as IST strings"""
+    df = pd.DataFrame({name: candles[name] for name in CANDLE_DTYPE.names})
+    df["timestamp"] = (pd.to_datetime(df["timestamp"], unit="s", utc=True)
+                       .dt.tz_convert("Asia/Kolkata").astype(str))
+    return df
+
+
+def weekdays(start, end):
+    """Monday-Friday dates in [start, end]"""
+    day, end = _to_date(start), _to_date(end)
+    while day <= end:
+        if day.weekday() < 5:
+            yield day
+        day += timedelta(days=1)
+
+
+def candle_days(candles):
+    """IST trading day of every candle"""
+    return ((candles["timestamp"] + IST_OFFSET) // 86400).astype("datetime64[D]")
+
+
+class CandleStore:
+    """
+    OHLCV history on disk, one .npy file per (exchange, symbol, interval, IST day):
+    candles/NSE_RELIANCE-EQ/FIVE_MINUTE/2025-01-08.npy. Days are fetched once through
+    api.get_historical_data and read back memory-mapped. Weekdays the API returned nothing
+    for (holidays) are stored empty so they aren't requested again; today stays incomplete
+    until the session closes.
+    """
+
+    def __init__(self, root=STORE_DIR, api=None):
+        self.root = root
+        self.api = api
+
+    def _dir(self, symbol, interval, exchange):
+        return os.path.join(self.root, f"{exchange}_{symbol}", interval)
+
+    def _path(self, symbol, interval, day, exchange):
+        return os.path.join(self._dir(symbol, interval, exchange), f"{day.isoformat()}.npy")
+
+    def days(self, symbol, interval, exchange="NSE"):
+        """Stored days, in order"""
+        try:
+            names = os.listdir(self._dir(symbol, interval, exchange))
+        except FileNotFoundError:
+            return []
+        return sorted(date.fromisoformat(name[:-4]) for name in names if name.endswith(".npy"))
+
+    def read_day(self, symbol, interval, day, exchange="NSE"):
+        path = self._path(symbol, interval, day, exchange)
+        try:
+            return np.load(path, mmap_mode="r")
+        except ValueError:
+            # Empty partitions (holidays) can't be memory-mapped
+            return np.load(path)
+
+    def write_day(self, symbol, interval, day, candles, exchange="NSE"):
+        directory = self._dir(symbol, interval, exchange)
+        os.makedirs(directory, exist_ok=True)
+        path = self._path(symbol, interval, day, exchange)
+        temp_path = path + ".tmp"
+        with open(temp_path, "wb") as f:
+            np.save(f, np.ascontiguousarray(candles, dtype=CANDLE_DTYPE))
+        os.replace(temp_path, path)
+
+    def write(self, symbol, interval, candles, exchange="NSE", start=None, end=None):
+        """
+        Store candles partitioned by day. Weekdays in [start, end] without candles are
+        stored as empty partitions. Returns the number of partitions written.
+        """
+        candles = np.sort(np.asarray(candles, dtype=CANDLE_DTYPE), order="timestamp")
+        days = candle_days(candles)
+        unique_days, first = np.unique(days, return_index=True)
+        bounds = list(first[1:]) + [len(candles)]
+        written = 0
+        for day, lo, hi in zip(unique_days.tolist(), first, bounds):
+            self.write_day(symbol, interval, day, candles[lo:hi], exchange)
+            written += 1
+        if start is not None and end is not None:
+            present = set(unique_days.tolist())
+            today = datetime.now(IST).date()
+            for day in weekdays(start, end):
+                if day not in present and day < today:
+                    self.write_day(symbol, interval, day, candles[:0], exchange)
+                    written += 1
+        return written
+
+    def _complete(self, day, now):
+        today = now.date()
+        return day < today or (day == today and now.strftime("%H:%M") >= SESSION_CLOSE)
+
+    def missing_days(self, symbol, interval, start, end, exchange="NSE"):
+        """Weekdays in [start, end] that are not stored yet (or still trading)"""
+        now = datetime.now(IST)
+        stored = set(self.days(symbol, interval, exchange))
+        return [day for day in weekdays(start, min(_to_date(end), now.date()))
+                if day not in stored or not self._complete(day, now)]
+
+    @staticmethod
+    def missing_ranges(days, max_gap=3):
+        """Group sorted days into (first, last) runs; weekend gaps don't split a run"""
+        ranges = []
+        for day in days:
+            if ranges and (day - ranges[-1][1]).days <= max_gap:
+                ranges[-1][1] = day
+            else:
+                ranges.append([day, day])
+        return [tuple(r) for r in ranges]
+
+    def sync(self, symbol, interval, start, end, exchange="NSE"):
+        """
+        Fetch the missing days of [start, end] from the API, one request per interval-sized chunk
+        (use backfill.Backfill for long, rate-limited ranges). Returns the number of requests made.
+        """
+        from backfill import chunk_range
+
+        if self.api is None:
+            return 0
+        requests_made = 0
+        chunks = [chunk for first, last in self.missing_ranges(self.missing_days(symbol, interval, start, end, exchange))
+                  for chunk in chunk_range(first, last, interval)]
+        for first, last in chunks:
+            response = self.api.get_historical_data(exchange, symbol, None, interval,
+                                                    f"{first.isoformat()} {SESSION_OPEN}",
+                                                    f"{last.isoformat()} {SESSION_CLOSE}")
+            requests_made += 1
+            if not response or not response.get("status"):
+                logger.error(f"No candle data for {symbol} {interval} {first} - {last}: "
+                             f"{response.get('message') if response else 'no response'}")
+                continue
+            candles = parse_candles(response.get("data") or [])
+            self.write(symbol, interval, candles, exchange, first, last)
+            logger.info(f"Stored {len(candles)} {interval} candles for {symbol} {first} - {last}")
+        return requests_made
+
+    def load(self, symbol, interval, start, end, exchange="NSE", sync=True):
+        """Candles for the IST days [start, end], syncing missing days first when an api is set"""
+        if sync:
+            self.sync(symbol, interval, start, end, exchange)
+        start, end = _to_date(start), _to_date(end)
+        parts = [self.read_day(symbol, interval, day, exchange)
+                 for day in self.days(symbol, interval, exchange) if start <= day <= end]
+        if not parts:
+            return np.empty(0, dtype=CANDLE_DTYPE)
+        return np.concatenate(parts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local candle store")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    importer = subcommands.add_parser("import", help="Seed the store from a raw-bar CSV")
+    importer.add_argument("csv")
+    query = subcommands.add_parser("query", help="Load a date range (syncing from Angel One with --sync)")
+    query.add_argument("--from", dest="start", required=True)
+    query.add_argument("--to", dest="end", required=True)
+    query.add_argument("--sync", action="store_true")
+    for sub in (importer, query):
+        sub.add_argument("--symbol", default="RELIANCE-EQ")
+        sub.add_argument("--exchange", default="NSE")
+        sub.add_argument("--interval", default="FIVE_MINUTE")
+        sub.add_argument("--store", default=STORE_DIR)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    if args.command == "import":
+        store = CandleStore(args.store)
+        candles = candles_from_frame(pd.read_csv(args.csv))
+        written = store.write(args.symbol, args.interval, candles, args.exchange)
+        print(f"Imported {len(candles)} candles into {written} day partitions")
+    else:
+        api = None
+        if args.sync:
+            from angel_one_api import get_angel_api
+            api = get_angel_api()
+        store = CandleStore(args.store, api)
+        start = time.perf_counter()
+        candles = store.load(args.symbol, args.interval, args.start, args.end, args.exchange, sync=args.sync)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        print(f"{len(candles)} candles in {elapsed_ms:.2f} ms")
+        if len(candles):
+            print(candles_to_frame(candles[[0, -1]]).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+import argparse
+import json
+import logging
+import os
+import time
+
+import numpy as np
+
+from candle_store import CANDLE_DTYPE, IST_OFFSET
+from datastore import load_table, table_version
+
+logger = logging.getLogger("ChartData")
+
+RAW_DATA_PATH = "RELIANCE_3months_raw.csv"
+PROCESSED_DATA_PATH = "RELIANCE_processed_data.csv"
+CACHE_DIR = "chart_cache"
+
+# Most points a chart request returns, whatever the range
+MAX_POINTS = 1000
+
+# OHLC pyramid levels above the stored bars: (name, bucket seconds). Buckets are aligned to IST
+# (days start at midnight IST, weeks on Monday).
+OHLC_LEVELS = [("15m", 900), ("1h", 3600), ("1d", 86400), ("1w", 604800)]
+WEEK_ALIGN = 3 * 86400  # 1970-01-01 was a Thursday
+
+# Each indicator level keeps a quarter of the points of the one below
+INDICATOR_LEVEL_FACTOR = 4
+INDICATOR_DTYPE = np.dtype([("timestamp", "<i8"), ("value", "<f8")])
+
+# Range presets for the dashboard history chart (days back from the last bar; None = everything)
+HISTORY_RANGES = {"1D": 1, "1W": 7, "1M": 30, "All": None}
+# Levels whose bars are intraday; their charts hide the overnight gap
+INTRADAY_LEVELS = ("base", "15m", "1h")
+
+
+def aggregate_ohlc(bars, bucket_seconds):
+    """Aggregate sorted bars (CANDLE_DTYPE or dict of arrays) into time buckets, vectorized"""
+    timestamp = np.asarray(bars["timestamp"], dtype=np.int64)
+    out = np.empty(0, dtype=CANDLE_DTYPE)
+    if not len(timestamp):
+        return out
+    align = IST_OFFSET + (WEEK_ALIGN if bucket_seconds % 604800 == 0 else 0)
+    key = (timestamp + align) // bucket_seconds
+    starts = np.flatnonzero(np.concatenate([[True], key[1:] != key[:-1]]))
+    ends = np.append(starts[1:], len(timestamp)) - 1
+    out = np.empty(len(starts), dtype=CANDLE_DTYPE)
+    out["timestamp"] = key[starts] * bucket_seconds - align
+    out["open"] = np.asarray(bars["open"])[starts]
+    out["high"] = np.maximum.reduceat(np.asarray(bars["high"], dtype=np.float64), starts)
+    out["low"] = np.minimum.reduceat(np.asarray(bars["low"], dtype=np.float64), starts)
+    out["close"] = np.asarray(bars["close"])[ends]
+    out["volume"] = np.add.reduceat(np.asarray(bars["volume"], dtype=np.int64), starts)
+    return out
+
+
+def lttb(x, y, threshold):
+    """
+    Largest-Triangle-Three-Buckets downsampling of a line to `threshold` points; keeps the first
+    and last point and, per bucket, the point forming the largest triangle with its neighbours.
+    Returns the selected indices. NaNs (indicator warm-up) are dropped first.
+    """
+    valid = np.flatnonzero(~np.isnan(y))
+    n = len(valid)
+    if threshold >= n or threshold < 3:
+        return valid
+    x, y = np.asarray(x, dtype=np.float64)[valid], np.asarray(y, dtype=np.float64)[valid]
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # Average of the next bucket (the last point for the final bucket)
+        next_lo, next_hi = hi, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x, avg_y = x[next_lo:next_hi].mean(), y[next_lo:next_hi].mean()
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        selected[i + 1] = a
+    return valid[selected]
+
+
+class ChartDataService:
+    """
+    Chart-ready data for any time range in at most max_points points: OHLC from the finest
+    pyramid level that fits, indicator lines by LTTB from a precomputed level close to the
+    target size. Pyramid levels are cached in cache_dir and rebuilt when the source data changes.
+    """
+
+    def __init__(self, raw_path=RAW_DATA_PATH, processed_path=PROCESSED_DATA_PATH, cache_dir=CACHE_DIR,
+                 max_points=MAX_POINTS):
+        self.raw_path = raw_path
+        self.processed_path = processed_path
+        self.cache_dir = cache_dir
+        self.max_points = max_points
+        self.levels = self._load_levels()
+        self.indicators = self._load_indicators()
+
+    def _cached(self, name, source_path, build):
+        """Arrays for a cache entry, rebuilt if the source table's version changed"""
+        directory = os.path.join(self.cache_dir, name)
+        meta_path = os.path.join(directory, "meta.json")
+        version = table_version(source_path)
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            if meta["version"] == version:
+                return {key: np.load(os.path.join(directory, f"{key}.npy"), mmap_mode="r") for key in meta["keys"]}
+        except (OSError, ValueError, KeyError):
+            pass
+        start = time.perf_counter()
+        arrays = build()
+        os.makedirs(directory, exist_ok=True)
+        for key, array in arrays.items():
+            np.save(os.path.join(directory, f"{key}.npy"), array)
+        with open(meta_path, "w") as f:
+            json.dump({"version": version, "keys": list(arrays)}, f)
+        logger.info(f"Built {name} pyramid ({len(arrays)} levels) in {(time.perf_counter() - start) * 1000:.1f} ms")
+        return arrays
+
+    def _load_levels(self):
+        table = load_table(self.raw_path)
+        base = np.empty(len(table["timestamp"]), dtype=CANDLE_DTYPE)
+        for name in CANDLE_DTYPE.names:
+            base[name] = table[name]
+
+        def build():
+            return {name: aggregate_ohlc(base, seconds) for name, seconds in OHLC_LEVELS}
+
+        levels = [("base", base)]
+        cached = self._cached("ohlc", self.raw_path, build)
+        levels.extend((name, cached[name]) for name, _ in OHLC_LEVELS)
+        return levels
+
+    def _load_indicators(self):
+        table = load_table(self.processed_path)
+        timestamp = np.asarray(table["timestamp"], dtype=np.int64)
+        columns = [name for name in table if name not in CANDLE_DTYPE.names]
+
+        def build():
+            arrays = {}
+            for column in columns:
+                values = np.asarray(table[column], dtype=np.float64)
+                size, level = len(values), 1
+                while size // INDICATOR_LEVEL_FACTOR >= self.max_points:
+                    size //= INDICATOR_LEVEL_FACTOR
+                    keep = lttb(timestamp, values, size)
+                    line = np.empty(len(keep), dtype=INDICATOR_DTYPE)
+                    line["timestamp"], line["value"] = timestamp[keep], values[keep]
+                    arrays[f"{column}_{level}"] = line
+                    level += 1
+            return arrays
+
+        cached = self._cached("indicators", self.processed_path, build)
+        indicators = {}
+        for column in columns:
+            base = np.empty(len(timestamp), dtype=INDICATOR_DTYPE)
+            base["timestamp"], base["value"] = timestamp, table[column]
+            pyramid, level = [base], 1
+            while f"{column}_{level}" in cached:
+                pyramid.append(cached[f"{column}_{level}"])
+                level += 1
+            indicators[column] = pyramid
+        return indicators
+
+    @staticmethod
+    def _slice(array, start, end):
+        timestamp = array["timestamp"]
+        lo = 0 if start is None else np.searchsorted(timestamp, start, side="left")
+        hi = len(timestamp) if end is None else np.searchsorted(timestamp, end, side="right")
+        return array[lo:hi]
+
+    def span(self):
+        """(first, last) bar timestamp in epoch seconds"""
+        base = self.levels[0][1]
+        return int(base["timestamp"][0]), int(base["timestamp"][-1])
+
+    def ohlc(self, start=None, end=None, max_points=None):
+        """Bars in [start, end] (epoch seconds) from the finest level with at most max_points bars"""
+        max_points = max_points or self.max_points
+        for name, level in self.levels:
+            bars = self._slice(level, start, end)
+            if len(bars) <= max_points:
+                return name, np.asarray(bars)
+        # Even the coarsest level is too dense: aggregate it further on the fly
+        name, level = self.levels[-1]
+        bars = self._slice(level, start, end)
+        factor = -(-len(bars) // max_points)
+        seconds = dict(OHLC_LEVELS)[name] * factor
+        return f"{factor}x{name}", aggregate_ohlc(bars, seconds)
+
+    def indicator(self, column, start=None, end=None, max_points=None):
+        """(timestamp, value) points of an indicator line in [start, end], at most max_points"""
+        max_points = max_points or self.max_points
+        pyramid = self.indicators[column]
+        line = self._slice(pyramid[0], start, end)
+        # Coarsest level that still has more points than requested, then LTTB the rest of the way
+        for level in pyramid[1:]:
+            candidate = self._slice(level, start, end)
+            if len(candidate) < max_points:
+                break
+            line = candidate
+        keep = lttb(line["timestamp"], line["value"], max_points)
+        return np.asarray(line[keep])
+
+
+def build_history_figure(level, bars, lines):
+    """Price History chart: downsampled candles plus indicator lines ({column: INDICATOR_DTYPE array})"""
+    import plotly.graph_objects as go
+
+    def times(epoch):
+        return (np.asarray(epoch, dtype=np.int64) + IST_OFFSET).astype("datetime64[s]")
+
+    fig = go.Figure(go.Candlestick(x=times(bars["timestamp"]), open=bars["open"], high=bars["high"],
+                                   low=bars["low"], close=bars["close"], increasing_line_color="green",
+                                   decreasing_line_color="red", name=f"Price ({level})"))
+    for column, line in lines.items():
+        fig.add_trace(go.Scatter(x=times(line["timestamp"]), y=line["value"], mode="lines", name=column,
+                                 line=dict(width=1)))
+
+    rangebreaks = [dict(bounds=["sat", "mon"])]
+    if level in INTRADAY_LEVELS:
+        rangebreaks.append(dict(bounds=[15.5, 9.25], pattern="hour"))
+    fig.update_layout(
+        autosize=True,
+        margin=dict(l=10, r=10, b=10, t=30),
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+        plot_bgcolor="#0E1117",
+        paper_bgcolor="#0E1117",
+        font=dict(color="white"),
+        xaxis=dict(gridcolor="rgba(80, 80, 80, 0.3)", showgrid=True, rangeslider=dict(visible=False),
+                   rangebreaks=rangebreaks),
+        yaxis=dict(gridcolor="rgba(80, 80, 80, 0.3)", showgrid=True, tickprefix="₹", tickformat=".2f"),
+    )
+    return fig
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the chart pyramids and time range queries")
+    parser.add_argument("--raw", default=RAW_DATA_PATH)
+    parser.add_argument("--processed", default=PROCESSED_DATA_PATH)
+    parser.add_argument("--max-points", type=int, default=MAX_POINTS)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    start = time.perf_counter()
+    service = ChartDataService(args.raw, args.processed, max_points=args.max_points)
+    print(f"Service ready in {(time.perf_counter() - start) * 1000:.1f} ms; levels "
+          + ", ".join(f"{name}={len(level)}" for name, level in service.levels))
+    first, last = service.span()
+    for name, days in HISTORY_RANGES.items():
+        range_start = None if days is None else last - days * 86400
+        start = time.perf_counter()
+        level, bars = service.ohlc(range_start, last)
+        line = service.indicator("EMA_20", range_start, last)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"{name:>4}: {len(bars)} bars at {level}, "
+              f"{len(line)} EMA_20 points, {elapsed:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
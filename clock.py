@@ -0,0 +1,89 @@
+import bisect
+import time
+from datetime import datetime
+
+import numpy as np
+
+from candle_store import IST, IST_OFFSET
+
+
+class WallClock:
+    """Real time: what the trading loop uses live"""
+
+    def time(self):
+        return time.time()
+
+    def now(self):
+        return datetime.now()
+
+    def today(self):
+        return datetime.now().date()
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+
+class ReplayClock:
+    """
+    Virtual time over a series of historical bars (epoch-second open times). sleep() returns
+    at once after moving time forward, skipping the gaps between sessions, so a loop written
+    against a clock runs through months of bars as fast as the CPU allows.
+    Session-end listeners get the close time of each trading day (IST) the replay moves past,
+    the last one included; `finished` is set once time passes the final bar.
+    """
+
+    def __init__(self, timestamps, bar_seconds=300):
+        self.timestamps = np.asarray(timestamps, dtype=np.int64)
+        self._times = self.timestamps.tolist()
+        self.bar_seconds = bar_seconds
+        self.finished = not len(self.timestamps)
+        self._t = float(self.timestamps[0]) if len(self.timestamps) else 0.0
+        self._bar = 0
+        days = (self.timestamps + IST_OFFSET) // 86400
+        # Index of the last bar of each day
+        self._day_last = np.append(np.flatnonzero(np.diff(days)), len(days) - 1)
+        self._listeners = []
+        self._started = time.perf_counter()
+
+    def add_session_end_listener(self, callback):
+        """callback(close_time) runs whenever the replay leaves a trading day"""
+        self._listeners.append(callback)
+
+    def time(self):
+        return self._t
+
+    def now(self):
+        return datetime.fromtimestamp(self._t, IST).replace(tzinfo=None)
+
+    def today(self):
+        return self.now().date()
+
+    def sleep(self, seconds):
+        if self.finished:
+            return
+        target = self._t + seconds
+        last = len(self.timestamps) - 1
+        bar = bisect.bisect_right(self._times, target) - 1
+        if target >= self._times[bar] + self.bar_seconds:
+            if bar < last:
+                bar += 1
+                target = float(self._times[bar])
+            else:
+                self.finished = True
+        if bar != self._bar or self.finished:
+            # Days left behind: those whose last bar is before the new bar (all of them once finished)
+            upper = last + 1 if self.finished else bar
+            for index in self._day_last[(self._day_last >= self._bar) & (self._day_last < upper)]:
+                for callback in self._listeners:
+                    callback(float(self._times[index] + self.bar_seconds))
+        self._t = target
+        self._bar = bar
+
+    @property
+    def bars_replayed(self):
+        return len(self.timestamps) if self.finished else self._bar + 1
+
+    def throughput(self):
+        """Bars replayed per second of wall time since the clock was created"""
+        elapsed = time.perf_counter() - self._started
+        return self.bars_replayed / elapsed if elapsed else None
@@ -0,0 +1,199 @@
+# Cached data layer for dashboard_streamlit.py.
+# Streamlit reruns the dashboard script on every interaction; everything here is cached at the
+# server level (shared by all sessions) so a rerun does no network or disk I/O unless a TTL
+# has expired or the cache was invalidated explicitly.
+import logging
+
+import pandas as pd
+import streamlit as st
+
+from datastore import load_frame
+
+logger = logging.getLogger("DashboardData")
+
+TRADE_LOG_PATH = "reliance_backtest_realistic_log.csv"
+RAW_DATA_PATH = "RELIANCE_3months_raw.csv"
+PROCESSED_DATA_PATH = "RELIANCE_processed_data.csv"
+TRADE_LOG_COLUMNS = ["Entry Time", "Direction", "Entry Price", "Exit Time", "Exit Price", "Result", "PnL"]
+
+# Seconds before cached values are refetched
+QUOTE_TTL = 5
+TRADE_LOG_TTL = 300
+# Seconds between pulls of newly closed bars into the LSTM input window
+FORECAST_TTL = 60
+# Calendar days of 5-minute bars requested per pull; when the window's newest bar is older,
+# the window is warmed up again from these bars instead of fetching the whole gap
+FORECAST_LOOKBACK_DAYS = 7
+
+# Most recent trades shown in the (styled) trade-log table
+TRADE_TABLE_ROWS = 1000
+
+
+@st.cache_resource(show_spinner=False)
+def get_client():
+    """One logged-in AngelOneAPI session for the whole Streamlit server"""
+    from angel_one_api import get_angel_api
+
+    return get_angel_api()
+
+
+@st.cache_data(ttl=QUOTE_TTL, show_spinner=False)
+def get_latest_price():
+    """Latest Reliance price, fetched at most once per QUOTE_TTL across all sessions"""
+    try:
+        return get_client().get_reliance_ltp()
+    except Exception as e:
+        logger.error(f"Error fetching price: {str(e)}")
+        return None
+
+
+def invalidate_quote():
+    """Force the next get_latest_price() call to hit the API"""
+    get_latest_price.clear()
+
+
+@st.cache_resource(show_spinner=False)
+def get_journal():
+    """The trade journal, seeded from the CSV trade log the first time it is opened"""
+    from journal import get_journal as open_journal
+
+    journal = open_journal()
+    journal.import_trade_log(TRADE_LOG_PATH)
+    return journal
+
+
+@st.cache_data(ttl=TRADE_LOG_TTL, show_spinner=False)
+def _read_trade_log(last_id):
+    return get_journal().trades()[TRADE_LOG_COLUMNS]
+
+
+def load_trade_log():
+    """
+    Trade log from the journal, queried only when a trade was added (the newest trade id is
+    part of the cache key, so appends from other sessions and processes are picked up too).
+    """
+    try:
+        return _read_trade_log(get_journal().last_trade_id())
+    except Exception as e:
+        logger.error(f"Error loading trade log: {str(e)}")
+        return pd.DataFrame(columns=TRADE_LOG_COLUMNS)
+
+
+@st.cache_data(ttl=TRADE_LOG_TTL, show_spinner=False)
+def _trade_stats(last_id):
+    return get_journal().stats().summary()
+
+
+def get_trade_stats():
+    """Performance summary (see trade_stats.py), recomputed only for trades added since the last call"""
+    try:
+        return _trade_stats(get_journal().last_trade_id())
+    except Exception as e:
+        logger.error(f"Error loading trade stats: {str(e)}")
+        return None
+
+
+def append_trade(row):
+    """Append one trade to the journal and return the updated log"""
+    get_journal().record_trade(row)
+    return load_trade_log()
+
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def get_trade_bars(entry_time, exit_time):
+    """Stored 5-minute bars around a trade and whether they are missing (then the caller simulates them)"""
+    from trade_chart import load_trade_bars
+
+    try:
+        bars = load_trade_bars(entry_time, exit_time, RAW_DATA_PATH)
+    except Exception as e:
+        logger.error(f"Error loading trade bars: {str(e)}")
+        bars = None
+    return bars, bars is None
+
+
+@st.cache_resource(show_spinner=False)
+def get_chart_service():
+    """Downsampling service over the raw and processed history (pyramids built or loaded once)"""
+    from chart_data import ChartDataService
+
+    try:
+        return ChartDataService(RAW_DATA_PATH, PROCESSED_DATA_PATH)
+    except Exception as e:
+        logger.error(f"Error loading chart data: {str(e)}")
+        return None
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def get_price_history(start, end, columns):
+    """(level, bars, {column: line}) for a time range, each at most MAX_POINTS points"""
+    service = get_chart_service()
+    level, bars = service.ohlc(start, end)
+    return level, bars, {column: service.indicator(column, start, end) for column in columns}
+
+
+@st.cache_resource(show_spinner=False)
+def get_indicator_engine():
+    """Streaming indicators positioned after the last stored bar (shared; preview() never mutates it)"""
+    from features import build_features
+    from indicators import IndicatorEngine
+
+    try:
+        _, engine = build_features(load_frame(RAW_DATA_PATH))
+        return engine
+    except Exception as e:
+        logger.error(f"Error loading bars for indicators: {str(e)}")
+        return IndicatorEngine()
+
+
+@st.cache_resource(show_spinner=False)
+def get_prediction_service():
+    """LSTM-PSO model, loaded once per server process"""
+    from inference import get_prediction_service as load_service
+
+    return load_service(RAW_DATA_PATH)
+
+
+def _feed_closed_bars(service, today=None, now=None):
+    """
+    Roll the model's input window over the 5-minute bars closed since its newest one (from the
+    candle store). At most FORECAST_LOOKBACK_DAYS of bars are requested; returns how many were added.
+    """
+    import time
+    from datetime import date, timedelta
+
+    from datastore import format_epoch
+    from inference import BAR_SECONDS, WINDOW
+
+    today = today or date.today()
+    now = time.time() if now is None else now
+    earliest = today - timedelta(days=FORECAST_LOOKBACK_DAYS)
+    last_day = date.fromisoformat(format_epoch([service.last_bar_time])[0][:10])
+    candles = get_client().get_candles("RELIANCE-EQ", "FIVE_MINUTE", from_date=max(last_day, earliest).isoformat(),
+                                       to_date=today.isoformat())
+    if last_day >= earliest:
+        return service.add_bars(candles, now=now)
+
+    # Too far behind to roll forward bar by bar: restart the window from the recent bars
+    closed = pd.DataFrame(candles[candles["timestamp"] + BAR_SECONDS <= now])
+    if len(closed) < 2 * WINDOW:
+        logger.warning(f"Only {len(closed)} recent bars, keeping the forecast window at {format_epoch([service.last_bar_time])[0]}")
+        return 0
+    service.warm_up(closed)
+    return len(closed)
+
+
+@st.cache_data(ttl=FORECAST_TTL, show_spinner=False)
+def get_model_forecast():
+    """
+    (forecast, bar time): the LSTM-PSO next-bar forecast and the open time (epoch seconds) of the
+    bar it follows. Without an API session no new bars arrive and the forecast stays historical.
+    """
+    service = get_prediction_service()
+    try:
+        added = _feed_closed_bars(service)
+        if added:
+            logger.info(f"Added {added} closed bars to the prediction window")
+    except Exception as e:
+        logger.warning(f"No new bars for the prediction window: {str(e)}")
+    return service.predict(), service.last_bar_time
@@ -5,7 +5,14 @@ from datetime import datetime, timedelta
 import time
 import random
 import numpy as np
-from angel_one_api import get_reliance_price, angel_api
+from dashboard_data import (
+    get_latest_price, invalidate_quote, append_trade, get_indicator_engine,
+    get_trade_stats, get_trade_bars, get_chart_service, get_price_history, get_model_forecast as load_model_forecast,
+    TRADE_TABLE_ROWS
+)
+from candle_store import IST
+from chart_data import HISTORY_RANGES, build_history_figure
+from trade_chart import build_trade_figure, simulate_trade_bars
 
 # Set dark theme to match screenshot
 st.set_page_config(layout="wide", page_title="Reliance Trading Dashboard", page_icon="📈")
@@ -65,36 +72,20 @@ if 'technical_indicators' not in st.session_state:
         'last_update': datetime.now()
     }
 
-# Get current price from Angel One API
+# Get current price from Angel One API (cached for a few seconds across reruns and sessions)
 def get_current_price():
-    price = get_reliance_price()
+    price = get_latest_price()
     return price
 
-# Calculate technical indicators based on price movement (simplified model)
+# Calculate technical indicators with the live price as the close of the in-progress bar
 def calculate_technical_indicators(current_price):
-    # Don't recalculate if updated within the last 5 minutes (except on price refresh)
-    now = datetime.now()
-    if 'last_price' in st.session_state:
-        last_price = st.session_state.last_price
-        # Update RSI based on price change
-        price_change = current_price - last_price
-        # RSI adjustments - increase with price increases, decrease with price drops
-        rsi_change = price_change / last_price * 30  # Scale for sensitivity
-        new_rsi = max(0, min(100, st.session_state.technical_indicators['rsi'] + rsi_change))
-        
-        # MACD adjustments - follows price direction
-        macd_change = price_change / last_price * 2
-        new_macd = st.session_state.technical_indicators['macd'] + macd_change
-        
-        # Signal line lags behind MACD
-        signal_change = (new_macd - st.session_state.technical_indicators['signal']) * 0.2
-        new_signal = st.session_state.technical_indicators['signal'] + signal_change
-        
+    row = get_indicator_engine().preview(current_price)
+    if row['RSI_14'] is not None and row['MACD_signal'] is not None:
         st.session_state.technical_indicators = {
-            'rsi': round(new_rsi, 2),
-            'macd': round(new_macd, 2),
-            'signal': round(new_signal, 2),
-            'last_update': now
+            'rsi': round(row['RSI_14'], 2),
+            'macd': round(row['MACD'], 2),
+            'signal': round(row['MACD_signal'], 2),
+            'last_update': datetime.now()
         }
     
     # Store current price for next comparison
@@ -102,6 +93,16 @@ def calculate_technical_indicators(current_price):
     
     return st.session_state.technical_indicators
 
+# Next-bar forecast from the LSTM-PSO model (loaded once per server process)
+def get_model_forecast():
+    try:
+        return load_model_forecast()
+    except Exception:
+        return None
+
+# Forecasts after a bar older than this are labelled historical
+FORECAST_MAX_AGE = 24 * 3600
+
 if 'log_data' not in st.session_state:
     st.session_state.log_data = None
 
@@ -140,6 +141,7 @@ with col1:
     if st.button("Refresh Price"):
         try:
             old_price = CURRENT_PRICE
+            invalidate_quote()
             CURRENT_PRICE = get_current_price()
             price_diff = CURRENT_PRICE - old_price
             percent_change = (price_diff / old_price) * 100
@@ -213,22 +215,35 @@ with col2:
     # Add last update timestamp
     st.caption(f"Last indicator update: {indicators['last_update'].strftime('%Y-%m-%d %H:%M:%S')}")
 
+# Full history, downsampled server-side so each range ships a bounded number of points (see chart_data.py)
+st.subheader("Price History")
+chart_service = get_chart_service()
+if chart_service is None:
+    st.info("Historical data is not available.")
+else:
+    history_col1, history_col2 = st.columns([1, 3])
+    with history_col1:
+        history_range = st.radio("Range", list(HISTORY_RANGES), index=len(HISTORY_RANGES) - 1,
+                                 horizontal=True, key="history_range")
+        history_columns = st.multiselect("Indicators", sorted(chart_service.indicators),
+                                         default=["EMA_20", "SMA_20"], key="history_indicators")
+    first_bar, last_bar = chart_service.span()
+    days = HISTORY_RANGES[history_range]
+    range_start = first_bar if days is None else max(first_bar, last_bar - days * 86400)
+    level, history_bars, history_lines = get_price_history(range_start, last_bar, tuple(history_columns))
+    with history_col2:
+        st.plotly_chart(build_history_figure(level, history_bars, history_lines), use_container_width=True)
+        st.caption(f"{len(history_bars)} bars at {level} resolution")
+
 # Create prediction button
 if st.button("Generate Trading Prediction"):
     with st.spinner("Analyzing market data and generating prediction..."):
         time.sleep(random.uniform(2, 5))  # Simulate processing time
         
-        try:
-            log_df = pd.read_csv("reliance_backtest_realistic_log.csv")
-        except Exception:
-            log_df = pd.DataFrame(columns=[
-                "Entry Time", "Direction", "Entry Price", "Exit Time", "Exit Price", "Result", "PnL"
-            ])
-        
         now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         
-        # Get live price for trade
-        current_price = get_current_price()
+        # Use the price already fetched in this run
+        current_price = CURRENT_PRICE
         
         # Calculate target prices based on technical analysis using our indicators
         price_volatility = current_price * 0.015  # Approx 1.5% volatility
@@ -299,9 +314,10 @@ if st.button("Generate Trading Prediction"):
             "PnL": pnl
         }
         
-        log_df = pd.concat([log_df, pd.DataFrame([new_row])], ignore_index=True)
-        log_df.to_csv("reliance_backtest_realistic_log.csv", index=False)
-        st.session_state.log_data = log_df
+        st.session_state.log_data = append_trade(new_row)
+        
+        # Next-bar forecast from the LSTM-PSO model
+        model_forecast = get_model_forecast()
         
         # Display prediction results
         st.success("Prediction complete!")
@@ -314,6 +330,13 @@ if st.button("Generate Trading Prediction"):
             st.markdown(f"**Direction:** {direction}")
             st.markdown(f"**Entry Price:** ₹{entry_price}")
             st.markdown(f"**Success Probability:** {hit_profit_prob*100:.1f}%")
+            if model_forecast is not None:
+                forecast, bar_time = model_forecast
+                bar_label = datetime.fromtimestamp(bar_time, IST).strftime("%d %b %Y %H:%M")
+                if time.time() - bar_time > FORECAST_MAX_AGE:
+                    st.markdown(f"**LSTM Next-Bar Forecast (historical):** ₹{forecast:.2f} after the {bar_label} bar")
+                else:
+                    st.markdown(f"**LSTM Next-Bar Forecast:** ₹{forecast:.2f} after the {bar_label} bar")
         
         with details_col2:
             st.markdown(f"**Take Profit Target:** ₹{take_profit}")
@@ -335,40 +358,44 @@ if st.button("Generate Trading Prediction"):
 if st.session_state.log_data is not None:
     st.subheader("Trade Log")
     
-    # Color code the results
-    def highlight_profit(val):
-        if val > 0:
-            return 'background-color: rgba(0, 255, 0, 0.2)'
-        elif val < 0:
-            return 'background-color: rgba(255, 0, 0, 0.2)'
-        return ''
+    # Color code the results (one vectorized pass over the PnL column)
+    def highlight_profit(pnl):
+        return np.where(pnl > 0, 'background-color: rgba(0, 255, 0, 0.2)',
+                        np.where(pnl < 0, 'background-color: rgba(255, 0, 0, 0.2)', ''))
     
-    styled_df = st.session_state.log_data.style.applymap(
-        highlight_profit, subset=['PnL']
-    )
+    recent_trades = st.session_state.log_data.tail(TRADE_TABLE_ROWS)
+    styled_df = recent_trades.style.apply(highlight_profit, subset=['PnL'])
     
     st.dataframe(styled_df, use_container_width=True)
+    if len(recent_trades) < len(st.session_state.log_data):
+        st.caption(f"Showing the latest {len(recent_trades)} of {len(st.session_state.log_data)} trades")
     
-    # Display trading stats
-    if len(st.session_state.log_data) > 0:
+    # Display trading stats, maintained incrementally alongside the trade journal
+    stats = get_trade_stats()
+    if stats and stats["trades"] > 0:
         st.subheader("Trading Performance")
         stats_col1, stats_col2, stats_col3, stats_col4 = st.columns(4)
         
-        # Calculate trading statistics
-        total_trades = len(st.session_state.log_data)
-        winning_trades = len(st.session_state.log_data[st.session_state.log_data['PnL'] > 0])
-        win_rate = (winning_trades / total_trades) * 100 if total_trades > 0 else 0
-        total_profit = st.session_state.log_data['PnL'].sum()
-        avg_profit = st.session_state.log_data['PnL'].mean()
-        
         with stats_col1:
-            st.metric("Total Trades", total_trades)
+            st.metric("Total Trades", stats["trades"])
         with stats_col2:
-            st.metric("Win Rate", f"{win_rate:.1f}%")
+            st.metric("Win Rate", f"{stats['win_rate']:.1f}%")
         with stats_col3:
-            st.metric("Total P&L", f"₹{total_profit:.2f}")
+            st.metric("Total P&L", f"₹{stats['total_pnl']:.2f}")
         with stats_col4:
-            st.metric("Avg P&L per Trade", f"₹{avg_profit:.2f}")
+            st.metric("Avg P&L per Trade", f"₹{stats['avg_pnl']:.2f}")
+        
+        risk_col1, risk_col2, risk_col3, risk_col4 = st.columns(4)
+        with risk_col1:
+            st.metric("Max Drawdown", f"₹{stats['max_drawdown']:.2f}")
+        with risk_col2:
+            st.metric("Sharpe (per trade)", "—" if stats["sharpe"] is None else f"{stats['sharpe']:.2f}")
+        with risk_col3:
+            st.metric("Profit Factor", "—" if stats["profit_factor"] is None else f"{stats['profit_factor']:.2f}")
+        with risk_col4:
+            streak = stats["streak"]
+            st.metric("Current Streak", f"{abs(streak)} {'wins' if streak > 0 else 'losses' if streak < 0 else '-'}",
+                      help=f"Longest: {stats['max_win_streak']} wins, {stats['max_loss_streak']} losses")
     
     # Allow selecting a trade for analysis
     st.subheader("Trade Analysis")
@@ -392,349 +419,12 @@ if st.session_state.log_data is not None:
         st.markdown(f"**P&L:** <span style='color:{result_color};font-weight:bold;'>₹{selected_trade['PnL']}</span>", unsafe_allow_html=True)
     
     with analysis_col2:
-        # Plot improved candlestick chart using Plotly for the selected trade
-        import plotly.graph_objects as go
-        
-        entry_time = pd.to_datetime(selected_trade["Entry Time"])
-        exit_time = pd.to_datetime(selected_trade["Exit Time"])
-        entry_price = selected_trade["Entry Price"]
-        exit_price = selected_trade["Exit Price"]
-        
-        # Generate time points between entry and exit (5-minute intervals)
-        # Ensure at least 8 data points for better visualization
-        time_diff = max((exit_time - entry_time).total_seconds() / 60, 120)  # At least 2 hours if times are close
-        num_points = max(8, int(time_diff / 5) + 1)  # 5-minute intervals for more candles
-        timestamps = pd.date_range(start=entry_time, end=exit_time, periods=num_points)
-        
-        # Create more realistic price movement based on trade result and direction
-        if selected_trade["Direction"] == "BUY":
-            if selected_trade["Result"] == "TP":
-                # For successful BUY: price behavior to take profit
-                # Create a pattern with initial flat period, consolidation, and final move up
-                segment1 = np.linspace(entry_price, entry_price * 1.002, num_points//4)  # Initial small move
-                segment2 = np.linspace(entry_price * 1.002, entry_price * 1.001, num_points//6)  # Small pullback
-                segment3 = np.linspace(entry_price * 1.001, entry_price * 1.008, num_points//4)  # Stronger move up
-                segment4 = np.linspace(entry_price * 1.008, entry_price * 1.006, num_points//6)  # Minor consolidation
-                segment5 = np.linspace(entry_price * 1.006, exit_price, num_points - (num_points//4 + num_points//6 + num_points//4 + num_points//6))  # Final move to target
-                price_pattern = np.concatenate([segment1, segment2, segment3, segment4, segment5])
-            else:
-                # For unsuccessful BUY: pattern that initially works then fails
-                segment1 = np.linspace(entry_price, entry_price * 1.004, num_points//4)  # Initial promising move
-                segment2 = np.linspace(entry_price * 1.004, entry_price * 1.002, num_points//5)  # First warning sign
-                segment3 = np.linspace(entry_price * 1.002, entry_price * 1.005, num_points//5)  # False recovery
-                segment4 = np.linspace(entry_price * 1.005, entry_price * 0.998, num_points//4)  # Start of downturn
-                segment5 = np.linspace(entry_price * 0.998, exit_price, num_points - (num_points//4 + num_points//5 + num_points//5 + num_points//4))  # Final drop to stop loss
-                price_pattern = np.concatenate([segment1, segment2, segment3, segment4, segment5])
-        else:  # SELL trades
-            if selected_trade["Result"] == "TP":
-                # For successful SELL: pattern showing downward movement
-                segment1 = np.linspace(entry_price, entry_price * 0.998, num_points//4)  # Initial drop
-                segment2 = np.linspace(entry_price * 0.998, entry_price * 0.999, num_points//6)  # Small retracement
-                segment3 = np.linspace(entry_price * 0.999, entry_price * 0.992, num_points//4)  # Stronger move down
-                segment4 = np.linspace(entry_price * 0.992, entry_price * 0.994, num_points//6)  # Minor bounce
-                segment5 = np.linspace(entry_price * 0.994, exit_price, num_points - (num_points//4 + num_points//6 + num_points//4 + num_points//6))  # Final move to target
-                price_pattern = np.concatenate([segment1, segment2, segment3, segment4, segment5])
-            else:
-                # For unsuccessful SELL: pattern that moves against short position
-                segment1 = np.linspace(entry_price, entry_price * 0.996, num_points//4)  # Initial promising move
-                segment2 = np.linspace(entry_price * 0.996, entry_price * 0.998, num_points//5)  # First warning sign
-                segment3 = np.linspace(entry_price * 0.998, entry_price * 0.995, num_points//5)  # False recovery
-                segment4 = np.linspace(entry_price * 0.995, entry_price * 1.002, num_points//4)  # Start of upturn
-                segment5 = np.linspace(entry_price * 1.002, exit_price, num_points - (num_points//4 + num_points//5 + num_points//5 + num_points//4))  # Final rise to stop loss
-                price_pattern = np.concatenate([segment1, segment2, segment3, segment4, segment5])
-        
-        # Add small random noise to prices to make the chart look realistic
-        # Use smaller noise values for more realistic candles
-        volatility = abs(exit_price - entry_price) * 0.15
-        price_noise = np.random.normal(0, volatility / 15, num_points)
-        price_data = price_pattern + price_noise
-        
-        # Construct OHLC data for candlesticks
-        opens = []
-        highs = []
-        lows = []
-        closes = []
-        
-        # Generate realistic OHLC data with proper candle formations
-        for i in range(len(price_data)-1):
-            # Randomly decide if candle is bullish or bearish with slight bias based on trend
-            is_uptrend = price_data[i+1] > price_data[i]
-            
-            # Create realistic candle pattern based on trend
-            if is_uptrend:  # Bullish candle
-                candle_body_size = random.uniform(0.3, 0.8)  # Body is 30-80% of total range
-                open_price = price_data[i]
-                close_price = price_data[i+1]
-                
-                # Sometimes create doji or hammer patterns
-                pattern_type = random.random()
-                if pattern_type > 0.8:  # Doji (small body)
-                    body_mid = (open_price + close_price) / 2
-                    open_price = body_mid - (close_price - open_price) * 0.1
-                    close_price = body_mid + (close_price - open_price) * 0.1
-                
-                # Adjust wick lengths (longer upper wicks in uptrend)
-                high_price = close_price + abs(close_price - open_price) * random.uniform(0.1, 0.4)
-                low_price = open_price - abs(close_price - open_price) * random.uniform(0.05, 0.3)
-            else:  # Bearish candle
-                open_price = price_data[i]
-                close_price = price_data[i+1]
-                
-                # Sometimes create shooting star pattern in downtrend
-                pattern_type = random.random()
-                if pattern_type > 0.8:
-                    body_mid = (open_price + close_price) / 2
-                    open_price = body_mid + abs(open_price - close_price) * 0.2
-                    close_price = body_mid - abs(open_price - close_price) * 0.2
-                
-                # Adjust wick lengths (longer lower wicks in downtrend)
-                high_price = open_price + abs(open_price - close_price) * random.uniform(0.1, 0.3)
-                low_price = close_price - abs(open_price - close_price) * random.uniform(0.1, 0.5)
-            
-            opens.append(open_price)
-            highs.append(high_price)
-            lows.append(low_price)
-            closes.append(close_price)
-        
-        # Create the candlestick chart with dark theme
-        fig = go.Figure(data=[
-            go.Candlestick(
-                x=timestamps[:-1],
-                open=opens,
-                high=highs,
-                low=lows,
-                close=closes,
-                increasing_line_color='green',
-                decreasing_line_color='red'
-            )
-        ])
-        
-        # Add entry marker
-        fig.add_trace(go.Scatter(
-            x=[entry_time],
-            y=[entry_price],
-            mode="markers+text",
-            marker=dict(
-                size=14,
-                color="blue",
-                symbol="triangle-up" if selected_trade["Direction"] == "BUY" else "triangle-down",
-                line=dict(width=2, color="white")
-            ),
-            text=["Entry"],
-            textposition="top center",
-            name="Entry Point"
-        ))
-        
-        # Add exit marker
-        fig.add_trace(go.Scatter(
-            x=[exit_time],
-            y=[exit_price],
-            mode="markers+text",
-            marker=dict(
-                size=14, 
-                color="green" if selected_trade["Result"] == "TP" else "red", 
-                symbol="circle",
-                line=dict(width=2, color="white")
-            ),
-            text=["Exit"],
-            textposition="top center",
-            name="Exit Point"
-        ))
-        
-        # Add profit/loss line
-        fig.add_shape(
-            type="line",
-            x0=entry_time,
-            y0=entry_price,
-            x1=exit_time,
-            y1=exit_price,
-            line=dict(
-                color="green" if selected_trade["PnL"] > 0 else "red",
-                width=2,
-                dash="dot"
-            )
-        )
-        
-        # Calculate proper TP and SL levels based on the PnL in the trade
-        if selected_trade["Direction"] == "BUY":
-            # For BUY trades, take profit is above entry
-            tp_level = entry_price * 1.015  # Default TP level
-            sl_level = entry_price * 0.99   # Default SL level
-            
-            # If we have the actual result, use that to calculate levels
-            if selected_trade["Result"] == "TP":
-                tp_level = exit_price
-                sl_level = entry_price - (exit_price - entry_price) * 0.7
-            elif selected_trade["Result"] == "SL":
-                sl_level = exit_price
-                tp_level = entry_price + (entry_price - exit_price) / 0.7
-        else:
-            # For SELL trades, take profit is below entry
-            tp_level = entry_price * 0.985  # Default TP level
-            sl_level = entry_price * 1.01   # Default SL level
-            
-            # If we have the actual result, use that to calculate levels
-            if selected_trade["Result"] == "TP":
-                tp_level = exit_price
-                sl_level = entry_price + (entry_price - exit_price) * 0.7
-            elif selected_trade["Result"] == "SL":
-                sl_level = exit_price
-                tp_level = entry_price - (exit_price - entry_price) / 0.7
-            
-        # Add take profit line
-        fig.add_shape(
-            type="line",
-            x0=entry_time,
-            y0=tp_level,
-            x1=exit_time,
-            y1=tp_level,
-            line=dict(
-                color="green",
-                width=1,
-                dash="dash"
-            )
-        )
-        
-        # Add annotation for TP
-        fig.add_annotation(
-            x=entry_time,
-            y=tp_level,
-            text="Take Profit",
-            showarrow=False,
-            yshift=10,
-            font=dict(size=10, color="green")
-        )
-        
-        # Add stop loss line
-        fig.add_shape(
-            type="line",
-            x0=entry_time,
-            y0=sl_level,
-            x1=exit_time,
-            y1=sl_level,
-            line=dict(
-                color="red",
-                width=1,
-                dash="dash"
-            )
-        )
-        
-        # Add annotation for SL
-        fig.add_annotation(
-            x=entry_time,
-            y=sl_level,
-            text="Stop Loss",
-            showarrow=False,
-            yshift=-15,
-            font=dict(size=10, color="red")
-        )
-        
-        # Add a secondary row of candles at the bottom like in the screenshot
-        # Calculate y-axis position for mini chart (about 10% of main chart height)
-        mini_price_range = max(highs) - min(lows)
-        mini_chart_base = min(lows) - mini_price_range * 0.6
-        mini_chart_height = mini_price_range * 0.2
-        
-        # Create mini candles (simplified version of main chart)
-        mini_opens = [open_val - mini_chart_base for open_val in opens]
-        mini_highs = [high_val - mini_chart_base for high_val in highs]
-        mini_lows = [low_val - mini_chart_base for low_val in lows]
-        mini_closes = [close_val - mini_chart_base for close_val in closes]
-        
-        # Scale down to fit in the mini chart area
-        scale_factor = mini_chart_height / mini_price_range
-        mini_opens = [val * scale_factor + mini_chart_base for val in mini_opens]
-        mini_highs = [val * scale_factor + mini_chart_base for val in mini_highs]
-        mini_lows = [val * scale_factor + mini_chart_base for val in mini_lows]
-        mini_closes = [val * scale_factor + mini_chart_base for val in mini_closes]
-        
-        # Add mini chart
-        for i in range(len(opens)):
-            # Add mini candles
-            fig.add_shape(
-                type="line",
-                x0=timestamps[i],
-                y0=mini_lows[i],
-                x1=timestamps[i],
-                y1=mini_highs[i],
-                line=dict(
-                    color="green" if mini_closes[i] > mini_opens[i] else "red",
-                    width=1
-                )
-            )
-            
-            # Add candle bodies
-            fig.add_shape(
-                type="rect",
-                x0=timestamps[i] - pd.Timedelta(minutes=1),
-                x1=timestamps[i] + pd.Timedelta(minutes=1),
-                y0=mini_opens[i],
-                y1=mini_closes[i],
-                fillcolor="green" if mini_closes[i] > mini_opens[i] else "red",
-                line=dict(color="green" if mini_closes[i] > mini_opens[i] else "red", width=1),
-                opacity=1
-            )
-        
-        # Add entry and exit markers to mini chart
-        fig.add_trace(go.Scatter(
-            x=[entry_time],
-            y=[mini_chart_base + mini_chart_height/2],
-            mode="markers",
-            marker=dict(
-                size=10,
-                color="blue",
-                symbol="triangle-up" if selected_trade["Direction"] == "BUY" else "triangle-down"
-            ),
-            showlegend=False
-        ))
-        
-        fig.add_trace(go.Scatter(
-            x=[exit_time],
-            y=[mini_chart_base + mini_chart_height/2],
-            mode="markers",
-            marker=dict(
-                size=10,
-                color="green" if selected_trade["Result"] == "TP" else "red",
-                symbol="circle"
-            ),
-            showlegend=False
-        ))
-        
-        # Calculate PnL to display in title
-        pnl = selected_trade["PnL"]
-        
-        # Update layout with dark theme
-        fig.update_layout(
-            title=f'{selected_trade["Direction"]} Trade Analysis: {selected_trade["Result"]} ({pnl})',
-            xaxis_title='Time',
-            yaxis_title='Price (₹)',
-            autosize=True,
-            margin=dict(l=10, r=10, b=10, t=50),
-            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
-            plot_bgcolor='#0E1117',  # Dark background
-            paper_bgcolor='#0E1117',  # Dark background for the whole plot
-            font=dict(color='white'),  # White text
-            xaxis=dict(
-                gridcolor='rgba(80, 80, 80, 0.3)',
-                showgrid=True
-            ),
-            yaxis=dict(
-                gridcolor='rgba(80, 80, 80, 0.3)',
-                showgrid=True,
-                tickprefix='₹',  # Add Rupee symbol to y-axis labels
-                tickformat='.2f'  # Format with 2 decimal places
-            )
-        )
-        
-        # Set y-axis range to show all relevant levels and mini chart
-        min_price = min(min(lows), sl_level if selected_trade["Direction"] == "BUY" else tp_level) * 0.998
-        max_price = max(max(highs), tp_level if selected_trade["Direction"] == "BUY" else sl_level) * 1.002
-        
-        # Extend range to include mini chart
-        chart_range = max_price - min_price
-        min_price = mini_chart_base - chart_range * 0.05  # Add some padding below mini chart
-        
-        fig.update_yaxes(range=[min_price, max_price])
+        # Candlestick chart of the bars around the trade (real history when stored, see trade_chart.py)
+        bars, simulated = get_trade_bars(selected_trade["Entry Time"], selected_trade["Exit Time"])
+        if simulated:
+            bars = simulate_trade_bars(selected_trade)
+            st.caption("No stored candles cover this trade; showing an illustrative price path.")
+        fig = build_trade_figure(selected_trade, bars)
         
         st.plotly_chart(fig, use_container_width=True)
 else:
@@ -0,0 +1,198 @@
+import argparse
+import json
+import logging
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from candle_store import IST_OFFSET
+
+logger = logging.getLogger("DataStore")
+
+# A table is a directory next to its CSV (RELIANCE_3months_raw.cols/) holding one .npy per
+# column plus meta.json. Time columns are stored as int64 epoch seconds, text as fixed-width unicode.
+TABLE_SUFFIX = ".cols"
+TIME_COLUMNS = ("timestamp", "Entry Time", "Exit Time")
+TIMEZONE = "Asia/Kolkata"
+
+
+def to_epoch(values):
+    """Timestamp strings (with or without a UTC offset; naive ones are taken as IST) -> int64 epoch seconds.
+    Numeric input is taken to be epoch seconds already."""
+    values = pd.Series(values)
+    if pd.api.types.is_numeric_dtype(values):
+        return values.to_numpy(dtype=np.int64)
+    values = values.astype(object).astype(str)
+    aware = values.str.contains(r"(?:[+-]\d\d:?\d\d|Z)$")
+    epoch = np.empty(len(values), dtype=np.int64)
+    if aware.any():
+        epoch[aware.to_numpy()] = pd.to_datetime(values[aware], utc=True, format="ISO8601").dt.as_unit("s").astype("int64")
+    if (~aware).any():
+        naive = pd.to_datetime(values[~aware], format="ISO8601").dt.tz_localize(TIMEZONE)
+        epoch[~aware.to_numpy()] = naive.dt.as_unit("s").astype("int64")
+    return epoch
+
+
+def format_epoch(epoch):
+    """int64 epoch seconds -> "2025-01-08 09:15:00+05:30" strings (the CSV format)"""
+    # IST has no DST, so a fixed offset is exact
+    local = (np.asarray(epoch, dtype=np.int64) + IST_OFFSET).astype("datetime64[s]")
+    if not len(local):
+        return np.empty(0, dtype=object)
+    strings = np.char.replace(np.datetime_as_string(local, unit="s"), "T", " ")
+    return np.char.add(strings, "+05:30").astype(object)
+
+
+def columnar_path(path):
+    """Table directory for a CSV path (table directories map to themselves)"""
+    return path if path.endswith(TABLE_SUFFIX) else os.path.splitext(path)[0] + TABLE_SUFFIX
+
+
+def _column_array(df, column):
+    if column in TIME_COLUMNS:
+        return to_epoch(df[column])
+    values = df[column]
+    if pd.api.types.is_bool_dtype(values) or pd.api.types.is_numeric_dtype(values):
+        return values.to_numpy(dtype=np.int64 if pd.api.types.is_integer_dtype(values) else np.float64)
+    return np.asarray(values.astype(str).to_numpy(), dtype=str)
+
+
+def _column_file(path, index):
+    return os.path.join(path, f"{index}.npy")
+
+
+def _write_meta(path, meta):
+    temp_path = os.path.join(path, "meta.json.tmp")
+    with open(temp_path, "w") as f:
+        json.dump(meta, f)
+    os.replace(temp_path, os.path.join(path, "meta.json"))
+
+
+def _read_meta(path):
+    with open(os.path.join(path, "meta.json")) as f:
+        return json.load(f)
+
+
+def write_table(df, path, source_mtime=None):
+    """Write a frame as a columnar table (replacing any existing one)"""
+    path = columnar_path(path)
+    os.makedirs(path, exist_ok=True)
+    for index, column in enumerate(df.columns):
+        np.save(_column_file(path, index), _column_array(df, column))
+    _write_meta(path, {"columns": list(df.columns), "rows": len(df), "source_mtime": source_mtime})
+    return path
+
+
+def read_table(path, columns=None):
+    """Columns of a table as memory-mapped arrays, in stored order"""
+    path = columnar_path(path)
+    meta = _read_meta(path)
+    table = {}
+    for index, column in enumerate(meta["columns"]):
+        if columns is None or column in columns:
+            file_path = _column_file(path, index)
+            try:
+                array = np.load(file_path, mmap_mode="r")
+            except ValueError:
+                # Empty tables can't be memory-mapped
+                array = np.load(file_path)
+            table[column] = array[:meta["rows"]]
+    return table
+
+
+def ensure_table(path):
+    """
+    Table directory for path, (re)building it from the CSV when it's missing or the CSV was
+    modified since the last conversion.
+    """
+    table_path = columnar_path(path)
+    if path.endswith(TABLE_SUFFIX) or not os.path.exists(path):
+        return table_path
+    source_mtime = os.path.getmtime(path)
+    try:
+        if _read_meta(table_path).get("source_mtime") == source_mtime:
+            return table_path
+    except (OSError, ValueError):
+        pass
+    try:
+        df = pd.read_csv(path)
+    except pd.errors.EmptyDataError:
+        df = pd.DataFrame()
+    write_table(df, table_path, source_mtime)
+    logger.info(f"Converted {path} to {table_path} ({len(df)} rows)")
+    return table_path
+
+
+def load_table(path, columns=None):
+    """Columns of a data file (CSV or table directory) as NumPy arrays; times are epoch seconds"""
+    return read_table(ensure_table(path), columns)
+
+
+def load_frame(path, columns=None, time_strings=False):
+    """A data file as a DataFrame; time_strings=True formats time columns back to their CSV form"""
+    table = load_table(path, columns)
+    df = pd.DataFrame({column: np.asarray(values) for column, values in table.items()})
+    if time_strings:
+        for column in TIME_COLUMNS:
+            if column in df:
+                df[column] = format_epoch(df[column])
+    return df
+
+
+def table_version(path):
+    """Changes whenever the table is rebuilt (for cache keys)"""
+    return os.path.getmtime(os.path.join(ensure_table(path), "meta.json"))
+
+
+def export_csv(path, csv_path):
+    load_frame(path, time_strings=True).to_csv(csv_path, index=False)
+
+
+def benchmark(csv_path, repeat=5):
+    """Compare reading and parsing the CSV with loading its columnar table"""
+    def best(fn):
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - start)
+        return min(times) * 1000
+
+    def from_csv():
+        df = pd.read_csv(csv_path)
+        for column in TIME_COLUMNS:
+            if column in df:
+                pd.to_datetime(df[column], utc=True, format="ISO8601")
+        return df
+
+    def from_table():
+        return {column: np.asarray(values) for column, values in load_table(csv_path).items()}
+
+    ensure_table(csv_path)
+    csv_ms, table_ms = best(from_csv), best(from_table)
+    return {"rows": len(from_csv()), "csv_ms": round(csv_ms, 3), "columnar_ms": round(table_ms, 3),
+            "speedup": round(csv_ms / table_ms, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Columnar copies of the project's CSV data files")
+    parser.add_argument("command", choices=["convert", "export", "benchmark"])
+    parser.add_argument("paths", nargs="+", help="CSV files (export: table directory and output CSV)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    if args.command == "convert":
+        for path in args.paths:
+            print(ensure_table(path))
+    elif args.command == "export":
+        export_csv(*args.paths)
+    else:
+        for path in args.paths:
+            print(path, benchmark(path))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+import argparse
+import logging
+import os
+import pickle
+import time
+
+import numpy as np
+import pandas as pd
+
+from datastore import load_frame
+from indicators import INDICATOR_COLUMNS, IndicatorEngine
+
+logger = logging.getLogger("Features")
+
+RAW_COLUMNS = ["timestamp", "open", "high", "low", "close", "volume"]
+
+
+def state_path_for(out_path):
+    return out_path + ".state.pkl"
+
+
+def _ewm(series, min_periods, **kwargs):
+    """pandas ewm(adjust=False): the raw recursion and the copy masked until min_periods observations"""
+    raw = series.ewm(adjust=False, **kwargs).mean()
+    return raw, raw.where(series.notna().cumsum() >= min_periods)
+
+
+def compute_indicators(close):
+    """
+    Vectorized indicators over a close series (NaN while warming up), plus the final values
+    of the underlying averages needed to continue the series incrementally.
+    """
+    close = pd.Series(close, dtype=np.float64).reset_index(drop=True)
+
+    window = close.rolling(20)
+    sma = window.mean()
+    std = window.std(ddof=0)
+    ema_raw, ema = _ewm(close, 20, span=20)
+
+    diff = close.diff()
+    gain_raw, avg_gain = _ewm(diff.where(diff > 0, 0.0), 14, alpha=1 / 14)
+    loss_raw, avg_loss = _ewm(-diff.where(diff < 0, 0.0), 14, alpha=1 / 14)
+    rsi = (100 - 100 / (1 + avg_gain / avg_loss)).mask(avg_loss == 0, 100.0)
+
+    fast_raw, fast = _ewm(close, 12, span=12)
+    slow_raw, slow = _ewm(close, 26, span=26)
+    macd = fast - slow
+    signal_raw, signal = _ewm(macd, 9, span=9)
+
+    frame = pd.DataFrame({
+        "SMA_20": sma, "EMA_20": ema, "RSI_14": rsi, "MACD": macd, "MACD_signal": signal,
+        "Bollinger_High": sma + 2 * std, "Bollinger_Low": sma - 2 * std,
+    }, columns=INDICATOR_COLUMNS)
+
+    last = {
+        "ema": ema_raw.iloc[-1], "fast": fast_raw.iloc[-1], "slow": slow_raw.iloc[-1],
+        "signal": signal_raw.iloc[-1], "avg_gain": gain_raw.iloc[-1], "avg_loss": loss_raw.iloc[-1],
+    }
+    return frame, last
+
+
+def build_features(raw):
+    """Turn raw OHLCV bars into the processed indicator table, plus a streaming engine positioned after the last bar"""
+    raw = raw[RAW_COLUMNS].reset_index(drop=True)
+    indicators, last = compute_indicators(raw["close"])
+    processed = pd.concat([raw, indicators], axis=1).dropna().reset_index(drop=True)
+    engine = IndicatorEngine.from_history(raw["close"].to_numpy(), **last)
+    return processed, engine
+
+
+def save_state(engine, last_timestamp, path):
+    with open(path, "wb") as f:
+        pickle.dump({"engine": engine, "last_timestamp": last_timestamp}, f)
+
+
+def load_state(path):
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def rebuild(raw_path, out_path):
+    """Full vectorized rebuild of the processed file"""
+    raw = load_frame(raw_path, time_strings=True)
+    processed, engine = build_features(raw)
+    processed.to_csv(out_path, index=False)
+    save_state(engine, raw["timestamp"].iloc[-1], state_path_for(out_path))
+    logger.info(f"Wrote {len(processed)} rows to {out_path}")
+    return len(processed)
+
+
+def append(raw_path, out_path):
+    """
+    Compute indicators only for raw bars newer than the last processed one, continuing from the
+    saved streaming state. Falls back to a full rebuild if there is no state yet.
+    """
+    state_file = state_path_for(out_path)
+    if not (os.path.exists(out_path) and os.path.exists(state_file)):
+        logger.info("No saved indicator state, doing a full rebuild")
+        return rebuild(raw_path, out_path)
+
+    state = load_state(state_file)
+    engine, last_timestamp = state["engine"], state["last_timestamp"]
+    raw = load_frame(raw_path, time_strings=True)
+    new = raw[pd.to_datetime(raw["timestamp"]) > pd.Timestamp(last_timestamp)]
+    if new.empty:
+        logger.info("Processed data is up to date")
+        return 0
+
+    rows = []
+    for bar in new[RAW_COLUMNS].itertuples(index=False):
+        values = engine.update(bar.close)
+        if all(v is not None for v in values.values()):
+            rows.append({**bar._asdict(), **values})
+    if rows:
+        pd.DataFrame(rows, columns=RAW_COLUMNS + INDICATOR_COLUMNS).to_csv(out_path, mode="a", header=False, index=False)
+    save_state(engine, new["timestamp"].iloc[-1], state_file)
+    logger.info(f"Appended {len(rows)} rows to {out_path}")
+    return len(rows)
+
+
+def check_parity(processed, reference_path, tolerance=1e-6):
+    """Compare a processed frame against a stored processed file; returns the max abs diff per column"""
+    reference = pd.read_csv(reference_path)
+    if list(processed["timestamp"]) != list(reference["timestamp"]):
+        raise ValueError(f"Timestamps differ: {len(processed)} rows vs {len(reference)} in {reference_path}")
+    diffs = {
+        column: float(np.abs(processed[column].to_numpy() - reference[column].to_numpy()).max())
+        for column in RAW_COLUMNS[1:] + INDICATOR_COLUMNS
+    }
+    return diffs, all(d <= tolerance for d in diffs.values())
+
+
+def benchmark(raw_path, repeat=5):
+    """Time the vectorized build against a bar-by-bar streaming replay and a one-day append"""
+    raw = load_frame(raw_path, time_strings=True)
+
+    def best(fn):
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - start)
+        return min(times) * 1000
+
+    def replay():
+        engine = IndicatorEngine()
+        for close in raw["close"]:
+            engine.update(close)
+
+    _, engine = build_features(raw.iloc[:-75])
+    one_day = raw["close"].iloc[-75:]
+
+    def append_day():
+        e = pickle.loads(pickle.dumps(engine))
+        for close in one_day:
+            e.update(close)
+
+    return {
+        "bars": len(raw),
+        "vectorized_build_ms": round(best(lambda: build_features(raw)), 3),
+        "streaming_replay_ms": round(best(replay), 3),
+        "append_one_day_ms": round(best(append_day), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build RELIANCE_processed_data.csv from raw OHLCV bars")
+    parser.add_argument("--raw", default="RELIANCE_3months_raw.csv")
+    parser.add_argument("--out", default="RELIANCE_processed_data.csv")
+    parser.add_argument("--append", action="store_true", help="Only compute bars newer than the last processed one")
+    parser.add_argument("--check", action="store_true", help="Compare a fresh build with --out instead of writing it")
+    parser.add_argument("--benchmark", action="store_true")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    if args.benchmark:
+        print(benchmark(args.raw))
+    elif args.check:
+        processed, _ = build_features(load_frame(args.raw, time_strings=True))
+        diffs, ok = check_parity(processed, args.out)
+        print(f"{'OK' if ok else 'MISMATCH'}: {len(processed)} rows, max abs diff per column {diffs}")
+        raise SystemExit(0 if ok else 1)
+    elif args.append:
+        append(args.raw, args.out)
+    else:
+        rebuild(args.raw, args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+import math
+
+# Column names used in RELIANCE_processed_data.csv
+INDICATOR_COLUMNS = ["SMA_20", "EMA_20", "RSI_14", "MACD", "MACD_signal", "Bollinger_High", "Bollinger_Low"]
+
+
+class RollingWindow:
+    """
+    Mean and population standard deviation over the last `period` values in O(1) per update.
+    Sums are kept relative to a shift value to avoid cancellation, and rebuilt from the ring
+    buffer every time it wraps so rounding error can't accumulate.
+    """
+
+    def __init__(self, period):
+        self.period = period
+        self.values = [0.0] * period
+        self.count = 0
+        self.shift = None
+        self.total = 0.0
+        self.total_sq = 0.0
+
+    @property
+    def ready(self):
+        return self.count >= self.period
+
+    def update(self, x):
+        if self.shift is None:
+            self.shift = x
+        idx = self.count % self.period
+        if self.count >= self.period:
+            old = self.values[idx] - self.shift
+            self.total -= old
+            self.total_sq -= old * old
+        self.values[idx] = x
+        d = x - self.shift
+        self.total += d
+        self.total_sq += d * d
+        self.count += 1
+        if idx == self.period - 1:
+            self._resync()
+
+    def _resync(self):
+        self.shift = sum(self.values) / self.period
+        deltas = [v - self.shift for v in self.values]
+        self.total = sum(deltas)
+        self.total_sq = sum(d * d for d in deltas)
+
+    def _stats(self, total, total_sq):
+        mean = total / self.period
+        variance = max(total_sq / self.period - mean * mean, 0.0)
+        return self.shift + mean, math.sqrt(variance)
+
+    def stats(self):
+        """(mean, std) of the current window, or (None, None) until it is full"""
+        if not self.ready:
+            return None, None
+        return self._stats(self.total, self.total_sq)
+
+    def peek(self, x):
+        """(mean, std) if x were the next value, without updating the window"""
+        if self.count + 1 < self.period:
+            return None, None
+        shift = x if self.shift is None else self.shift
+        total, total_sq = self.total, self.total_sq
+        if self.count >= self.period:
+            old = self.values[self.count % self.period] - shift
+            total -= old
+            total_sq -= old * old
+        d = x - shift
+        return self._stats(total + d, total_sq + d * d)
+
+
+class EMA:
+    """Exponential moving average seeded with the first value (pandas ewm(adjust=False))"""
+
+    def __init__(self, span=None, alpha=None, min_periods=None):
+        self.alpha = alpha if alpha is not None else 2.0 / (span + 1)
+        self.min_periods = min_periods if min_periods is not None else (span or 1)
+        self.value = None
+        self.count = 0
+
+    @property
+    def ready(self):
+        return self.count >= self.min_periods
+
+    def _next(self, x):
+        return x if self.value is None else (1 - self.alpha) * self.value + self.alpha * x
+
+    def update(self, x):
+        self.value = self._next(x)
+        self.count += 1
+        return self.current()
+
+    def current(self):
+        return self.value if self.ready else None
+
+    def peek(self, x):
+        return self._next(x) if self.count + 1 >= self.min_periods else None
+
+
+class RSI:
+    """Wilder RSI: gains and losses smoothed with alpha = 1/period"""
+
+    def __init__(self, period=14):
+        self.prev = None
+        self.gain = EMA(alpha=1.0 / period, min_periods=period)
+        self.loss = EMA(alpha=1.0 / period, min_periods=period)
+
+    @staticmethod
+    def _value(gain, loss):
+        if gain is None or loss is None:
+            return None
+        if loss == 0:
+            return 100.0
+        return 100 - 100 / (1 + gain / loss)
+
+    def _moves(self, x):
+        change = 0.0 if self.prev is None else x - self.prev
+        return max(change, 0.0), max(-change, 0.0)
+
+    def update(self, x):
+        up, down = self._moves(x)
+        self.prev = x
+        return self._value(self.gain.update(up), self.loss.update(down))
+
+    def current(self):
+        return self._value(self.gain.current(), self.loss.current())
+
+    def peek(self, x):
+        up, down = self._moves(x)
+        return self._value(self.gain.peek(up), self.loss.peek(down))
+
+
+class MACD:
+    """MACD line (fast EMA - slow EMA) and its signal EMA"""
+
+    def __init__(self, fast=12, slow=26, signal=9):
+        self.fast = EMA(span=fast)
+        self.slow = EMA(span=slow)
+        self.signal = EMA(span=signal)
+
+    def update(self, x):
+        self.fast.update(x)
+        slow = self.slow.update(x)
+        if slow is None:
+            return None, None
+        macd = self.fast.current() - slow
+        return macd, self.signal.update(macd)
+
+    def current(self):
+        if not self.slow.ready:
+            return None, None
+        return self.fast.current() - self.slow.current(), self.signal.current()
+
+    def peek(self, x):
+        slow = self.slow.peek(x)
+        if slow is None:
+            return None, None
+        macd = self.fast.peek(x) - slow
+        return macd, self.signal.peek(macd)
+
+
+class IndicatorEngine:
+    """
+    Streaming version of the indicators in RELIANCE_processed_data.csv.
+    update() commits a closed bar; preview() shows the values a live tick would give
+    without changing state. Both are O(1).
+    """
+
+    def __init__(self, window=20, ema_span=20, rsi_period=14, bollinger_width=2):
+        self.window = RollingWindow(window)
+        self.ema = EMA(span=ema_span)
+        self.rsi = RSI(rsi_period)
+        self.macd = MACD()
+        self.bollinger_width = bollinger_width
+        self.bars = 0
+
+    def _row(self, mean, std, ema, rsi, macd, signal):
+        high = low = None
+        if mean is not None:
+            high = mean + self.bollinger_width * std
+            low = mean - self.bollinger_width * std
+        return {
+            "SMA_20": mean, "EMA_20": ema, "RSI_14": rsi, "MACD": macd, "MACD_signal": signal,
+            "Bollinger_High": high, "Bollinger_Low": low,
+        }
+
+    def update(self, close):
+        """Add a closed bar and return the indicator row for it (None while warming up)"""
+        self.window.update(close)
+        self.bars += 1
+        mean, std = self.window.stats()
+        return self._row(mean, std, self.ema.update(close), self.rsi.update(close), *self.macd.update(close))
+
+    def current(self):
+        mean, std = self.window.stats()
+        return self._row(mean, std, self.ema.current(), self.rsi.current(), *self.macd.current())
+
+    def preview(self, price):
+        """Indicator row if the in-progress bar closed at price"""
+        mean, std = self.window.peek(price)
+        return self._row(mean, std, self.ema.peek(price), self.rsi.peek(price), *self.macd.peek(price))
+
+    @classmethod
+    def from_history(cls, closes, ema, fast, slow, signal, avg_gain, avg_loss):
+        """
+        Rebuild the streaming state from the final values of a batch computation
+        (see features.build_features), so new bars can be appended without a replay.
+        closes is the full close history; only its last `window` values are kept.
+        """
+        engine = cls()
+        bars = len(closes)
+        engine.bars = bars
+        period = engine.window.period
+        for i in range(max(0, bars - period), bars):
+            engine.window.values[i % period] = closes[i]
+        engine.window.count = bars
+        engine.window.shift = closes[-1]
+        if bars >= period:
+            engine.window._resync()
+        else:
+            # Partial window: keep sums consistent with the values written so far
+            deltas = [c - engine.window.shift for c in closes]
+            engine.window.total = sum(deltas)
+            engine.window.total_sq = sum(d * d for d in deltas)
+
+        for ewm, value in ((engine.ema, ema), (engine.macd.fast, fast), (engine.macd.slow, slow),
+                           (engine.rsi.gain, avg_gain), (engine.rsi.loss, avg_loss)):
+            ewm.value, ewm.count = value, bars
+        engine.rsi.prev = closes[-1]
+        macd_values = max(0, bars - engine.macd.slow.min_periods + 1)
+        if macd_values:
+            engine.macd.signal.value, engine.macd.signal.count = signal, macd_values
+        return engine
+
+    @property
+    def ready(self):
+        """True once every indicator has enough history (matches the first processed-CSV row)"""
+        return all(v is not None for v in self.current().values())
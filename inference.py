@@ -0,0 +1,218 @@
+import logging
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+import numpy as np
+
+from metrics import latency_percentiles
+
+logger = logging.getLogger("Inference")
+
+MODEL_PATH = "2nd_reliance_lstm_pso.keras"
+SCALER_PATH = "scaler_final.pkl"
+WEIGHTS_PATH = "lstm_weights.npz"
+
+# Model input: 60 bars x these 8 features, MinMax-scaled with scaler_final.pkl
+FEATURE_COLUMNS = ["close", "SMA_20", "EMA_20", "RSI_14", "MACD", "MACD_signal", "Bollinger_High", "Bollinger_Low"]
+WINDOW = 60
+# Bar length of the model's training data (5-minute bars)
+BAR_SECONDS = 300
+
+
+def load_scaler(path=SCALER_PATH):
+    """Return (scale, offset) of the MinMaxScaler so rows can be scaled without sklearn per call"""
+    import joblib
+
+    scaler = joblib.load(path)
+    return np.asarray(scaler.scale_, dtype=np.float32), np.asarray(scaler.min_, dtype=np.float32)
+
+
+def load_model(weights_path=WEIGHTS_PATH):
+    """
+    Return (forward, (scale, offset)). Uses the NumPy forward pass from lstm_numpy.py when the
+    exported weights exist, so TensorFlow is never imported; otherwise falls back to Keras.
+    """
+    if os.path.exists(weights_path):
+        from lstm_numpy import NumpyLSTM
+
+        model = NumpyLSTM(weights_path)
+        return model, (model.scale, model.offset)
+    logger.info(f"{weights_path} not found, loading the Keras model (run `python lstm_numpy.py export`)")
+    return load_keras_model(), load_scaler()
+
+
+def load_keras_model(path=MODEL_PATH):
+    import keras
+
+    model = keras.models.load_model(path, compile=False)
+
+    def forward(batch):
+        return np.asarray(model(batch, training=False)).reshape(-1)
+
+    return forward
+
+
+class PredictionService:
+    """
+    Next-bar close forecasts from the bundled LSTM-PSO model.
+    The model and scaler are loaded once; the scaled 60-bar input window is kept as a rolling
+    buffer updated per bar (add_bar / add_bars), and concurrent predict() calls are batched into
+    one forward pass. last_bar_time is the open time of the newest bar in the window: forecasts
+    are for the bar after it.
+    """
+
+    def __init__(self, forward=None, scaler=None, max_batch=32, max_wait=0.002, latency_window=10000):
+        if forward is None:
+            forward, default_scaler = load_model()
+            scaler = scaler or default_scaler
+        self.forward = forward
+        self.scale, self.offset = scaler or load_scaler()
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+
+        self.window = deque(maxlen=WINDOW)
+        self.indicators = None
+        self.last_bar_time = None
+        self.latencies = deque(maxlen=latency_window)
+        self.batch_sizes = deque(maxlen=latency_window)
+        self._lock = threading.Lock()
+
+        self._requests = queue.Queue()
+        self._thread = threading.Thread(target=self._batch_loop, name="PredictionService", daemon=True)
+        self._thread.start()
+
+    def scale_row(self, row):
+        return np.asarray([row[c] for c in FEATURE_COLUMNS], dtype=np.float32) * self.scale + self.offset
+
+    def unscale_close(self, value):
+        return (value - self.offset[0]) / self.scale[0]
+
+    def warm_up(self, raw):
+        """Fill the input window and indicator state from a raw OHLCV frame"""
+        from datastore import to_epoch
+        from features import build_features
+
+        processed, engine = build_features(raw)
+        rows = processed[FEATURE_COLUMNS].to_numpy(dtype=np.float32)[-WINDOW:]
+        with self._lock:
+            self.indicators = engine
+            self.last_bar_time = int(to_epoch(raw["timestamp"])[-1]) if len(raw) else None
+            self.window.clear()
+            self.window.extend(rows * self.scale + self.offset)
+        logger.info(f"Prediction window warmed up with {len(self.window)} bars")
+
+    def add_bar(self, close, timestamp=None):
+        """Push a closed bar: update the indicators and roll the scaled window"""
+        with self._lock:
+            self._add_bar(close, timestamp)
+
+    def _add_bar(self, close, timestamp):
+        if self.indicators is None:
+            raise RuntimeError("PredictionService.warm_up() must be called before bars are added")
+        row = self.indicators.update(close)
+        if all(v is not None for v in row.values()):
+            self.window.append(self.scale_row({**row, "close": close}))
+        if timestamp is not None:
+            self.last_bar_time = int(timestamp)
+
+    def add_bars(self, bars, now=None, bar_seconds=BAR_SECONDS):
+        """
+        Push the bars (CANDLE_DTYPE array or dict of arrays) that opened after last_bar_time and
+        have closed by `now` (epoch seconds, default the current time); returns how many were new
+        """
+        now = time.time() if now is None else now
+        timestamps = np.asarray(bars["timestamp"], dtype=np.int64)
+        closes = np.asarray(bars["close"], dtype=np.float64)
+        added = 0
+        with self._lock:
+            for timestamp, close in zip(timestamps.tolist(), closes.tolist()):
+                if (self.last_bar_time is None or timestamp > self.last_bar_time) and timestamp + bar_seconds <= now:
+                    self._add_bar(close, timestamp)
+                    added += 1
+        return added
+
+    @property
+    def ready(self):
+        return len(self.window) == WINDOW
+
+    def current_input(self):
+        with self._lock:
+            if len(self.window) < WINDOW:
+                raise ValueError(f"Need {WINDOW} bars of history, have {len(self.window)}")
+            return np.stack(self.window)
+
+    def predict(self, window=None, timeout=10):
+        """Forecast the next close (in rupees) for a scaled (60, 8) window, or the current one"""
+        if window is None:
+            window = self.current_input()
+        future = Future()
+        self._requests.put((np.asarray(window, dtype=np.float32), time.perf_counter(), future))
+        return future.result(timeout)
+
+    def _batch_loop(self):
+        while True:
+            batch = [self._requests.get()]
+            deadline = time.perf_counter() + self.max_wait
+            # Collect whatever else arrives within max_wait, up to max_batch
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                try:
+                    batch.append(self._requests.get(timeout=max(remaining, 0)))
+                except queue.Empty:
+                    break
+            try:
+                outputs = self.forward(np.stack([item[0] for item in batch]))
+                for (_, _, future), value in zip(batch, outputs):
+                    future.set_result(float(self.unscale_close(value)))
+            except Exception as e:
+                logger.error(f"Prediction failed: {str(e)}")
+                for _, _, future in batch:
+                    future.set_exception(e)
+            finished = time.perf_counter()
+            self.batch_sizes.append(len(batch))
+            self.latencies.extend(finished - submitted for _, submitted, _ in batch)
+
+    def latency_report(self):
+        return {
+            "predictions": len(self.latencies),
+            "mean_batch_size": round(float(np.mean(self.batch_sizes)), 2) if self.batch_sizes else None,
+            "latency_ms": latency_percentiles(self.latencies),
+        }
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_prediction_service(raw_path="RELIANCE_3months_raw.csv"):
+    """Process-wide service, loaded and warmed up on first use"""
+    global _service
+    with _service_lock:
+        if _service is None:
+            from datastore import load_frame
+
+            service = PredictionService()
+            service.warm_up(load_frame(raw_path))
+            _service = service
+        return _service
+
+
+if __name__ == "__main__":
+    # Load once, then fire concurrent requests to show batching and latency
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    start = time.perf_counter()
+    service = get_prediction_service()
+    print(f"Loaded and warmed up in {time.perf_counter() - start:.2f}s")
+    print(f"Next-bar forecast: {service.predict():.2f}")
+
+    window = service.current_input()
+    threads = [threading.Thread(target=lambda: [service.predict(window) for _ in range(25)]) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    print(service.latency_report())
@@ -0,0 +1,193 @@
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+
+from candle_store import IST
+
+logger = logging.getLogger("Instruments")
+
+SCRIP_MASTER_URL = "https://margincalculator.angelbroking.com/OpenAPI_File/files/OpenAPIScripMaster.json"
+CACHE_DIR = "instrument_master"
+
+# Scrip master fields stored as fixed-width byte columns / numeric columns
+TEXT_COLUMNS = ["token", "symbol", "name", "exch_seg", "instrumenttype", "expiry"]
+NUMERIC_COLUMNS = {"strike": np.float64, "lotsize": np.int32, "tick_size": np.float64}
+
+
+def _today():
+    return datetime.now(IST).date().isoformat()
+
+
+def download_scrip_master(url=SCRIP_MASTER_URL, timeout=60):
+    import requests
+
+    start = time.perf_counter()
+    response = requests.get(url, timeout=timeout)
+    response.raise_for_status()
+    records = response.json()
+    logger.info(f"Downloaded {len(records)} instruments in {time.perf_counter() - start:.1f}s")
+    return records
+
+
+def write_cache(records, cache_dir=CACHE_DIR):
+    """
+    Store the scrip master as one .npy file per column (memory-mappable) plus a small meta file.
+    The files are written to a temporary directory that then replaces cache_dir, so a reader
+    never sees a mix of old and new columns (masters already loaded keep their mapped files).
+    """
+    cache_dir = os.path.abspath(cache_dir)
+    temp_dir = tempfile.mkdtemp(prefix=os.path.basename(cache_dir) + ".", dir=os.path.dirname(cache_dir))
+    old_dir = temp_dir + ".old"
+    try:
+        for column in TEXT_COLUMNS:
+            values = [str(r.get(column, "") or "").encode() for r in records]
+            np.save(os.path.join(temp_dir, f"{column}.npy"), np.array(values, dtype=bytes))
+        for column, dtype in NUMERIC_COLUMNS.items():
+            values = []
+            for r in records:
+                try:
+                    values.append(float(r.get(column) or 0))
+                except ValueError:
+                    values.append(0)
+            np.save(os.path.join(temp_dir, f"{column}.npy"), np.array(values).astype(dtype))
+        with open(os.path.join(temp_dir, "meta.json"), "w") as f:
+            json.dump({"date": _today(), "rows": len(records)}, f)
+
+        # A directory can't be replaced in one step while it has files: move the old one aside first
+        if os.path.exists(cache_dir):
+            os.rename(cache_dir, old_dir)
+        os.rename(temp_dir, cache_dir)
+    except BaseException:
+        if os.path.exists(old_dir) and not os.path.exists(cache_dir):
+            os.rename(old_dir, cache_dir)
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        raise
+    shutil.rmtree(old_dir, ignore_errors=True)
+
+
+class InstrumentMaster:
+    """
+    Angel One instrument master loaded from the on-disk column files with mmap, so startup
+    costs a few file opens. Lookup indexes (plain dicts, O(1)) are built on first use.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR):
+        self.cache_dir = cache_dir
+        with open(os.path.join(cache_dir, "meta.json")) as f:
+            self.meta = json.load(f)
+        self.columns = {
+            column: np.load(os.path.join(cache_dir, f"{column}.npy"), mmap_mode="r")
+            for column in TEXT_COLUMNS + list(NUMERIC_COLUMNS)
+        }
+        self._symbol_index = None
+        self._token_index = None
+        self._exchange_rows = {}
+        self._records = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self.meta["rows"]
+
+    @property
+    def date(self):
+        return self.meta["date"]
+
+    def _build_indexes(self):
+        with self._lock:
+            if self._symbol_index is not None:
+                return
+            rows = range(len(self))
+            exchanges = self.columns["exch_seg"].tolist()
+            self._token_index = dict(zip(zip(exchanges, self.columns["token"].tolist()), rows))
+            self._symbol_index = dict(zip(zip(exchanges, self.columns["symbol"].tolist()), rows))
+
+    def row(self, index):
+        """Instrument dict for a row, in the same shape as AngelOneAPI.reliance_token (plus master fields)"""
+        record = self._records.get(index)
+        if record is None:
+            record = {column: self.columns[column][index].item() for column in self.columns}
+            for column in TEXT_COLUMNS:
+                record[column] = record[column].decode()
+            record["exchange"] = record.pop("exch_seg")
+            self._records[index] = record
+        return record
+
+    def by_symbol(self, symbol, exchange="NSE"):
+        if self._symbol_index is None:
+            self._build_indexes()
+        row = self._symbol_index.get((exchange.encode(), symbol.encode()))
+        return None if row is None else self.row(row)
+
+    def by_token(self, token, exchange="NSE"):
+        if self._token_index is None:
+            self._build_indexes()
+        row = self._token_index.get((exchange.encode(), str(token).encode()))
+        return None if row is None else self.row(row)
+
+    def exchange_rows(self, exchange):
+        """Row numbers of every instrument on an exchange"""
+        rows = self._exchange_rows.get(exchange)
+        if rows is None:
+            rows = self._exchange_rows[exchange] = np.flatnonzero(self.columns["exch_seg"] == exchange.encode())
+        return rows
+
+
+def load_instrument_master(cache_dir=CACHE_DIR, refresh=True):
+    """
+    Load the instrument master from disk, downloading it first if the cache is missing or
+    from an earlier day. A stale cache is still used if the download fails.
+    """
+    meta_path = os.path.join(cache_dir, "meta.json")
+    cached_date = None
+    if os.path.exists(meta_path):
+        with open(meta_path) as f:
+            cached_date = json.load(f).get("date")
+
+    if refresh and cached_date != _today():
+        try:
+            write_cache(download_scrip_master(), cache_dir)
+        except Exception as e:
+            if cached_date is None:
+                raise
+            logger.warning(f"Instrument master download failed, using cache from {cached_date}: {str(e)}")
+    return InstrumentMaster(cache_dir)
+
+
+_master = None
+_master_lock = threading.Lock()
+
+
+def get_instrument_master():
+    """Process-wide instrument master, loaded on first use (None if it can't be loaded)"""
+    global _master
+    with _master_lock:
+        if _master is None:
+            try:
+                _master = load_instrument_master()
+            except Exception as e:
+                logger.error(f"Error loading instrument master: {str(e)}")
+        return _master
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    start = time.perf_counter()
+    master = load_instrument_master()
+    load_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    reliance = master.by_symbol("RELIANCE-EQ")
+    first_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    for _ in range(10000):
+        master.by_token("2885")
+    lookup_us = (time.perf_counter() - start) / 10000 * 1e6
+    print(f"{len(master)} instruments from {master.date}: load {load_ms:.2f} ms, "
+          f"first lookup (builds index) {first_ms:.1f} ms, then {lookup_us:.2f} us/lookup")
+    print(reliance)
@@ -0,0 +1,279 @@
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from candle_store import IST, IST_OFFSET
+from datastore import format_epoch, load_frame, to_epoch
+from trade_stats import TradeStats
+
+logger = logging.getLogger("Journal")
+
+JOURNAL_PATH = "trade_journal.db"
+TRADE_LOG_COLUMNS = ["Entry Time", "Direction", "Entry Price", "Exit Time", "Exit Price", "Result", "PnL"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS trades (
+    id INTEGER PRIMARY KEY,
+    entry_time INTEGER NOT NULL,
+    trade_date TEXT NOT NULL,
+    direction TEXT NOT NULL,
+    entry_price REAL,
+    exit_time INTEGER,
+    exit_price REAL,
+    result TEXT,
+    pnl REAL,
+    source TEXT
+);
+CREATE INDEX IF NOT EXISTS trades_date ON trades (trade_date);
+CREATE INDEX IF NOT EXISTS trades_direction ON trades (direction, trade_date);
+CREATE INDEX IF NOT EXISTS trades_result ON trades (result, trade_date);
+
+CREATE TABLE IF NOT EXISTS orders (
+    id INTEGER PRIMARY KEY,
+    time REAL NOT NULL,
+    trade_date TEXT NOT NULL,
+    live INTEGER NOT NULL,
+    exchange TEXT,
+    symbol TEXT,
+    token TEXT,
+    direction TEXT,
+    order_type TEXT,
+    product_type TEXT,
+    quantity INTEGER,
+    price REAL,
+    status INTEGER,
+    order_id TEXT,
+    message TEXT
+);
+CREATE INDEX IF NOT EXISTS orders_date ON orders (trade_date);
+CREATE INDEX IF NOT EXISTS orders_direction ON orders (direction, trade_date);
+CREATE INDEX IF NOT EXISTS orders_status ON orders (status, trade_date);
+
+CREATE TABLE IF NOT EXISTS trade_stats (
+    name TEXT PRIMARY KEY,
+    last_id INTEGER NOT NULL,
+    state TEXT NOT NULL
+);
+"""
+
+
+def _trade_date(epoch):
+    return time.strftime("%Y-%m-%d", time.gmtime(int(epoch) + IST_OFFSET))
+
+
+def _epoch(value):
+    """One timestamp (string, datetime or epoch seconds; naive times are IST) -> epoch seconds"""
+    if value is None or isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=IST)
+    return int(value.timestamp())
+
+
+class TradeJournal:
+    """
+    Append-only record of trades and orders in SQLite (WAL mode), so every append is one
+    indexed INSERT regardless of history length and several processes can write at once.
+    Each thread gets its own connection.
+    """
+
+    def __init__(self, path=JOURNAL_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._connect().executescript(SCHEMA)
+
+    def _connect(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def record_trade(self, trade, source="dashboard"):
+        """Append a trade given as a trade-log row (keys as in TRADE_LOG_COLUMNS); returns its id"""
+        entry_time = _epoch(trade["Entry Time"])
+        cursor = self._connect().execute(
+            "INSERT INTO trades (entry_time, trade_date, direction, entry_price, exit_time, exit_price, result, pnl, source)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (entry_time, _trade_date(entry_time), trade["Direction"], trade.get("Entry Price"),
+             _epoch(trade.get("Exit Time")), trade.get("Exit Price"), trade.get("Result"), trade.get("PnL"), source))
+        return cursor.lastrowid
+
+    def record_trades(self, log_df, source="import"):
+        """Append a whole trade-log frame in one transaction"""
+        entry_times = to_epoch(log_df["Entry Time"]).tolist()
+        exit_times = to_epoch(log_df["Exit Time"]).tolist()
+        rows = [
+            (entry, _trade_date(entry), row[1], row[2], exit_, row[4], row[5], row[6], source)
+            for entry, exit_, row in zip(entry_times, exit_times, log_df[TRADE_LOG_COLUMNS].itertuples(index=False))
+        ]
+        connection = self._connect()
+        with connection:
+            connection.execute("BEGIN")
+            connection.executemany(
+                "INSERT INTO trades (entry_time, trade_date, direction, entry_price, exit_time, exit_price, result, pnl, source)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        return len(rows)
+
+    def record_order(self, order_params, response, live):
+        """
+        Append an order sent through place_order (live or simulated) with the broker's response:
+        a SmartAPI reply dict, or the bare order id (None on failure) that SmartConnect.placeOrder returns
+        """
+        now = time.time()
+        if not isinstance(response, dict):
+            response = {"status": bool(response), "data": {"orderid": str(response)} if response else None}
+        data = response.get("data") or {}
+        cursor = self._connect().execute(
+            "INSERT INTO orders (time, trade_date, live, exchange, symbol, token, direction, order_type,"
+            " product_type, quantity, price, status, order_id, message) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (now, _trade_date(now), int(live), order_params.get("exchange"), order_params.get("tradingsymbol"),
+             order_params.get("symboltoken"), order_params.get("transactiontype"), order_params.get("ordertype"),
+             order_params.get("producttype"), order_params.get("quantity"), order_params.get("price"),
+             int(bool(response.get("status"))), data.get("orderid") if isinstance(data, dict) else None,
+             response.get("message")))
+        return cursor.lastrowid
+
+    def _where(self, start, end, filters):
+        clauses, params = [], []
+        if start:
+            clauses.append("trade_date >= ?")
+            params.append(str(start)[:10])
+        if end:
+            clauses.append("trade_date <= ?")
+            params.append(str(end)[:10])
+        for column, value in filters.items():
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def trades(self, start=None, end=None, direction=None, result=None, since_id=None, limit=None):
+        """Trades as a trade-log frame (TRADE_LOG_COLUMNS plus id), oldest first"""
+        where, params = self._where(start, end, {"direction": direction, "result": result})
+        if since_id is not None:
+            where += (" AND" if where else " WHERE") + " id > ?"
+            params.append(since_id)
+        query = ("SELECT id, entry_time, direction, entry_price, exit_time, exit_price, result, pnl FROM trades"
+                 f"{where} ORDER BY id" + (f" LIMIT {int(limit)}" if limit else ""))
+        rows = self._connect().execute(query, params).fetchall()
+        df = pd.DataFrame(rows, columns=["id"] + TRADE_LOG_COLUMNS)
+        for column in ("Entry Time", "Exit Time"):
+            # Open trades have no exit yet: keep their exit time None rather than formatting a 0
+            present = df[column].notna().to_numpy()
+            times = df[column].astype(object).where(present, None)
+            times[present] = format_epoch(times[present].astype("int64"))
+            df[column] = times
+        return df
+
+    def orders(self, start=None, end=None, direction=None, status=None, live=None):
+        where, params = self._where(start, end, {"direction": direction, "status": status, "live": live})
+        return pd.read_sql_query(f"SELECT * FROM orders{where} ORDER BY id", self._connect(), params=params)
+
+    def last_trade_id(self):
+        """Id of the newest trade (0 if none); changes on every append"""
+        return self._connect().execute("SELECT COALESCE(MAX(id), 0) FROM trades").fetchone()[0]
+
+    def stats(self):
+        """
+        Performance statistics over all trades. The aggregate is stored in the journal with the
+        id of the last trade it includes; each call only folds in trades added since then.
+        """
+        connection = self._connect()
+        with connection:
+            connection.execute("BEGIN IMMEDIATE")
+            row = connection.execute("SELECT last_id, state FROM trade_stats WHERE name = 'all'").fetchone()
+            last_id, stats = (row[0], TradeStats.from_dict(json.loads(row[1]))) if row else (0, TradeStats())
+            new = connection.execute("SELECT id, pnl FROM trades WHERE id > ? ORDER BY id", (last_id,)).fetchall()
+            if new:
+                stats.extend(pnl for _, pnl in new)
+                connection.execute("INSERT OR REPLACE INTO trade_stats (name, last_id, state) VALUES ('all', ?, ?)",
+                                   (new[-1][0], json.dumps(stats.to_dict())))
+        return stats
+
+    def import_trade_log(self, path):
+        """Seed an empty journal from a trade-log CSV/table; returns the number of trades imported"""
+        if self.last_trade_id() or not os.path.exists(path):
+            return 0
+        count = self.record_trades(load_frame(path, time_strings=True))
+        logger.info(f"Imported {count} trades from {path}")
+        return count
+
+    def close(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+
+_journal = None
+_journal_lock = threading.Lock()
+
+
+def get_journal(path=JOURNAL_PATH):
+    """Process-wide journal, opened on first use"""
+    global _journal
+    with _journal_lock:
+        if _journal is None:
+            _journal = TradeJournal(path)
+        return _journal
+
+
+def benchmark(path, trades=(1000, 10000, 50000), samples=200):
+    """Mean cost of one record_trade as the journal grows"""
+    journal = TradeJournal(path)
+    row = {"Entry Time": "2025-04-02 09:35:00+05:30", "Direction": "BUY", "Entry Price": 1252.05,
+           "Exit Time": "2025-04-02 09:50:00+05:30", "Exit Price": 1288.4, "Result": "TP", "PnL": 36.35}
+    template = pd.DataFrame([row] * 1000)
+    results = {}
+    for size in trades:
+        while journal.last_trade_id() < size:
+            journal.record_trades(template)
+        start = time.perf_counter()
+        for _ in range(samples):
+            journal.record_trade(row)
+        results[size] = round((time.perf_counter() - start) / samples * 1000, 3)
+    journal.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite trade and order journal")
+    parser.add_argument("command", choices=["import", "trades", "orders", "stats", "benchmark"])
+    parser.add_argument("--journal", default=JOURNAL_PATH)
+    parser.add_argument("--log", default="reliance_backtest_realistic_log.csv", help="Trade log to import")
+    parser.add_argument("--from", dest="start")
+    parser.add_argument("--to", dest="end")
+    parser.add_argument("--direction")
+    parser.add_argument("--result")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    if args.command == "benchmark":
+        print(f"ms per append by journal size: {benchmark(args.journal)}")
+        return
+    journal = TradeJournal(args.journal)
+    if args.command == "import":
+        print(f"Imported {journal.import_trade_log(args.log)} trades")
+    elif args.command == "stats":
+        print(json.dumps(journal.stats().summary(), indent=2))
+    elif args.command == "trades":
+        print(journal.trades(args.start, args.end, args.direction, args.result).to_string(index=False))
+    else:
+        print(journal.orders(args.start, args.end, args.direction).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
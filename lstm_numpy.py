@@ -0,0 +1,158 @@
+import argparse
+import io
+import json
+import logging
+import time
+import zipfile
+
+import numpy as np
+
+logger = logging.getLogger("LSTMNumpy")
+
+MODEL_PATH = "2nd_reliance_lstm_pso.keras"
+SCALER_PATH = "scaler_final.pkl"
+WEIGHTS_PATH = "lstm_weights.npz"
+
+
+def export_weights(model_path=MODEL_PATH, scaler_path=SCALER_PATH, out_path=WEIGHTS_PATH):
+    """
+    Pull the LSTM/Dense weights out of the .keras archive (config.json + model.weights.h5)
+    and the MinMaxScaler parameters out of the pickle into one .npz. Needs h5py and joblib,
+    but not TensorFlow.
+    """
+    import h5py
+    import joblib
+
+    arrays = {}
+    with zipfile.ZipFile(model_path) as archive:
+        config = json.loads(archive.read("config.json"))
+        weights = h5py.File(io.BytesIO(archive.read("model.weights.h5")), "r")
+        layers = [layer for layer in config["config"]["layers"] if layer["class_name"] in ("LSTM", "Dense")]
+
+        # Weight groups are named by class, numbered in order of appearance: lstm, lstm_1, dense, ...
+        seen = {}
+        for position, layer in enumerate(layers):
+            kind = layer["class_name"].lower()
+            group = kind if kind not in seen else f"{kind}_{seen[kind]}"
+            seen[kind] = seen.get(kind, 0) + 1
+            variables = weights[f"layers/{group}/cell/vars" if kind == "lstm" else f"layers/{group}/vars"]
+            names = ("kernel", "recurrent_kernel", "bias") if kind == "lstm" else ("kernel", "bias")
+            for index, name in enumerate(names):
+                arrays[f"{position}_{kind}_{name}"] = np.asarray(variables[str(index)], dtype=np.float32)
+        weights.close()
+
+    scaler = joblib.load(scaler_path)
+    arrays["scaler_scale"] = np.asarray(scaler.scale_, dtype=np.float32)
+    arrays["scaler_min"] = np.asarray(scaler.min_, dtype=np.float32)
+    np.savez(out_path, **arrays)
+    logger.info(f"Exported {len(layers)} layers and scaler to {out_path}")
+    return out_path
+
+
+def _sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+class NumpyLSTM:
+    """
+    NumPy forward pass of the exported Sequential(LSTM, Dropout, LSTM, Dropout, Dense) model.
+    Gate layout follows Keras: [input, forget, cell, output] along the last kernel axis.
+    """
+
+    def __init__(self, path=WEIGHTS_PATH):
+        data = np.load(path)
+        self.scale = data["scaler_scale"]
+        self.offset = data["scaler_min"]
+        self.layers = []
+        position = 0
+        while f"{position}_lstm_kernel" in data or f"{position}_dense_kernel" in data:
+            if f"{position}_lstm_kernel" in data:
+                self.layers.append(("lstm", data[f"{position}_lstm_kernel"],
+                                    data[f"{position}_lstm_recurrent_kernel"], data[f"{position}_lstm_bias"]))
+            else:
+                self.layers.append(("dense", data[f"{position}_dense_kernel"], data[f"{position}_dense_bias"]))
+            position += 1
+
+    @staticmethod
+    def _lstm(x, kernel, recurrent_kernel, bias, return_sequences):
+        batch, steps, _ = x.shape
+        units = recurrent_kernel.shape[0]
+        # Input projections for every timestep in one matmul
+        projected = x @ kernel + bias
+        h = np.zeros((batch, units), dtype=np.float32)
+        c = np.zeros((batch, units), dtype=np.float32)
+        outputs = np.empty((batch, steps, units), dtype=np.float32) if return_sequences else None
+        for t in range(steps):
+            z = projected[:, t] + h @ recurrent_kernel
+            i = _sigmoid(z[:, :units])
+            f = _sigmoid(z[:, units:2 * units])
+            g = np.tanh(z[:, 2 * units:3 * units])
+            o = _sigmoid(z[:, 3 * units:])
+            c = f * c + i * g
+            h = o * np.tanh(c)
+            if return_sequences:
+                outputs[:, t] = h
+        return outputs if return_sequences else h
+
+    def __call__(self, batch):
+        """Scaled inputs (batch, 60, 8) -> scaled next close (batch,)"""
+        x = np.asarray(batch, dtype=np.float32)
+        lstm_layers = sum(1 for layer in self.layers if layer[0] == "lstm")
+        seen = 0
+        for layer in self.layers:
+            if layer[0] == "lstm":
+                seen += 1
+                x = self._lstm(x, *layer[1:], return_sequences=seen < lstm_layers)
+            else:
+                x = x @ layer[1] + layer[2]
+        return x.reshape(-1)
+
+
+def verify(weights_path=WEIGHTS_PATH, model_path=MODEL_PATH, samples=64, tolerance=1e-4):
+    """Compare the NumPy forward pass with Keras on random scaled windows (needs TensorFlow)"""
+    import keras
+
+    model = keras.models.load_model(model_path, compile=False)
+    x = np.random.default_rng(0).random((samples, 60, 8), dtype=np.float32)
+    expected = np.asarray(model(x, training=False)).reshape(-1)
+    actual = NumpyLSTM(weights_path)(x)
+    error = float(np.abs(expected - actual).max())
+    return error, error <= tolerance
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the LSTM-PSO model for TensorFlow-free inference")
+    parser.add_argument("command", choices=["export", "verify", "bench"])
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--scaler", default=SCALER_PATH)
+    parser.add_argument("--weights", default=WEIGHTS_PATH)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    if args.command == "export":
+        export_weights(args.model, args.scaler, args.weights)
+    elif args.command == "verify":
+        error, ok = verify(args.weights, args.model)
+        print(f"{'OK' if ok else 'MISMATCH'}: max abs difference vs Keras {error:.2e}")
+        raise SystemExit(0 if ok else 1)
+    else:
+        start = time.perf_counter()
+        model = NumpyLSTM(args.weights)
+        load_ms = (time.perf_counter() - start) * 1000
+        x = np.random.default_rng(0).random((1, 60, 8), dtype=np.float32)
+        model(x)
+        start = time.perf_counter()
+        for _ in range(200):
+            model(x)
+        single_ms = (time.perf_counter() - start) / 200 * 1000
+        batch = np.repeat(x, 32, axis=0)
+        start = time.perf_counter()
+        for _ in range(50):
+            model(batch)
+        batch_ms = (time.perf_counter() - start) / 50 * 1000
+        print(f"load {load_ms:.2f} ms, single window {single_ms:.3f} ms, batch of 32 {batch_ms:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,456 @@
+import base64
+import hashlib
+import json
+import logging
+import socket
+import struct
+import threading
+import time
+
+logger = logging.getLogger("MarketFeed")
+
+# SmartAPI WebSocket V2 endpoint
+FEED_URL = "wss://smartapisocket.angelone.in/smartstream"
+
+# Exchange codes used by the SmartAPI streaming protocol
+EXCHANGE_TYPES = {"NSE": 1, "NFO": 2, "BSE": 3, "BFO": 4, "MCX": 5, "NCX": 7, "CDS": 13}
+
+# Subscription modes (we only need LTP)
+LTP_MODE = 1
+SUBSCRIBE_ACTION = 1
+UNSUBSCRIBE_ACTION = 0
+
+# Binary LTP packet: mode, exchange type, token (25 bytes), sequence, exchange time (ms), ltp (paise)
+LTP_PACKET = struct.Struct("<BB25sqqq")
+
+
+def parse_tick(message):
+    """Decode a binary LTP packet from the SmartAPI feed"""
+    mode, exchange_type, raw_token, sequence, exchange_time, ltp = LTP_PACKET.unpack_from(message)
+    return {
+        "mode": mode,
+        "exchange_type": exchange_type,
+        "token": raw_token.split(b"\x00", 1)[0].decode(),
+        "sequence": sequence,
+        "exchange_timestamp": exchange_time / 1000.0,
+        "ltp": ltp / 100.0,
+    }
+
+
+def encode_tick(token, ltp, exchange_timestamp, sequence=0, exchange_type=1):
+    """Encode a tick the same way the SmartAPI feed does (used by the replay server)"""
+    return LTP_PACKET.pack(LTP_MODE, exchange_type, token.encode(), sequence,
+                           int(exchange_timestamp * 1000), int(round(ltp * 100)))
+
+
+class TickBuffer:
+    """Fixed-size ring buffer holding the most recent ticks of one instrument"""
+
+    def __init__(self, capacity=4096):
+        self.capacity = capacity
+        self._prices = [0.0] * capacity
+        self._exchange_times = [0.0] * capacity
+        self._received_times = [0.0] * capacity
+        self._count = 0
+        self._lock = threading.Lock()
+        # (price, exchange_time, received_time) of the newest tick; swapped atomically
+        self._latest = None
+
+    def append(self, price, exchange_time, received_time):
+        with self._lock:
+            idx = self._count % self.capacity
+            self._prices[idx] = price
+            self._exchange_times[idx] = exchange_time
+            self._received_times[idx] = received_time
+            self._count += 1
+        self._latest = (price, exchange_time, received_time)
+
+    def latest(self):
+        """Return (price, exchange_time, received_time) of the newest tick, or None"""
+        return self._latest
+
+    def last(self, n=None):
+        """Return up to n most recent prices, oldest first"""
+        with self._lock:
+            size = min(self._count, self.capacity)
+            n = size if n is None else min(n, size)
+            start = self._count - n
+            return [self._prices[i % self.capacity] for i in range(start, self._count)]
+
+    def __len__(self):
+        return min(self._count, self.capacity)
+
+
+class MarketFeed:
+    """
+    Streaming LTP feed over the SmartAPI WebSocket.
+    Ticks are pushed into per-token ring buffers so readers never wait on the network.
+    The connection is re-established (and every subscription re-sent) whenever it drops.
+    If credentials is given, credentials() -> (feed_token, auth_token) is called before every
+    (re)connect, so a reconnect after the session was renewed uses the current tokens.
+    """
+
+    def __init__(self, api_key, client_code, feed_token, auth_token, url=FEED_URL,
+                 capacity=4096, heartbeat_interval=10, max_reconnect_delay=30, credentials=None):
+        self.api_key = api_key
+        self.client_code = client_code
+        self.feed_token = feed_token
+        self.auth_token = auth_token
+        self.credentials = credentials
+        self.url = url
+        self.capacity = capacity
+        self.heartbeat_interval = heartbeat_interval
+        self.max_reconnect_delay = max_reconnect_delay
+
+        self.buffers = {}
+        self.subscriptions = {}  # exchange_type -> set of tokens
+        self.listeners = []
+        self.connections = 0
+        self.is_connected = False
+
+        self._ws = None
+        self._thread = None
+        self._running = False
+        self._connected_event = threading.Event()
+
+    def subscribe(self, exchange, token):
+        """Subscribe to LTP updates for a token; safe to call before or after start()"""
+        exchange_type = EXCHANGE_TYPES[exchange]
+        self.subscriptions.setdefault(exchange_type, set()).add(str(token))
+        self.buffers.setdefault(str(token), TickBuffer(self.capacity))
+        if self.is_connected:
+            self._send_subscription(SUBSCRIBE_ACTION, {exchange_type: [str(token)]})
+
+    def add_listener(self, callback):
+        """Register callback(token, price, exchange_time, received_time), called on every tick"""
+        self.listeners.append(callback)
+
+    def latest(self, token, max_age=None):
+        """Return the newest tick for a token, or None if there is none (or it is older than max_age)"""
+        buffer = self.buffers.get(str(token))
+        tick = buffer.latest() if buffer else None
+        if tick is None:
+            return None
+        if max_age is not None and time.time() - tick[2] > max_age:
+            return None
+        return tick
+
+    def get_ltp(self, token, max_age=None):
+        tick = self.latest(token, max_age)
+        return tick[0] if tick else None
+
+    def start(self):
+        """Start the feed in a background thread"""
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="MarketFeed", daemon=True)
+        self._thread.start()
+
+    def wait_until_connected(self, timeout=None):
+        return self._connected_event.wait(timeout)
+
+    def stop(self):
+        """Close the socket and stop reconnecting"""
+        self._running = False
+        if self._ws:
+            try:
+                self._ws.close()
+            except Exception as e:
+                logger.warning(f"Error closing market feed: {str(e)}")
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=5)
+        logger.info("Market feed stopped")
+
+    def _run(self):
+        import websocket
+
+        delay = 1
+        while self._running:
+            if self.credentials:
+                try:
+                    self.feed_token, self.auth_token = self.credentials()
+                except Exception as e:
+                    logger.error(f"Error getting market feed credentials: {str(e)}")
+            headers = {
+                "Authorization": self.auth_token,
+                "x-api-key": self.api_key,
+                "x-client-code": self.client_code,
+                "x-feed-token": self.feed_token,
+            }
+            self._ws = websocket.WebSocketApp(
+                self.url,
+                header=headers,
+                on_open=self._on_open,
+                on_message=self._on_message,
+                on_error=self._on_error,
+                on_close=self._on_close,
+            )
+            opened_before = self.connections
+            try:
+                self._ws.run_forever(ping_interval=self.heartbeat_interval, ping_payload="ping")
+            except Exception as e:
+                logger.error(f"Market feed error: {str(e)}")
+            self.is_connected = False
+            self._connected_event.clear()
+            if not self._running:
+                break
+            # Back off only while connection attempts keep failing
+            delay = 1 if self.connections > opened_before else min(delay * 2, self.max_reconnect_delay)
+            logger.warning(f"Market feed disconnected, reconnecting in {delay}s")
+            time.sleep(delay)
+
+    def _on_open(self, ws):
+        self.is_connected = True
+        self.connections += 1
+        logger.info("Market feed connected")
+        # Resubscribe everything after every (re)connect
+        if self.subscriptions:
+            self._send_subscription(SUBSCRIBE_ACTION, self.subscriptions)
+        self._connected_event.set()
+
+    def _send_subscription(self, action, subscriptions):
+        request = {
+            "correlationID": "reliancebot",
+            "action": action,
+            "params": {
+                "mode": LTP_MODE,
+                "tokenList": [
+                    {"exchangeType": exchange_type, "tokens": sorted(tokens)}
+                    for exchange_type, tokens in subscriptions.items()
+                ],
+            },
+        }
+        try:
+            self._ws.send(json.dumps(request))
+        except Exception as e:
+            logger.error(f"Error sending subscription: {str(e)}")
+
+    def _on_message(self, ws, message):
+        if isinstance(message, str):
+            # Heartbeat replies ("pong") and control messages
+            return
+        received_time = time.time()
+        try:
+            tick = parse_tick(message)
+        except struct.error as e:
+            logger.warning(f"Malformed tick packet: {str(e)}")
+            return
+        buffer = self.buffers.get(tick["token"])
+        if buffer is None:
+            buffer = self.buffers.setdefault(tick["token"], TickBuffer(self.capacity))
+        buffer.append(tick["ltp"], tick["exchange_timestamp"], received_time)
+        for callback in self.listeners:
+            try:
+                callback(tick["token"], tick["ltp"], tick["exchange_timestamp"], received_time)
+            except Exception as e:
+                logger.error(f"Tick listener error: {str(e)}")
+
+    def _on_error(self, ws, error):
+        logger.error(f"Market feed error: {error}")
+
+    def _on_close(self, ws, status_code, message):
+        self.is_connected = False
+        self._connected_event.clear()
+        logger.info(f"Market feed closed ({status_code} {message})")
+
+
+# ---------------------------------------------------------------------------
+# Offline replay server
+# ---------------------------------------------------------------------------
+
+WS_MAGIC = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+
+def load_replay_ticks(csv_path):
+    """Turn OHLCV bars into a tick sequence (open, high/low, low/high, close per bar)"""
+    from datastore import load_table
+
+    bars = load_table(csv_path)
+    ticks = []
+    for ts, o, h, l, c in zip(bars["timestamp"].tolist(), bars["open"].tolist(), bars["high"].tolist(),
+                              bars["low"].tolist(), bars["close"].tolist()):
+        # Visit the extreme nearest the open first, like a real bar would
+        path = (o, l, h, c) if c >= o else (o, h, l, c)
+        for i, price in enumerate(path):
+            ticks.append((float(ts + i), price))
+    return ticks
+
+
+class ReplayServer:
+    """
+    Minimal local WebSocket server that speaks the SmartAPI LTP protocol and replays
+    bars from RELIANCE_3months_raw.csv, so MarketFeed can be exercised without a login.
+    """
+
+    def __init__(self, csv_path="RELIANCE_3months_raw.csv", token="2885", host="127.0.0.1",
+                 port=0, ticks_per_second=0, disconnect_every=None):
+        self.ticks = load_replay_ticks(csv_path)
+        self.token = str(token)
+        self.host = host
+        self.port = port
+        self.ticks_per_second = ticks_per_second  # 0 = as fast as possible
+        self.disconnect_every = disconnect_every  # drop clients after N ticks to test reconnects
+        self.position = 0
+        self._sock = None
+        self._running = False
+
+    @property
+    def url(self):
+        return f"ws://{self.host}:{self.port}"
+
+    def start(self):
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._sock.bind((self.host, self.port))
+        self.port = self._sock.getsockname()[1]
+        self._sock.listen(5)
+        self._running = True
+        threading.Thread(target=self._accept_loop, name="ReplayServer", daemon=True).start()
+        logger.info(f"Replay server listening on {self.url} ({len(self.ticks)} ticks)")
+        return self
+
+    def stop(self):
+        self._running = False
+        if self._sock:
+            self._sock.close()
+
+    @property
+    def finished(self):
+        return self.position >= len(self.ticks)
+
+    def _accept_loop(self):
+        while self._running:
+            try:
+                conn, _ = self._sock.accept()
+            except OSError:
+                break
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn):
+        try:
+            self._handshake(conn)
+            lock = threading.Lock()
+            streaming = None
+            while self._running:
+                opcode, payload = self._read_frame(conn)
+                if opcode is None or opcode == 0x8:
+                    break
+                if opcode == 0x9:
+                    with lock:
+                        self._send_frame(conn, 0xA, payload)
+                elif opcode == 0x1:
+                    text = payload.decode()
+                    if text == "ping":
+                        with lock:
+                            self._send_frame(conn, 0x1, b"pong")
+                        continue
+                    request = json.loads(text)
+                    tokens = {t for entry in request["params"]["tokenList"] for t in entry["tokens"]}
+                    if request.get("action") == SUBSCRIBE_ACTION and self.token in tokens and streaming is None:
+                        streaming = threading.Thread(target=self._stream, args=(conn, lock), daemon=True)
+                        streaming.start()
+        except (OSError, ValueError):
+            pass
+        finally:
+            conn.close()
+
+    def _stream(self, conn, lock):
+        interval = 1.0 / self.ticks_per_second if self.ticks_per_second else 0
+        sent = 0
+        try:
+            while self._running and self.position < len(self.ticks):
+                ts, price = self.ticks[self.position]
+                with lock:
+                    self._send_frame(conn, 0x2, encode_tick(self.token, price, ts, self.position))
+                self.position += 1
+                sent += 1
+                if self.disconnect_every and sent >= self.disconnect_every:
+                    conn.shutdown(socket.SHUT_RDWR)
+                    return
+                if interval:
+                    time.sleep(interval)
+        except OSError:
+            pass
+
+    @staticmethod
+    def _handshake(conn):
+        request = b""
+        while b"\r\n\r\n" not in request:
+            chunk = conn.recv(4096)
+            if not chunk:
+                raise OSError("client closed during handshake")
+            request += chunk
+        key = None
+        for line in request.decode().split("\r\n"):
+            if line.lower().startswith("sec-websocket-key:"):
+                key = line.split(":", 1)[1].strip()
+        accept = base64.b64encode(hashlib.sha1((key + WS_MAGIC).encode()).digest()).decode()
+        conn.sendall((
+            "HTTP/1.1 101 Switching Protocols\r\n"
+            "Upgrade: websocket\r\nConnection: Upgrade\r\n"
+            f"Sec-WebSocket-Accept: {accept}\r\n\r\n"
+        ).encode())
+
+    @staticmethod
+    def _recv_exact(conn, n):
+        data = b""
+        while len(data) < n:
+            chunk = conn.recv(n - len(data))
+            if not chunk:
+                return None
+            data += chunk
+        return data
+
+    def _read_frame(self, conn):
+        header = self._recv_exact(conn, 2)
+        if header is None:
+            return None, None
+        opcode = header[0] & 0x0F
+        length = header[1] & 0x7F
+        if length == 126:
+            length = struct.unpack(">H", self._recv_exact(conn, 2))[0]
+        elif length == 127:
+            length = struct.unpack(">Q", self._recv_exact(conn, 8))[0]
+        mask = self._recv_exact(conn, 4) if header[1] & 0x80 else None
+        payload = self._recv_exact(conn, length) if length else b""
+        if mask:
+            payload = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+        return opcode, payload
+
+    @staticmethod
+    def _send_frame(conn, opcode, payload):
+        length = len(payload)
+        if length < 126:
+            header = struct.pack(">BB", 0x80 | opcode, length)
+        elif length < 65536:
+            header = struct.pack(">BBH", 0x80 | opcode, 126, length)
+        else:
+            header = struct.pack(">BBQ", 0x80 | opcode, 127, length)
+        conn.sendall(header + payload)
+
+
+if __name__ == "__main__":
+    # Offline end-to-end run: replay the bundled CSV through the real feed client
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    server = ReplayServer(disconnect_every=5000).start()
+    feed = MarketFeed("replay", "replay", "replay", "replay", url=server.url)
+    feed.subscribe("NSE", server.token)
+    start = time.perf_counter()
+    feed.start()
+    while not server.finished:
+        time.sleep(0.05)
+    time.sleep(0.2)
+    elapsed = time.perf_counter() - start
+    ticks = feed.buffers[server.token]._count
+
+    t0 = time.perf_counter()
+    for _ in range(100000):
+        feed.get_ltp(server.token)
+    read_us = (time.perf_counter() - t0) / 100000 * 1e6
+
+    feed.stop()
+    server.stop()
+    print(f"Received {ticks} ticks in {elapsed:.2f}s over {feed.connections} connection(s); "
+          f"latest LTP {feed.get_ltp(server.token)}; get_ltp {read_us:.2f} us/call")
@@ -0,0 +1,10 @@
+def latency_percentiles(samples):
+    """p50/p99/max of latency samples given in seconds, reported in milliseconds"""
+    if not samples:
+        return None
+    values = sorted(samples)
+
+    def pick(q):
+        return values[min(len(values) - 1, int(q * len(values)))] * 1000
+
+    return {"p50": round(pick(0.50), 3), "p99": round(pick(0.99), 3), "max": round(values[-1] * 1000, 3)}
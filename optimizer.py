@@ -0,0 +1,182 @@
+import argparse
+import itertools
+import json
+import logging
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from backtest import load_bars, run_threshold_backtest
+
+logger = logging.getLogger("Optimizer")
+
+# Bar columns shipped to the workers, in shared-memory row order
+SHARED_COLUMNS = ["open", "high", "low", "close", "volume", "day", "day_end"]
+INT_COLUMNS = {"day", "day_end"}
+
+# Logging config handed to pyswarms through LOG_CFG (read as YAML, which JSON is a subset of).
+# Without one its reporter attaches handlers to the root logger and writes report.log to the
+# working directory; this only sets the level of its own loggers.
+PYSWARMS_LOG_CONFIG = {"version": 1, "disable_existing_loggers": False,
+                       "loggers": {"pyswarms": {"level": "WARNING"}}}
+
+# Set in each worker process by _attach_bars
+_worker_shm = None
+_worker_bars = None
+
+
+class SharedBars:
+    """Bar arrays copied once into a shared-memory block that worker processes map without pickling"""
+
+    def __init__(self, bars):
+        self.length = len(bars["close"])
+        shape = (len(SHARED_COLUMNS), self.length)
+        self.shm = shared_memory.SharedMemory(create=True, size=int(np.prod(shape)) * 8)
+        block = np.ndarray(shape, dtype=np.float64, buffer=self.shm.buf)
+        for row, column in enumerate(SHARED_COLUMNS):
+            block[row] = bars[column]
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _attach_bars(name, length):
+    """Pool initializer: map the shared bar block into this worker"""
+    global _worker_shm, _worker_bars
+    _worker_shm = shared_memory.SharedMemory(name=name)
+    block = np.ndarray((len(SHARED_COLUMNS), length), dtype=np.float64, buffer=_worker_shm.buf)
+    _worker_bars = {
+        column: block[row].astype(np.int64) if column in INT_COLUMNS else block[row]
+        for row, column in enumerate(SHARED_COLUMNS)
+    }
+
+
+def _evaluate(params):
+    price_threshold, stop_loss_pct, max_trades_per_day = params
+    result = run_threshold_backtest(_worker_bars, price_threshold, stop_loss_pct, int(max_trades_per_day))
+    summary = result.summary()
+    summary.update(price_threshold=price_threshold, stop_loss_pct=stop_loss_pct,
+                   max_trades_per_day=int(max_trades_per_day))
+    return summary
+
+
+def rank_results(results):
+    """Order by total PnL (desc), then max drawdown (asc), then trade count (desc)"""
+    df = pd.DataFrame(results)
+    if df.empty:
+        return df
+    df = df.drop_duplicates(subset=["price_threshold", "stop_loss_pct", "max_trades_per_day"])
+    df = df.sort_values(["total_pnl", "max_drawdown", "trades"], ascending=[False, True, False])
+    return df.reset_index(drop=True)[
+        ["price_threshold", "stop_loss_pct", "max_trades_per_day", "total_pnl", "max_drawdown", "trades", "win_rate"]
+    ]
+
+
+def grid_search(bars, thresholds, stop_losses, max_trades, workers=None):
+    """Evaluate every parameter combination across a process pool"""
+    grid = list(itertools.product(thresholds, stop_losses, max_trades))
+    workers = workers or os.cpu_count()
+    with SharedBars(bars) as shared:
+        with ProcessPoolExecutor(workers, initializer=_attach_bars, initargs=(shared.name, shared.length)) as pool:
+            chunksize = max(1, len(grid) // (workers * 4))
+            results = list(pool.map(_evaluate, grid, chunksize=chunksize))
+    return rank_results(results)
+
+
+def _configure_pyswarms_logging():
+    """Point pyswarms at PYSWARMS_LOG_CONFIG (unless LOG_CFG is already set); call before importing it"""
+    if os.getenv("LOG_CFG"):
+        return
+    path = os.path.join(tempfile.gettempdir(), "optimizer_pyswarms_logging.json")
+    with open(path, "w") as f:
+        json.dump(PYSWARMS_LOG_CONFIG, f)
+    os.environ["LOG_CFG"] = path
+
+
+def pso_search(bars, bounds, n_particles=32, iters=40, drawdown_weight=0.5, workers=None):
+    """
+    Particle swarm search (pyswarms) over (threshold, stop-loss, max trades).
+    Each swarm step is evaluated in parallel; the cost is -PnL + drawdown_weight * max drawdown.
+    """
+    _configure_pyswarms_logging()
+    import pyswarms as ps
+
+    workers = workers or os.cpu_count()
+    evaluated = []
+    with SharedBars(bars) as shared:
+        with ProcessPoolExecutor(workers, initializer=_attach_bars, initargs=(shared.name, shared.length)) as pool:
+            def cost(positions):
+                params = [(float(t), float(s), int(round(m))) for t, s, m in positions]
+                summaries = list(pool.map(_evaluate, params))
+                evaluated.extend(summaries)
+                return np.array([-s["total_pnl"] + drawdown_weight * s["max_drawdown"] for s in summaries])
+
+            lower, upper = (np.array(b, dtype=np.float64) for b in zip(*bounds))
+            optimizer = ps.single.GlobalBestPSO(
+                n_particles=n_particles, dimensions=len(bounds),
+                options={"c1": 0.5, "c2": 0.3, "w": 0.9}, bounds=(lower, upper)
+            )
+            optimizer.optimize(cost, iters=iters, verbose=False)
+    return rank_results(evaluated)
+
+
+def _parse_range(text, cast=float):
+    """'start:stop:step' (stop inclusive) or 'a,b,c'"""
+    if ":" in text:
+        start, stop, step = (float(x) for x in text.split(":"))
+        return [cast(round(v, 6)) for v in np.arange(start, stop + step / 2, step)]
+    return [cast(x) for x in text.split(",")]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep start_automated_trading parameters over historical bars")
+    parser.add_argument("--data", default="RELIANCE_3months_raw.csv")
+    parser.add_argument("--method", choices=["grid", "pso"], default="grid")
+    parser.add_argument("--thresholds", default="1150:1320:5")
+    parser.add_argument("--stop-losses", default="0.0025:0.03:0.0025")
+    parser.add_argument("--max-trades", default="1,2,3,4,5,6,8,10")
+    parser.add_argument("--particles", type=int, default=32)
+    parser.add_argument("--iters", type=int, default=40)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--out", help="Write the full ranking to this CSV")
+    args = parser.parse_args()
+
+    bars = load_bars(args.data)
+    thresholds = _parse_range(args.thresholds)
+    stop_losses = _parse_range(args.stop_losses)
+    max_trades = _parse_range(args.max_trades, int)
+
+    start = time.perf_counter()
+    if args.method == "grid":
+        ranking = grid_search(bars, thresholds, stop_losses, max_trades, args.workers)
+    else:
+        bounds = [(min(thresholds), max(thresholds)), (min(stop_losses), max(stop_losses)),
+                  (min(max_trades), max(max_trades))]
+        ranking = pso_search(bars, bounds, args.particles, args.iters, workers=args.workers)
+    elapsed = time.perf_counter() - start
+
+    print(f"Evaluated {len(ranking)} parameter sets in {elapsed:.2f}s")
+    print(ranking.head(args.top).to_string(index=False))
+    if args.out:
+        ranking.to_csv(args.out, index=False)
+
+
+if __name__ == "__main__":
+    main()
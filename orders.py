@@ -0,0 +1,462 @@
+import argparse
+import itertools
+import logging
+import queue
+import random
+import threading
+import time
+
+from clock import WallClock
+from metrics import latency_percentiles
+
+logger = logging.getLogger("Orders")
+
+# Order lifecycle: PENDING (queued, not yet acknowledged) -> OPEN -> PARTIALLY_FILLED -> FILLED,
+# or REJECTED / CANCELLED at any point before it completes
+PENDING = "PENDING"
+OPEN = "OPEN"
+PARTIALLY_FILLED = "PARTIALLY_FILLED"
+FILLED = "FILLED"
+REJECTED = "REJECTED"
+CANCELLED = "CANCELLED"
+TERMINAL_STATES = (FILLED, REJECTED, CANCELLED)
+
+# Seconds between order book polls while any order is working
+POLL_INTERVAL = 1.0
+
+
+def broker_status(record):
+    """Lifecycle state for an Angel One order book record ("open", "complete", "rejected", ...)"""
+    status = str(record.get("orderstatus") or record.get("status") or "").lower()
+    if status == "complete":
+        return FILLED
+    if status == "rejected":
+        return REJECTED
+    if status == "cancelled":
+        return CANCELLED
+    return PARTIALLY_FILLED if int(record.get("filledshares") or 0) else OPEN
+
+
+def order_ack(response):
+    """
+    placeOrder reply as a {"status", "message", "data": {"orderid"}} dict.
+    SmartConnect.placeOrder returns only the order id (None on failure), placeOrderFullResponse the dict.
+    """
+    if isinstance(response, dict):
+        return response
+    if response:
+        return {"status": True, "message": "SUCCESS", "data": {"orderid": str(response)}}
+    return {"status": False, "message": "Order not placed"}
+
+
+class Order:
+    """One order and everything known about it; filled_quantity/average_price are cumulative"""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, params, created_at=None):
+        self.id = next(self._ids)
+        self.params = params
+        self.side = params["transactiontype"]
+        self.quantity = int(params["quantity"])
+        self.status = PENDING
+        self.order_id = None
+        self.filled_quantity = 0
+        self.average_price = None
+        self.message = None
+        self.created_at = created_at or time.time()
+        self.acked_at = None
+        self.updated_at = self.created_at
+        self._done = threading.Event()
+
+    @property
+    def is_done(self):
+        return self.status in TERMINAL_STATES
+
+    def wait(self, timeout=None):
+        """Block until the order is filled, rejected or cancelled; returns whether it is"""
+        return self._done.wait(timeout)
+
+    def to_dict(self):
+        return {"id": self.id, "order_id": self.order_id, "side": self.side, "symbol": self.params.get("tradingsymbol"),
+                "quantity": self.quantity, "status": self.status, "filled_quantity": self.filled_quantity,
+                "average_price": self.average_price, "message": self.message}
+
+    def __repr__(self):
+        return f"Order({self.to_dict()})"
+
+
+class Position:
+    """Net quantity (negative when short) with its volume-weighted average price and realized PnL"""
+
+    def __init__(self):
+        self.quantity = 0
+        self.average_price = 0.0
+        self.realized_pnl = 0.0
+
+    def apply(self, side, quantity, price):
+        signed = quantity if side == "BUY" else -quantity
+        if self.quantity == 0 or (self.quantity > 0) == (signed > 0):
+            total = abs(self.quantity) + quantity
+            self.average_price = (self.average_price * abs(self.quantity) + price * quantity) / total
+            self.quantity += signed
+            return
+        closed = min(quantity, abs(self.quantity))
+        direction = 1 if self.quantity > 0 else -1
+        self.realized_pnl += (price - self.average_price) * closed * direction
+        self.quantity += signed
+        if self.quantity == 0:
+            self.average_price = 0.0
+        elif (self.quantity > 0) != (direction > 0):
+            # Flipped through flat: the remainder opens at this fill's price
+            self.average_price = price
+
+    def to_dict(self):
+        return {"quantity": self.quantity, "average_price": round(self.average_price, 4),
+                "realized_pnl": round(self.realized_pnl, 4)}
+
+
+class PositionBook:
+    """Positions per (exchange, token), updated from fills"""
+
+    def __init__(self):
+        self._positions = {}
+        self._lock = threading.Lock()
+
+    def apply_fill(self, exchange, token, side, quantity, price):
+        with self._lock:
+            position = self._positions.setdefault((exchange, str(token)), Position())
+            position.apply(side, quantity, price)
+            return position.to_dict()
+
+    def get(self, exchange, token):
+        with self._lock:
+            position = self._positions.get((exchange, str(token)))
+            return position.to_dict() if position else Position().to_dict()
+
+    def snapshot(self):
+        with self._lock:
+            return {key: position.to_dict() for key, position in self._positions.items()}
+
+
+class OrderManager:
+    """
+    Non-blocking order submission and fill tracking.
+    submit() queues the order and returns at once; a worker thread sends it to the broker.
+    Working orders are tracked with one orderBook request per poll, however many there are,
+    or pushed in through on_order_update from a streaming order feed. Both give cumulative
+    fills, so each new fill is applied to the position book exactly once.
+    broker is anything with placeOrder(params) and orderBook() in SmartConnect's format.
+    Order timestamps come from `clock` (a WallClock unless replaying history).
+    """
+
+    def __init__(self, broker, poll_interval=POLL_INTERVAL, clock=None):
+        self.broker = broker
+        self.poll_interval = poll_interval
+        self.clock = clock or WallClock()
+        self.positions = PositionBook()
+        self.orders = {}
+        self.submit_latency = []
+        self.book_requests = 0
+
+        self._by_order_id = {}
+        # Orders not yet filled, rejected or cancelled, by id
+        self._working = {}
+        self._listeners = []
+        self._lock = threading.Lock()
+        self._submissions = queue.Queue()
+        self._wake = threading.Event()
+        self._running = False
+        self._threads = []
+
+    def add_listener(self, callback):
+        """callback(order) runs on every state or fill change (on the manager's threads)"""
+        self._listeners.append(callback)
+
+    def start(self):
+        if self._running:
+            return self
+        self._running = True
+        self._threads = [threading.Thread(target=self._submit_loop, name="OrderSubmit", daemon=True),
+                         threading.Thread(target=self._poll_loop, name="OrderPoll", daemon=True)]
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self):
+        self._running = False
+        self._submissions.put(None)
+        self._wake.set()
+        for thread in self._threads:
+            if thread is not threading.current_thread():
+                thread.join(timeout=5)
+        self._threads = []
+
+    def submit(self, params):
+        """Queue an order (place_order keyword arguments) and return its Order without waiting"""
+        order = Order(params, self.clock.time())
+        with self._lock:
+            self.orders[order.id] = order
+            self._working[order.id] = order
+        self._submissions.put(order)
+        return order
+
+    def working_orders(self):
+        with self._lock:
+            return list(self._working.values())
+
+    def _submit_loop(self):
+        while self._running:
+            order = self._submissions.get()
+            if order is None:
+                break
+            self._send(order)
+
+    def drain(self):
+        """Send queued orders on the calling thread (simulations drive the manager without start())"""
+        while True:
+            try:
+                order = self._submissions.get_nowait()
+            except queue.Empty:
+                return
+            if order is not None:
+                self._send(order)
+
+    def _send(self, order):
+        start = time.time()
+        try:
+            response = self.broker.placeOrder(order.params)
+        except Exception as e:
+            logger.error(f"Error placing order {order.id}: {str(e)}")
+            response = {"status": False, "message": str(e)}
+        self.submit_latency.append(time.time() - start)
+        try:
+            self._on_ack(order, order_ack(response))
+        except Exception as e:
+            # Never let one malformed reply stop the submit thread; the order cannot be tracked
+            logger.error(f"Error handling acknowledgement for order {order.id}: {str(e)}")
+            with self._lock:
+                order.message = str(e)
+                self._transition(order, REJECTED)
+            self._notify(order)
+
+    def _on_ack(self, order, response):
+        data = response.get("data")
+        order_id = data.get("orderid") if isinstance(data, dict) else None
+        with self._lock:
+            order.acked_at = self.clock.time()
+            order.message = response.get("message")
+            if response.get("status") and order_id:
+                order.order_id = str(order_id)
+                self._by_order_id[order.order_id] = order
+                self._transition(order, OPEN)
+            else:
+                logger.warning(f"Order {order.id} rejected: {order.message}")
+                self._transition(order, REJECTED)
+        self._notify(order)
+        self._wake.set()
+
+    def _poll_loop(self):
+        last_poll = 0.0
+        while self._running:
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+            # Keep polls poll_interval apart even when woken early by new acknowledgements
+            delay = last_poll + self.poll_interval - time.time()
+            if delay > 0:
+                time.sleep(delay)
+            if self._running and any(order.order_id for order in self.working_orders()):
+                last_poll = time.time()
+                self.poll()
+
+    def poll(self):
+        """Refresh every working order from a single orderBook request"""
+        self.book_requests += 1
+        try:
+            response = self.broker.orderBook()
+        except Exception as e:
+            logger.error(f"Error fetching order book: {str(e)}")
+            return
+        if not (response and response.get("status")):
+            logger.error(f"Error getting order book: {response}")
+            return
+        for record in response.get("data") or []:
+            self.on_order_update(record)
+
+    def on_order_update(self, record):
+        """Apply one order book / order feed record (cumulative filledshares and averageprice)"""
+        with self._lock:
+            order = self._by_order_id.get(str(record.get("orderid")))
+            if order is None or order.is_done:
+                return
+            changed = self._apply_fills(order, int(record.get("filledshares") or 0),
+                                        float(record.get("averageprice") or 0))
+            status = broker_status(record)
+            if status == FILLED and order.filled_quantity < order.quantity:
+                # Complete in the book before the fills are reported; wait for them
+                status = PARTIALLY_FILLED if order.filled_quantity else OPEN
+            if status != order.status:
+                if status in (REJECTED, CANCELLED):
+                    order.message = record.get("text") or order.message
+                changed = self._transition(order, status) or changed
+        if changed:
+            self._notify(order)
+
+    def _apply_fills(self, order, filled, average_price):
+        """Book the part of a cumulative fill not seen yet; returns whether anything was new"""
+        if filled <= order.filled_quantity:
+            return False
+        new_quantity = filled - order.filled_quantity
+        previous_value = (order.average_price or 0) * order.filled_quantity
+        fill_price = (average_price * filled - previous_value) / new_quantity
+        order.filled_quantity = filled
+        order.average_price = average_price
+        self.positions.apply_fill(order.params.get("exchange"), order.params.get("symboltoken"),
+                                  order.side, new_quantity, fill_price)
+        return True
+
+    def _transition(self, order, status):
+        if status == order.status:
+            return False
+        logger.info(f"Order {order.id} ({order.order_id}): {order.status} -> {status}")
+        order.status = status
+        order.updated_at = self.clock.time()
+        if order.is_done:
+            self._working.pop(order.id, None)
+            order._done.set()
+        return True
+
+    def _notify(self, order):
+        for callback in self._listeners:
+            try:
+                callback(order)
+            except Exception as e:
+                logger.error(f"Order listener error: {str(e)}")
+
+    def report(self):
+        with self._lock:
+            counts = {}
+            for order in self.orders.values():
+                counts[order.status] = counts.get(order.status, 0) + 1
+        return {"orders": counts, "book_requests": self.book_requests,
+                "submit_ms": latency_percentiles(self.submit_latency)}
+
+
+class AngelBroker:
+    """OrderManager broker backed by AngelOneAPI: orders go through place_order (journaled, LIVE_TRADING-gated)"""
+
+    def __init__(self, api):
+        self.api = api
+
+    def placeOrder(self, params):
+        return self.api.place_order(**params)
+
+    def orderBook(self):
+        if not self.api.connect():
+            return {"status": False, "message": "Connection failed"}
+        return self.api.request("orderBook")
+
+
+class MockBroker:
+    """
+    Local stand-in for SmartConnect's order endpoints. Orders are acknowledged after `latency`
+    seconds and filled in `fills` partial chunks over `fill_delay` seconds at price_fn()
+    (the limit price for LIMIT orders); reject_rate of them are rejected.
+    """
+
+    def __init__(self, price_fn=None, latency=0.05, fill_delay=0.5, fills=2, reject_rate=0.0, seed=None):
+        self.price_fn = price_fn or (lambda: 1300.0)
+        self.latency = latency
+        self.fill_delay = fill_delay
+        self.fills = fills
+        self.reject_rate = reject_rate
+        self.requests = {"placeOrder": 0, "orderBook": 0}
+        self._random = random.Random(seed)
+        self._orders = {}
+        self._ids = itertools.count(250101000000001)
+        self._lock = threading.Lock()
+
+    def placeOrder(self, params):
+        time.sleep(self.latency)
+        with self._lock:
+            self.requests["placeOrder"] += 1
+            order_id = str(next(self._ids))
+            rejected = self._random.random() < self.reject_rate
+            price = float(params.get("price") or 0) if params.get("ordertype") == "LIMIT" else None
+            self._orders[order_id] = {
+                "params": params, "placed": time.time(), "rejected": rejected, "price": price,
+                "filled": 0, "value": 0.0,
+            }
+        return {"status": True, "message": "SUCCESS", "data": {"orderid": order_id}}
+
+    def _advance(self, order):
+        """Fill the chunks that are due by now"""
+        quantity = int(order["params"]["quantity"])
+        elapsed = time.time() - order["placed"]
+        chunks = min(self.fills, int(elapsed / self.fill_delay * self.fills)) if self.fill_delay else self.fills
+        target = quantity if chunks >= self.fills else quantity * chunks // self.fills
+        if target > order["filled"]:
+            price = order["price"] if order["price"] is not None else self.price_fn()
+            order["value"] += price * (target - order["filled"])
+            order["filled"] = target
+
+    def orderBook(self):
+        time.sleep(self.latency)
+        with self._lock:
+            self.requests["orderBook"] += 1
+            records = []
+            for order_id, order in self._orders.items():
+                params = order["params"]
+                quantity = int(params["quantity"])
+                if order["rejected"]:
+                    status, text = "rejected", "RMS:Margin Exceeds"
+                else:
+                    self._advance(order)
+                    status, text = ("complete" if order["filled"] == quantity else "open"), ""
+                records.append({
+                    "orderid": order_id, "tradingsymbol": params.get("tradingsymbol"),
+                    "symboltoken": params.get("symboltoken"), "transactiontype": params.get("transactiontype"),
+                    "quantity": str(quantity), "filledshares": str(order["filled"]),
+                    "unfilledshares": str(quantity - order["filled"]),
+                    "averageprice": order["value"] / order["filled"] if order["filled"] else 0.0,
+                    "orderstatus": status, "status": status, "text": text,
+                })
+        return {"status": True, "message": "SUCCESS", "data": records}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the order manager against a local mock broker")
+    parser.add_argument("--orders", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.05, help="Mock broker round trip (s)")
+    parser.add_argument("--reject-rate", type=float, default=0.1)
+    parser.add_argument("--poll-interval", type=float, default=0.2)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    rng = random.Random(7)
+    broker = MockBroker(price_fn=lambda: round(1300 + rng.uniform(-2, 2), 2), latency=args.latency,
+                        fill_delay=0.4, fills=3, reject_rate=args.reject_rate, seed=1)
+    manager = OrderManager(broker, poll_interval=args.poll_interval).start()
+
+    start = time.perf_counter()
+    submitted = []
+    for i in range(args.orders):
+        submitted.append(manager.submit({
+            "variety": "NORMAL", "tradingsymbol": "RELIANCE-EQ", "symboltoken": "2885",
+            "transactiontype": "BUY" if i % 3 else "SELL", "exchange": "NSE", "ordertype": "MARKET",
+            "producttype": "INTRADAY", "duration": "DAY", "quantity": 10,
+        }))
+    submit_ms = (time.perf_counter() - start) * 1000
+    for order in submitted:
+        order.wait(timeout=30)
+    manager.stop()
+
+    print(f"Submitted {args.orders} orders in {submit_ms:.2f} ms "
+          f"(each broker call takes {args.latency * 1000:.0f} ms)")
+    print(f"Report: {manager.report()}")
+    print(f"Broker requests: {broker.requests}")
+    print(f"Position: {manager.positions.get('NSE', '2885')}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,307 @@
+import argparse
+import bisect
+import itertools
+import logging
+import random
+import time
+
+import numpy as np
+
+from candle_store import IST_OFFSET
+from datastore import load_table
+
+logger = logging.getLogger("Paper")
+
+RAW_DATA_PATH = "RELIANCE_3months_raw.csv"
+BAR_SECONDS = 300
+
+# Within a bar the price is taken to move open -> low -> high -> close on up bars and
+# open -> high -> low -> close on down bars, linearly between these offsets (fractions of the bar)
+PATH_OFFSETS = np.array([0.0, 0.25, 0.5, 0.75, 1.0])
+
+INSTRUMENT = {"symbol": "RELIANCE-EQ", "token": "2885", "exchange": "NSE"}
+
+
+def bar_paths(bars):
+    """(n, 5) array of the price path through each bar at PATH_OFFSETS"""
+    open_, high, low, close = (np.asarray(bars[name], dtype=np.float64) for name in ("open", "high", "low", "close"))
+    up = close >= open_
+    return np.column_stack([open_, np.where(up, low, high), np.where(up, high, low), close, close])
+
+
+def _path_segment(path, start, end):
+    """Price at `start` and the (min, max) of the path between two bar fractions"""
+    knots = PATH_OFFSETS[(PATH_OFFSETS > start) & (PATH_OFFSETS < end)]
+    points = np.interp(np.concatenate([[start], knots, [end]]), PATH_OFFSETS, path)
+    return points[0], points.min(), points.max()
+
+
+class PaperBroker:
+    """
+    interface of SmartConnect (so it can stand in for it behind OrderManager in a replay).
+    interface of SmartConnect (so it can stand in for it behind place_order and OrderManager).
+
+    Time only moves when advance() is called, so a replay runs as fast as the caller drives it.
+    An order reaches the exchange `latency` seconds (plus up to `jitter`) after it is placed.
+    From then on it is matched against the bars' price path:
+      - MARKET orders fill at the path price on arrival, LIMIT orders once the path crosses the
+        limit (at the limit, or better if the price was already through it);
+      - fills pay slippage_bps against the order, plus impact_bps per 1% of the bar's volume taken;
+      - at most `participation` of a bar's volume fills per order per bar; the rest carries over.
+    flush() ends the session: remaining MARKET orders fill at the last price, LIMIT orders are cancelled.
+    """
+
+    def __init__(self, bars, latency=0.25, jitter=0.0, slippage_bps=1.0, impact_bps=0.0, participation=0.1,
+                 bar_seconds=BAR_SECONDS, seed=None):
+        self.timestamp = np.asarray(bars["timestamp"], dtype=np.int64)
+        # Plain lists for per-call scalar lookups (bisect on a list beats np.searchsorted here)
+        self._times = self.timestamp.tolist()
+        self.volume = np.asarray(bars["volume"], dtype=np.float64)
+        self.paths = bar_paths(bars)
+        self._path_rows = self.paths.tolist()
+        self.latency = latency
+        self.jitter = jitter
+        self.slippage_bps = slippage_bps
+        self.impact_bps = impact_bps
+        self.participation = participation
+        self.bar_seconds = bar_seconds
+        self.now = float(self.timestamp[0]) if len(self.timestamp) else 0.0
+        self._random = random.Random(seed)
+        self._orders = {}
+        self._working = []
+        self._ids = itertools.count(250101000000001)
+
+    def price_at(self, t):
+        """Path price at time t (the last close when t is outside every bar)"""
+        k = bisect.bisect_right(self._times, t) - 1
+        if k < 0:
+            return self._path_rows[0][0]
+        path = self._path_rows[k]
+        position = min(1.0, (t - self._times[k]) / self.bar_seconds) * (len(path) - 1)
+        i = min(int(position), len(path) - 2)
+        return path[i] + (path[i + 1] - path[i]) * (position - i)
+
+    def placeOrder(self, params):
+        quantity = int(params.get("quantity") or 0)
+        order_type = params.get("ordertype")
+        if quantity <= 0 or order_type not in ("MARKET", "LIMIT") or params.get("transactiontype") not in ("BUY", "SELL"):
+            return {"status": False, "message": f"Unsupported order: {order_type} {params.get('transactiontype')} {quantity}"}
+        order_id = str(next(self._ids))
+        order = {
+            "orderid": order_id, "params": params, "quantity": quantity, "filled": 0, "value": 0.0,
+            "side": params["transactiontype"], "limit": float(params.get("price") or 0) if order_type == "LIMIT" else None,
+            "placed_at": self.now, "placed_price": self.price_at(self.now),
+            "arrival": self.now + self.latency + self._random.uniform(0, self.jitter),
+            "status": "open", "text": "", "bar": -1, "bar_filled": 0,
+        }
+        order["checked_until"] = order["arrival"]
+        self._orders[order_id] = order
+        self._working.append(order)
+        return {"status": True, "message": "SUCCESS", "data": {"orderid": order_id}}
+
+    def advance(self, t):
+        """Move the exchange clock to t, matching working orders against the path up to it"""
+        self.now = max(self.now, t)
+        for order in self._working:
+            self._match(order)
+        self._working = [order for order in self._working if order["status"] == "open"]
+
+    def _match(self, order):
+        while order["checked_until"] < self.now and order["status"] == "open":
+            start = order["checked_until"]
+            k = bisect.bisect_right(self._times, start) - 1
+            if k < 0 or start >= self.timestamp[k] + self.bar_seconds:
+                # Between bars (overnight, or before the first): wait for the next bar to open
+                if k + 1 >= len(self.timestamp) or self.timestamp[k + 1] > self.now:
+                    order["checked_until"] = self.now
+                    return
+                k += 1
+                start = float(self.timestamp[k])
+            bar_start = float(self.timestamp[k])
+            end = min(self.now, bar_start + self.bar_seconds)
+            self._fill_in_bar(order, k, (start - bar_start) / self.bar_seconds, (end - bar_start) / self.bar_seconds)
+            order["checked_until"] = end
+
+    def _fill_in_bar(self, order, k, start, end):
+        if order["bar"] != k:
+            order["bar"], order["bar_filled"] = k, 0
+        capacity = max(1, int(self.participation * self.volume[k])) - order["bar_filled"]
+        quantity = min(order["quantity"] - order["filled"], capacity)
+        if quantity <= 0:
+            return
+        price, low, high = _path_segment(self.paths[k], start, end)
+        buy = order["side"] == "BUY"
+        if order["limit"] is not None:
+            if buy and low > order["limit"] or not buy and high < order["limit"]:
+                return
+            price = min(price, order["limit"]) if buy else max(price, order["limit"])
+        self._fill(order, quantity, price, self.volume[k])
+
+    def _fill(self, order, quantity, price, bar_volume):
+        buy = order["side"] == "BUY"
+        slip = self.slippage_bps + (self.impact_bps * 100 * quantity / bar_volume if bar_volume else 0)
+        price *= 1 + slip / 1e4 if buy else 1 - slip / 1e4
+        if order["limit"] is not None:
+            price = min(price, order["limit"]) if buy else max(price, order["limit"])
+        order["filled"] += quantity
+        order["bar_filled"] += quantity
+        order["value"] += price * quantity
+        if order["filled"] == order["quantity"]:
+            order["status"] = "complete"
+
+    def flush(self):
+        """End of session: fill remaining MARKET orders at the last price, cancel LIMIT orders"""
+        for order in self._working:
+            if order["limit"] is None:
+                self._fill(order, order["quantity"] - order["filled"], self.price_at(self.now), 0)
+            else:
+                order["status"], order["text"] = "cancelled", "Cancelled at session end"
+        self._working = []
+
+    def orderBook(self):
+        records = []
+        for order in self._orders.values():
+            params = order["params"]
+            records.append({
+                "orderid": order["orderid"], "tradingsymbol": params.get("tradingsymbol"),
+                "symboltoken": params.get("symboltoken"), "transactiontype": order["side"],
+                "ordertype": params.get("ordertype"), "price": params.get("price"),
+                "quantity": str(order["quantity"]), "filledshares": str(order["filled"]),
+                "unfilledshares": str(order["quantity"] - order["filled"]),
+                "averageprice": order["value"] / order["filled"] if order["filled"] else 0.0,
+                "orderstatus": order["status"], "status": order["status"], "text": order["text"],
+            })
+        return {"status": True, "message": "SUCCESS", "data": records}
+
+    def shortfall(self):
+        """Mean fill price vs the path price when each order was placed, in bps against the order"""
+        costs = []
+        for order in self._orders.values():
+            if order["filled"]:
+                average = order["value"] / order["filled"]
+                sign = 1 if order["side"] == "BUY" else -1
+                costs.append(sign * (average - order["placed_price"]) / order["placed_price"] * 1e4)
+        return round(float(np.mean(costs)), 3) if costs else None
+
+
+class PaperApi:
+    """The parts of AngelOneAPI the trading engine uses, with place_order going to a PaperBroker"""
+
+    def __init__(self, broker, instrument=INSTRUMENT):
+        self.broker = broker
+        self.reliance_token = instrument
+
+    def place_order(self, variety, tradingsymbol, symboltoken, transactiontype, exchange, ordertype, producttype,
+                    duration, price=0, squareoff=0, stoploss=0, quantity=1):
+        return self.broker.placeOrder({
+            "variety": variety, "tradingsymbol": tradingsymbol, "symboltoken": symboltoken,
+            "transactiontype": transactiontype, "exchange": exchange, "ordertype": ordertype,
+            "producttype": producttype, "duration": duration, "price": price, "squareoff": squareoff,
+            "stoploss": stoploss, "quantity": quantity,
+        })
+
+
+def trading_days(timestamp):
+    """(start, end) bar index ranges of each IST trading day"""
+    days = (np.asarray(timestamp, dtype=np.int64) + IST_OFFSET) // 86400
+    edges = np.flatnonzero(np.diff(days)) + 1
+    starts = np.concatenate([[0], edges])
+    ends = np.append(edges, len(days))
+    return list(zip(starts.tolist(), ends.tolist()))
+
+
+def simulate(bars, rules=None, quantity=10, days=None, check_interval=75, **broker_options):
+    """
+    Run the trading engine's polling loop against a PaperBroker on a ReplayClock, as fast as
+    possible: the price is polled every check_interval replayed seconds (75 = four times per
+    bar), the engine rolls its daily counters as the replay crosses into a new day, and open
+    positions are squared off at each close. Returns a summary dict.
+    """
+    from clock import ReplayClock
+    from orders import OrderManager
+    from trading_engine import TradingEngine, default_rules, run_polling
+
+    if days is not None:
+        session_days = trading_days(bars["timestamp"])[:days]
+        count = session_days[-1][1] if session_days else 0
+        bars = {name: np.asarray(bars[name])[:count] for name in ("timestamp", "open", "high", "low", "close", "volume")}
+
+    broker = PaperBroker(bars, **broker_options)
+    clock = ReplayClock(broker.timestamp, broker.bar_seconds)
+    manager = OrderManager(broker, clock=clock)
+    api = PaperApi(broker)
+    instrument = api.reliance_token
+    engine = TradingEngine(api, rules() if rules else default_rules(), quantity=quantity, orders=manager,
+                           clock=clock)
+    sessions = []
+
+    def square_off(close_time):
+        broker.advance(close_time)
+        # Settle the engine's orders still working at the close first, so the position includes their fills
+        broker.flush()
+        manager.poll()
+        position = manager.positions.get(instrument["exchange"], instrument["token"])["quantity"]
+        if position:
+            manager.submit({"variety": "NORMAL", "tradingsymbol": instrument["symbol"],
+                            "symboltoken": instrument["token"], "transactiontype": "SELL" if position > 0 else "BUY",
+                            "exchange": instrument["exchange"], "ordertype": "MARKET", "producttype": "INTRADAY",
+                            "duration": "DAY", "quantity": abs(position)})
+            manager.drain()
+            broker.flush()
+            manager.poll()
+        sessions.append(close_time)
+
+    def get_price():
+        broker.advance(clock.time())
+        if manager.working_orders():
+            manager.poll()
+        return broker.price_at(clock.time())
+
+    def on_price(price, received_time):
+        engine.on_price(price, received_time)
+        manager.drain()
+
+    clock.add_session_end_listener(square_off)
+    start = time.perf_counter()
+    run_polling(get_price, on_price, clock, check_interval, lambda: not clock.finished)
+    elapsed = time.perf_counter() - start
+
+    report = manager.report()
+    return {
+        "days": len(sessions),
+        "bars": clock.bars_replayed,
+        "orders": report["orders"],
+        "realized_pnl": manager.positions.get(instrument["exchange"], instrument["token"])["realized_pnl"],
+        "shortfall_bps": broker.shortfall(),
+        "seconds": round(elapsed, 3),
+        "bars_per_second": round(clock.throughput()) if clock.throughput() else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Paper-trade the strategy over the raw bars")
+    parser.add_argument("--data", default=RAW_DATA_PATH)
+    parser.add_argument("--days", type=int, help="Only the first N trading days")
+    parser.add_argument("--quantity", type=int, default=10)
+    parser.add_argument("--check-interval", type=float, default=75, help="Replayed seconds between price polls")
+    parser.add_argument("--latency", type=float, nargs="+", default=[0.25],
+                        help="Order latencies (s) to compare, e.g. --latency 0 1 5 30 120")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--slippage-bps", type=float, default=1.0)
+    parser.add_argument("--impact-bps", type=float, default=0.0)
+    parser.add_argument("--participation", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    bars = load_table(args.data)
+    for latency in args.latency:
+        result = simulate(bars, quantity=args.quantity, days=args.days, check_interval=args.check_interval,
+                          latency=latency, jitter=args.jitter,
+                          slippage_bps=args.slippage_bps, impact_bps=args.impact_bps,
+                          participation=args.participation, seed=args.seed)
+        print(f"latency {latency:>6.2f}s: {result}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from metrics import latency_percentiles
+
+logger = logging.getLogger("PriceSources")
+
+MONEYCONTROL_URL = "https://priceapi.moneycontrol.com/pricefeed/nse/equitycash/RIL"
+YAHOO_URL = "https://query1.finance.yahoo.com/v7/finance/quote?symbols=RELIANCE.NS"
+
+
+def parse_moneycontrol(data):
+    if data and data.get('data') and data['data'].get('pricecurrent'):
+        return float(data['data']['pricecurrent'])
+    return None
+
+
+def parse_yahoo(data):
+    quote = data.get("quoteResponse", {}).get("result", [])
+    if quote and quote[0].get("regularMarketPrice"):
+        return float(quote[0]["regularMarketPrice"])
+    return None
+
+
+class PriceSource:
+    """One HTTP quote endpoint with its own keep-alive connection pool and stats"""
+
+    def __init__(self, name, url, parse, timeout=5, history=1000):
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.name = name
+        self.url = url
+        self.parse = parse
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+        self.session.headers["User-Agent"] = "Mozilla/5.0"
+
+        self.attempts = 0
+        self.successes = 0
+        self.wins = 0
+        # Time to a valid price, and time spent on attempts that failed (timeouts, errors, bad payloads)
+        self.latencies = deque(maxlen=history)
+        self.failure_latencies = deque(maxlen=history)
+        self._lock = threading.Lock()
+
+    def fetch(self):
+        """Blocking fetch; returns a price or None, and records latency/success (failures included)"""
+        start = time.perf_counter()
+        price = None
+        try:
+            response = self.session.get(self.url, timeout=self.timeout)
+            if response.status_code == 200:
+                price = self.parse(response.json())
+        except Exception as e:
+            logger.warning(f"{self.name} price fetch failed: {str(e)}")
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.attempts += 1
+            if price:
+                self.successes += 1
+                self.latencies.append(elapsed)
+            else:
+                self.failure_latencies.append(elapsed)
+        return price
+
+    def stats(self):
+        with self._lock:
+            return {
+                "attempts": self.attempts,
+                "success_rate": round(self.successes / self.attempts, 3) if self.attempts else None,
+                "wins": self.wins,
+                "latency_ms": latency_percentiles(list(self.latencies)),
+                "failure_latency_ms": latency_percentiles(list(self.failure_latencies)),
+            }
+
+
+def default_sources(timeout=5):
+    return [
+        PriceSource("MoneyControl", MONEYCONTROL_URL, parse_moneycontrol, timeout),
+        PriceSource("Yahoo", YAHOO_URL, parse_yahoo, timeout),
+    ]
+
+
+class PriceRacer:
+    """
+    Queries every source at once and returns the first valid price.
+    Requests run on a private asyncio loop (one background thread) that hands the blocking
+    HTTP calls to a thread pool; slower sources finish in the background and still count in stats.
+    A source that is still busy with an earlier race is joined rather than queried again.
+    """
+
+    def __init__(self, sources=None, timeout=5):
+        self.sources = sources or default_sources(timeout)
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=len(self.sources), thread_name_prefix="PriceSource")
+        self._inflight = {}
+        self._loop = asyncio.new_event_loop()
+        threading.Thread(target=self._loop.run_forever, name="PriceRacer", daemon=True).start()
+
+    async def _race(self):
+        loop = asyncio.get_running_loop()
+        pending = {}
+        for source in self.sources:
+            request = self._inflight.get(source.name)
+            if request is None or request.done():
+                request = self._inflight[source.name] = self._executor.submit(source.fetch)
+            pending[asyncio.wrap_future(request)] = source
+        deadline = loop.time() + self.timeout
+        while pending:
+            done, _ = await asyncio.wait(pending, timeout=max(deadline - loop.time(), 0),
+                                         return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                break
+            for future in done:
+                source = pending.pop(future)
+                price = future.result()
+                if price:
+                    source.wins += 1
+                    return price, source.name
+        return None, None
+
+    def get_price(self):
+        """First valid (price, source name) from any source, or (None, None)"""
+        future = asyncio.run_coroutine_threadsafe(self._race(), self._loop)
+        try:
+            return future.result(self.timeout + 1)
+        except Exception as e:
+            logger.error(f"Price race failed: {str(e)}")
+            return None, None
+
+    def stats(self):
+        return {source.name: source.stats() for source in self.sources}
+
+    def close(self):
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._executor.shutdown(wait=False)
+        for source in self.sources:
+            source.session.close()
+
+
+def _stub_server(payload, delay=0.0, status=200):
+    """Local HTTP server answering every GET with payload after delay (for offline runs)"""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            time.sleep(delay)
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/"
+
+
+if __name__ == "__main__":
+    # Race a slow MoneyControl stub, a fast Yahoo stub and a broken one, then print the stats
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    mc, mc_url = _stub_server({"data": {"pricecurrent": "1301.5"}}, delay=0.2)
+    yahoo, yahoo_url = _stub_server({"quoteResponse": {"result": [{"regularMarketPrice": 1301.45}]}}, delay=0.02)
+    broken, broken_url = _stub_server({}, status=503)
+    racer = PriceRacer([
+        PriceSource("MoneyControl", mc_url, parse_moneycontrol),
+        PriceSource("Yahoo", yahoo_url, parse_yahoo),
+        PriceSource("Broken", broken_url, parse_yahoo),
+    ])
+    timings = []
+    for _ in range(20):
+        start = time.perf_counter()
+        price, source = racer.get_price()
+        timings.append(time.perf_counter() - start)
+    time.sleep(0.3)
+    print(f"Last price {price} from {source}; race latency {latency_percentiles(timings)}")
+    print(json.dumps(racer.stats(), indent=2))
+    racer.close()
@@ -0,0 +1,191 @@
+import argparse
+import base64
+import json
+import logging
+import threading
+import time
+
+logger = logging.getLogger("Session")
+
+# Refresh the JWT this many seconds before it expires
+REFRESH_MARGIN = 300
+# Assumed token lifetime when the JWT carries no readable exp claim
+DEFAULT_TOKEN_LIFETIME = 6 * 3600
+# SmartAPI error codes meaning the JWT is invalid or expired
+AUTH_ERROR_CODES = ("AG8001", "AG8002", "AG8003", "AB1010", "AB8050", "AB8051")
+
+
+def jwt_expiry(token):
+    """exp claim (epoch seconds) of a JWT, without verifying it; None if unreadable"""
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        return float(json.loads(base64.urlsafe_b64decode(payload))["exp"])
+    except (AttributeError, IndexError, KeyError, TypeError, ValueError):
+        return None
+
+
+def is_auth_error(response):
+    """Whether an API response says the session token is no longer valid"""
+    if not isinstance(response, dict) or response.get("status"):
+        return False
+    message = str(response.get("message") or "").lower()
+    return response.get("errorcode") in AUTH_ERROR_CODES or "token" in message and (
+        "invalid" in message or "expired" in message)
+
+
+class SessionManager:
+    """
+    Keeps one SmartAPI session alive for every thread.
+    ensure() returns at once while the JWT is good for more than `margin` seconds; after that
+    the first caller renews it with refresh(refresh_token) (falling back to a full login), and
+    every other caller waits for that one attempt instead of starting its own.
+    Each new session bumps `generation`; reconnect(generation) after an auth failure only logs
+    in again if nobody has done so since the caller's request was sent.
+
+    login() and refresh(refresh_token) return the session's {"jwtToken", "refreshToken", ...}
+    data, or None on failure.
+    """
+
+    def __init__(self, login, refresh=None, margin=REFRESH_MARGIN):
+        self._login = login
+        self._refresh = refresh
+        self.margin = margin
+        self.generation = 0
+        self.expires_at = None
+        self.refresh_token = None
+        self.stats = {"logins": 0, "refreshes": 0, "failures": 0, "waits": 0}
+        self._cond = threading.Condition()
+        self._in_flight = False
+
+    @property
+    def is_valid(self):
+        return self.expires_at is not None and time.time() < self.expires_at
+
+    def _fresh(self):
+        return self.expires_at is not None and time.time() < self.expires_at - self.margin
+
+    def ensure(self):
+        """Make sure the session is usable, refreshing it first if it is about to expire"""
+        if not self._in_flight and self._fresh():
+            return True
+        return self._renew(self._fresh)
+
+    def reconnect(self, generation=None):
+        """Force a new session, unless one was established after `generation` (the caller's view)"""
+        if generation is None:
+            generation = self.generation
+        return self._renew(lambda: self.generation != generation and self.is_valid)
+
+    def invalidate(self):
+        with self._cond:
+            self.expires_at = None
+
+    def _renew(self, satisfied):
+        with self._cond:
+            while self._in_flight:
+                self.stats["waits"] += 1
+                self._cond.wait()
+            if satisfied():
+                return True
+            self._in_flight = True
+        try:
+            data = None
+            if self.refresh_token and self._refresh and self.is_valid:
+                data = self._call(self._refresh, self.refresh_token)
+                if data:
+                    self.stats["refreshes"] += 1
+            if not data:
+                data = self._call(self._login)
+                if data:
+                    self.stats["logins"] += 1
+        finally:
+            with self._cond:
+                if data:
+                    self._set(data)
+                else:
+                    self.stats["failures"] += 1
+                self._in_flight = False
+                self._cond.notify_all()
+        return bool(data)
+
+    @staticmethod
+    def _call(fn, *args):
+        try:
+            return fn(*args)
+        except Exception as e:
+            logger.error(f"Session request failed: {str(e)}")
+            return None
+
+    def _set(self, data):
+        self.refresh_token = data.get("refreshToken") or self.refresh_token
+        self.expires_at = jwt_expiry(data.get("jwtToken")) or time.time() + DEFAULT_TOKEN_LIFETIME
+        self.generation += 1
+        logger.info(f"Session {self.generation} valid until {time.strftime('%H:%M:%S', time.localtime(self.expires_at))}")
+
+
+def _mock_jwt(lifetime):
+    """An unsigned JWT expiring in `lifetime` seconds"""
+    def encode(obj):
+        return base64.urlsafe_b64encode(json.dumps(obj).encode()).rstrip(b"=").decode()
+
+    return f"{encode({'alg': 'none'})}.{encode({'exp': int(time.time() + lifetime)})}."
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hammer a SessionManager with concurrent callers against a mock login")
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--lifetime", type=float, default=2.0, help="Mock JWT lifetime (s)")
+    parser.add_argument("--login-latency", type=float, default=0.5)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    calls = {"login": 0, "refresh": 0}
+
+    def login():
+        calls["login"] += 1
+        time.sleep(args.login_latency)
+        return {"jwtToken": _mock_jwt(args.lifetime), "refreshToken": "refresh"}
+
+    def refresh(token):
+        calls["refresh"] += 1
+        time.sleep(args.login_latency / 5)
+        return {"jwtToken": _mock_jwt(args.lifetime), "refreshToken": token}
+
+    session = SessionManager(login, refresh, margin=args.lifetime / 4)
+
+    def run(target):
+        threads = [threading.Thread(target=target) for _ in range(args.threads)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    # Cold start: every thread needs a session at once
+    run(session.ensure)
+    print(f"Cold start, {args.threads} threads: {calls['login']} login(s)")
+
+    # Burst of auth errors: every thread saw the same session fail and asks for a new one
+    generation = session.generation
+    run(lambda: session.reconnect(generation))
+    print(f"Auth-error burst, {args.threads} threads: {calls['login']} login(s), {calls['refresh']} refresh(es) in total")
+
+    # Steady traffic across several token lifetimes: renewed by refresh before expiry
+    deadline = time.time() + args.seconds
+    expired = []
+
+    def caller():
+        while time.time() < deadline:
+            session.ensure()
+            if not session.is_valid:
+                expired.append(1)
+            time.sleep(0.01)
+
+    run(caller)
+    print(f"{args.seconds}s of traffic: {calls['login']} login(s), {calls['refresh']} refresh(es), "
+          f"{len(expired)} calls on an expired token; stats {session.stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+import threading
+import time
+
+# getMarketData accepts at most this many tokens per request
+MAX_TOKENS_PER_REQUEST = 50
+
+# NSE cash-market tokens for a default watch basket
+DEFAULT_INSTRUMENTS = [
+    {"exchange": "NSE", "token": "2885", "symbol": "RELIANCE-EQ"},
+    {"exchange": "NSE", "token": "11536", "symbol": "TCS-EQ"},
+    {"exchange": "NSE", "token": "1333", "symbol": "HDFCBANK-EQ"},
+    {"exchange": "NSE", "token": "1594", "symbol": "INFY-EQ"},
+    {"exchange": "NSE", "token": "4963", "symbol": "ICICIBANK-EQ"},
+    {"exchange": "NSE", "token": "3045", "symbol": "SBIN-EQ"},
+    {"exchange": "NSE", "token": "1660", "symbol": "ITC-EQ"},
+]
+
+
+class SymbolRegistry:
+    """
+    Instruments the bot knows about, addressable by trading symbol or by (exchange, token).
+    Symbols not registered explicitly are resolved through the instrument master (see
+    instruments.py); `master` may be the master itself or a function that loads it on first use.
+    """
+
+    def __init__(self, instruments=None, master=None):
+        self._by_symbol = {}
+        self._by_token = {}
+        self._master = master
+        for instrument in DEFAULT_INSTRUMENTS if instruments is None else instruments:
+            self.register(instrument["symbol"], instrument["token"], instrument["exchange"])
+
+    def register(self, symbol, token, exchange="NSE"):
+        instrument = {"exchange": exchange, "token": str(token), "symbol": symbol}
+        self._by_symbol[(exchange, symbol)] = instrument
+        self._by_token[(exchange, str(token))] = instrument
+        return instrument
+
+    @property
+    def master(self):
+        if callable(self._master):
+            self._master = self._master()
+        return self._master
+
+    def get(self, symbol, exchange="NSE"):
+        instrument = self._by_symbol.get((exchange, symbol))
+        if instrument is None and self.master is not None:
+            found = self.master.by_symbol(symbol, exchange)
+            if found is not None:
+                instrument = self.register(found["symbol"], found["token"], exchange)
+        if instrument is None:
+            raise KeyError(f"Unknown symbol {exchange}:{symbol}")
+        return instrument
+
+    def by_token(self, token, exchange="NSE"):
+        instrument = self._by_token.get((exchange, str(token)))
+        if instrument is None and self.master is not None:
+            found = self.master.by_token(token, exchange)
+            if found is not None:
+                instrument = self.register(found["symbol"], found["token"], exchange)
+        return instrument
+
+    def resolve(self, symbols, exchange="NSE"):
+        """Instrument dicts for a list of symbols (instrument dicts are passed through)"""
+        return [s if isinstance(s, dict) else self.get(s, exchange) for s in symbols]
+
+    def __iter__(self):
+        return iter(self._by_symbol.values())
+
+    def __len__(self):
+        return len(self._by_symbol)
+
+
+def batch_tokens(instruments, size=MAX_TOKENS_PER_REQUEST):
+    """Group instruments into {exchange: [tokens]} payloads of at most `size` tokens each"""
+    batch, count = {}, 0
+    for instrument in instruments:
+        if count == size:
+            yield batch
+            batch, count = {}, 0
+        batch.setdefault(instrument["exchange"], []).append(instrument["token"])
+        count += 1
+    if batch:
+        yield batch
+
+
+# Seconds a cached quote is served before it is refetched
+QUOTE_TTL = 5
+
+
+class _Flight:
+    """One upstream fetch in progress; other callers for the same key wait on it"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+
+
+class QuoteCache:
+    """
+    Latest quote per (exchange, token) with the time it was fetched, safe to share between the
+    trading thread, Streamlit sessions and fallback paths.
+    get_or_fetch() is single-flight: when a quote is missing or older than the TTL, the first
+    caller fetches it and every concurrent caller for the same instrument waits for that
+    result, so N readers cost one upstream request. stats() counts hits, misses (fetches),
+    coalesced waits and failed fetches.
+    """
+
+    def __init__(self, ttl=QUOTE_TTL):
+        self.ttl = ttl
+        self._quotes = {}
+        self._flights = {}
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "coalesced": 0, "errors": 0}
+
+    def set(self, exchange, token, quote, fetched_at=None):
+        with self._lock:
+            self._quotes[(exchange, str(token))] = (quote, fetched_at or time.time())
+
+    def get(self, exchange, token, max_age=None):
+        """Cached quote, or None if missing or older than max_age seconds"""
+        entry = self._quotes.get((exchange, str(token)))
+        if entry is None:
+            return None
+        if max_age is not None and time.time() - entry[1] > max_age:
+            return None
+        return entry[0]
+
+    def get_or_fetch(self, exchange, token, fetch, max_age=None):
+        """Cached quote if younger than max_age (default: the TTL), else fetch() it once for all callers"""
+        key = (exchange, str(token))
+        max_age = self.ttl if max_age is None else max_age
+        with self._lock:
+            entry = self._quotes.get(key)
+            if entry is not None and time.time() - entry[1] <= max_age:
+                self._stats["hits"] += 1
+                return entry[0]
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self._stats["misses"] += 1
+            else:
+                self._stats["coalesced"] += 1
+
+        if not leader:
+            flight.done.wait()
+            return flight.result
+
+        quote = None
+        try:
+            quote = fetch()
+        finally:
+            with self._lock:
+                if quote is not None:
+                    self._quotes[key] = (quote, time.time())
+                else:
+                    self._stats["errors"] += 1
+                del self._flights[key]
+            flight.result = quote
+            flight.done.set()
+        return quote
+
+    def age(self, exchange, token):
+        """Seconds since the quote was fetched (None if never)"""
+        entry = self._quotes.get((exchange, str(token)))
+        return None if entry is None else time.time() - entry[1]
+
+    def stale(self, instruments, max_age):
+        """The instruments whose cached quote is missing or older than max_age"""
+        return [i for i in instruments if self.get(i["exchange"], i["token"], max_age) is None]
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats)
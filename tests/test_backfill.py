@@ -0,0 +1,67 @@
+import threading
+import time
+from datetime import date
+
+from backfill import Backfill, TokenBucket, chunk_range
+from candle_store import CandleStore
+
+
+class FakeApi:
+    """get_historical_data with one five-minute candle per weekday; ranges starting on `fail_from` fail"""
+
+    def __init__(self, fail_from=()):
+        self.fail_from = set(fail_from)
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def get_historical_data(self, exchange, symbol, token, interval, from_date, to_date):
+        with self._lock:
+            self.calls.append((from_date[:10], to_date[:10]))
+        if from_date[:10] in self.fail_from:
+            return {"status": False, "message": "Something Went Wrong"}
+        first, last = date.fromisoformat(from_date[:10]), date.fromisoformat(to_date[:10])
+        rows = [[date.fromordinal(day).isoformat() + "T09:15:00+05:30", 100.0, 101.0, 99.0, 100.5, 1000]
+                for day in range(first.toordinal(), last.toordinal() + 1) if date.fromordinal(day).weekday() < 5]
+        return {"status": True, "message": "SUCCESS", "data": rows}
+
+
+def test_chunk_range():
+    chunks = chunk_range("2024-01-01", "2024-03-15", "ONE_MINUTE")
+    assert chunks[0] == (date(2024, 1, 1), date(2024, 1, 30))
+    assert chunks[-1][1] == date(2024, 3, 15)
+    assert all((last - first).days < 30 for first, last in chunks)
+    assert all((b[0] - a[1]).days == 1 for a, b in zip(chunks, chunks[1:]))
+
+
+def test_token_bucket_limits_rate():
+    bucket = TokenBucket(rate=20, capacity=1)
+    start = time.monotonic()
+    for _ in range(11):
+        bucket.acquire()
+    # The first token is available at once, the next ten take 1/20 s each
+    assert time.monotonic() - start >= 0.45
+
+
+def test_backfill_resumes_failed_chunks(tmp_path):
+    store = CandleStore(str(tmp_path / "candles"))
+    checkpoint = str(tmp_path / "backfill.json")
+    failing = FakeApi(fail_from=["2024-01-31"])
+    first = Backfill(failing, "2024-01-01", "2024-03-15", interval="ONE_MINUTE", store=store,
+                     checkpoint_path=checkpoint, rate=1000, retries=1, backoff=0)
+    summary = first.run()
+    assert summary["chunks"] == 3 and summary["failed"] == [("2024-01-31", "2024-02-29")]
+    assert summary["requests"] == 4  # two chunks once, the failing one plus its retry
+
+    api = FakeApi()
+    resumed = Backfill(api, "2024-01-01", "2024-03-15", interval="ONE_MINUTE", store=store,
+                       checkpoint_path=checkpoint, rate=1000, backoff=0)
+    summary = resumed.run()
+    assert api.calls == [("2024-01-31", "2024-02-29")]
+    assert summary["skipped"] == 2 and summary["fetched"] == 1 and not summary["failed"]
+    assert len(store.load("RELIANCE-EQ", "ONE_MINUTE", "2024-01-01", "2024-03-15", sync=False)) == 55
+
+    # Everything is stored and checkpointed: nothing left to fetch
+    again = FakeApi()
+    assert Backfill(again, "2024-01-01", "2024-03-15", interval="ONE_MINUTE", store=store,
+                    checkpoint_path=checkpoint).run()["fetched"] == 0
+    assert again.calls == []
@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+
+import backtest
+from backtest import run_rsi_macd_backtest, run_threshold_backtest, signal_direction
+
+SESSION_OPEN = 1736394300  # 2025-01-09 09:15 IST
+
+
+def make_bars(*days):
+    """Bars from per-day lists of (open, high, low, close)"""
+    rows, day, day_end, timestamp = [], [], [], []
+    for d, candles in enumerate(days):
+        start = len(rows)
+        rows.extend(candles)
+        day += [d] * len(candles)
+        day_end += [start + len(candles) - 1] * len(candles)
+        timestamp += [SESSION_OPEN + d * 86400 + i * 300 for i in range(len(candles))]
+    o, h, l, c = (np.array(column, dtype=np.float64) for column in zip(*rows))
+    return {"timestamp": np.array(timestamp, dtype=np.int64), "open": o, "high": h, "low": l, "close": c,
+            "volume": np.full(len(rows), 1000.0), "day": np.array(day), "day_end": np.array(day_end)}
+
+
+def flat(price, count):
+    return [(price, price + 1, price - 1, price)] * count
+
+
+def test_threshold_entry_and_eod_square_off():
+    bars = make_bars(flat(1300, 2) + flat(1200, 3))
+    result = run_threshold_backtest(bars, price_threshold=1250, stop_loss_pct=0.02)
+    assert result.entry_idx.tolist() == [2]
+    assert result.exit_idx.tolist() == [4] and result.result.tolist() == ["EOD"]
+    assert result.entry_price.tolist() == [1200.0] and result.exit_price.tolist() == [1200.0]
+
+
+def test_threshold_stop_loss_and_gap_fill():
+    # Stop at 1176: bar 2 trades through it intrabar, bar 5 gaps below it at the open
+    day = [(1200, 1201, 1199, 1200), (1200, 1201, 1199, 1200), (1190, 1191, 1170, 1175), (1200, 1201, 1199, 1200),
+           (1200, 1201, 1199, 1200), (1100, 1101, 1090, 1095), (1300, 1301, 1299, 1300)]
+    bars = make_bars(day)
+    result = run_threshold_backtest(bars, price_threshold=1250, stop_loss_pct=0.02)
+    assert result.result.tolist()[:2] == ["SL", "SL"]
+    assert result.exit_price.tolist()[:2] == [1176.0, 1100.0]
+    assert result.pnl.tolist()[:2] == [-24.0, -100.0]
+
+
+def test_threshold_max_trades_per_day():
+    # Every bar stops out the previous entry; each round trip counts two trades
+    day = [(1200, 1201, 1100, 1200)] * 10
+    bars = make_bars(day, day)
+    result = run_threshold_backtest(bars, price_threshold=1250, stop_loss_pct=0.01, max_trades_per_day=4)
+    assert np.bincount(bars["day"][result.entry_idx]).tolist() == [2, 2]
+
+
+def test_no_entry_on_the_last_bar_of_the_day():
+    bars = make_bars(flat(1300, 3) + flat(1200, 1))
+    assert len(run_threshold_backtest(bars, price_threshold=1250)) == 0
+
+
+def test_signal_direction():
+    rsi = np.array([30, 70, 50, 50, 50])
+    macd = np.array([-1, 0.5, 1, -1, np.nan])
+    signal = np.array([0, 1, 0.5, -0.5, 0])
+    assert signal_direction(rsi, macd, signal).tolist() == [1, -1, 1, -1, 0]
+
+
+@pytest.mark.parametrize("side, candles, result, exit_price", [
+    (1, [(1000, 1016, 999, 1010)], "TP", 1015.0),
+    (1, [(1000, 1001, 989, 995)], "SL", 989.5),
+    # Both touched in one bar: the stop wins
+    (1, [(1000, 1016, 989, 1000)], "SL", 989.5),
+    (-1, [(1000, 1001, 984, 990)], "TP", 985.0),
+    (1, [(1000, 1001, 999, 1003)], "EOD", 1003.0),
+])
+def test_rsi_macd_take_profit_and_stop(monkeypatch, side, candles, result, exit_price):
+    bars = make_bars([(1000, 1000, 1000, 1000)] + candles)
+    n = len(bars["close"])
+    # RSI/MACD that signal `side` on the first bar only
+    rsi = np.full(n, 50.0)
+    macd = np.full(n, np.nan)
+    macd[0] = side
+    monkeypatch.setattr(backtest, "compute_signals", lambda close: (rsi, macd, np.zeros(n)))
+    trades = run_rsi_macd_backtest(bars, volatility_pct=0.015, stop_ratio=0.7)
+    assert trades.direction.tolist() == [side]
+    assert trades.result.tolist() == [result]
+    assert trades.exit_price.tolist() == [exit_price]
@@ -0,0 +1,47 @@
+import os
+
+import pandas as pd
+import pytest
+
+from datastore import load_frame
+from features import append, build_features, check_parity, rebuild, state_path_for
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RAW_PATH = os.path.join(ROOT, "RELIANCE_3months_raw.csv")
+PROCESSED_PATH = os.path.join(ROOT, "RELIANCE_processed_data.csv")
+
+
+@pytest.fixture(scope="module")
+def raw():
+    return load_frame(RAW_PATH, time_strings=True)
+
+
+def test_build_matches_processed_csv(raw):
+    processed, engine = build_features(raw)
+    diffs, ok = check_parity(processed, PROCESSED_PATH)
+    assert ok, diffs
+    assert engine.ready
+
+
+def test_engine_continues_the_batch_series(raw):
+    """The engine returned with the first N bars produces the rows of the full build for the rest"""
+    head, engine = build_features(raw.iloc[:3000])
+    full, _ = build_features(raw)
+    row = engine.update(raw["close"].iloc[3000])
+    expected = full[full["timestamp"] == raw["timestamp"].iloc[3000]].iloc[0]
+    assert row == pytest.approx({column: expected[column] for column in row}, abs=1e-6)
+
+
+def test_append_matches_rebuild(tmp_path, raw):
+    raw_path = str(tmp_path / "raw.csv")
+    out_path = str(tmp_path / "processed.csv")
+    raw.iloc[:3000].to_csv(raw_path, index=False)
+    rebuild(raw_path, out_path)
+    assert os.path.exists(state_path_for(out_path))
+
+    raw.to_csv(raw_path, index=False)
+    added = append(raw_path, out_path)
+    assert added == len(raw) - 3000
+    assert append(raw_path, out_path) == 0
+    diffs, ok = check_parity(pd.read_csv(out_path), PROCESSED_PATH)
+    assert ok, diffs
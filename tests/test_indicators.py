@@ -0,0 +1,52 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from datastore import load_frame
+from indicators import INDICATOR_COLUMNS, IndicatorEngine
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RAW_PATH = os.path.join(ROOT, "RELIANCE_3months_raw.csv")
+PROCESSED_PATH = os.path.join(ROOT, "RELIANCE_processed_data.csv")
+
+
+@pytest.fixture(scope="module")
+def raw():
+    return load_frame(RAW_PATH, time_strings=True)
+
+
+@pytest.fixture(scope="module")
+def processed():
+    return pd.read_csv(PROCESSED_PATH)
+
+
+def test_streaming_matches_processed_csv(raw, processed):
+    engine = IndicatorEngine()
+    rows = {}
+    for timestamp, close in zip(raw["timestamp"], raw["close"]):
+        row = engine.update(close)
+        if all(value is not None for value in row.values()):
+            rows[timestamp] = row
+    assert list(rows) == list(processed["timestamp"])
+    streamed = pd.DataFrame(list(rows.values()), columns=INDICATOR_COLUMNS)
+    for column in INDICATOR_COLUMNS:
+        np.testing.assert_allclose(streamed[column], processed[column], rtol=0, atol=1e-6, err_msg=column)
+
+
+def test_preview_matches_update_without_changing_state(raw):
+    engine = IndicatorEngine()
+    for close in raw["close"].iloc[:200]:
+        engine.update(close)
+    before = engine.current()
+    preview = engine.preview(1300.0)
+    assert engine.current() == before
+    assert engine.update(1300.0) == pytest.approx(preview, abs=1e-9)
+
+
+def test_warming_up_rows_are_empty():
+    engine = IndicatorEngine()
+    row = engine.update(1300.0)
+    assert row["SMA_20"] is None and row["Bollinger_High"] is None
+    assert not engine.ready
@@ -0,0 +1,56 @@
+import os
+from datetime import date
+
+import numpy as np
+import pytest
+
+import dashboard_data
+from candle_store import candles_from_frame
+from datastore import load_frame
+from inference import BAR_SECONDS, WINDOW, PredictionService
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RAW = load_frame(os.path.join(ROOT, "RELIANCE_3months_raw.csv"), time_strings=True)
+
+
+@pytest.fixture
+def service():
+    return PredictionService(forward=lambda batch: np.zeros(len(batch)), scaler=(np.ones(8), np.zeros(8)))
+
+
+class CandleClient:
+    def __init__(self, candles):
+        self.candles = candles
+        self.requests = []
+
+    def get_candles(self, symbol, interval, from_date=None, to_date=None):
+        self.requests.append((from_date, to_date))
+        return self.candles
+
+
+def test_bars_need_a_warm_up(service):
+    with pytest.raises(RuntimeError, match="warm_up"):
+        service.add_bar(1300.0)
+
+
+def test_add_bars_takes_new_closed_bars_only(service):
+    service.warm_up(RAW.iloc[:-3])
+    bars = candles_from_frame(RAW.iloc[-5:])
+    last = int(bars["timestamp"][-1])
+    assert service.add_bars(bars, now=last + BAR_SECONDS - 1) == 2
+    assert service.last_bar_time == int(bars["timestamp"][-2])
+    assert service.add_bars(bars, now=last + BAR_SECONDS) == 1
+    assert service.last_bar_time == last and service.ready
+
+
+def test_forecast_bars_are_fetched_over_the_lookback_only(service, monkeypatch):
+    service.warm_up(RAW)
+    recent = candles_from_frame(RAW.iloc[-300:])
+    client = CandleClient(recent)
+    monkeypatch.setattr(dashboard_data, "get_client", lambda: client)
+    today = date(2026, 10, 16)
+    now = int(recent["timestamp"][-1]) + BAR_SECONDS
+    # Pretend the bundled bars are from last week, so the window is months behind
+    assert dashboard_data._feed_closed_bars(service, today=today, now=now) == len(recent)
+    assert client.requests == [("2026-10-09", "2026-10-16")]
+    assert service.last_bar_time == int(recent["timestamp"][-1]) and len(service.window) == WINDOW
@@ -0,0 +1,30 @@
+import os
+
+from instruments import InstrumentMaster, write_cache
+
+RELIANCE = {"token": "2885", "symbol": "RELIANCE-EQ", "name": "RELIANCE", "exch_seg": "NSE",
+            "instrumenttype": "", "expiry": "", "strike": "-1.000000", "lotsize": "1", "tick_size": "5.000000"}
+TCS = {**RELIANCE, "token": "11536", "symbol": "TCS-EQ", "name": "TCS"}
+
+
+def test_lookups(tmp_path):
+    cache_dir = str(tmp_path / "instrument_master")
+    write_cache([RELIANCE, TCS], cache_dir)
+    master = InstrumentMaster(cache_dir)
+    assert len(master) == 2
+    assert master.by_symbol("TCS-EQ")["token"] == "11536"
+    assert master.by_token(2885)["symbol"] == "RELIANCE-EQ"
+    assert master.by_token("2885", "BSE") is None
+    assert master.exchange_rows("NSE").tolist() == [0, 1]
+
+
+def test_rewrite_replaces_the_cache_whole(tmp_path):
+    cache_dir = str(tmp_path / "instrument_master")
+    write_cache([RELIANCE, TCS], cache_dir)
+    loaded = InstrumentMaster(cache_dir)
+    write_cache([TCS], cache_dir)
+    # The master loaded before the rewrite still reads its own files
+    assert len(loaded) == 2 and loaded.by_symbol("RELIANCE-EQ")["token"] == "2885"
+    fresh = InstrumentMaster(cache_dir)
+    assert len(fresh) == 1 and fresh.by_symbol("RELIANCE-EQ") is None
+    assert os.listdir(tmp_path) == ["instrument_master"]
@@ -0,0 +1,31 @@
+import pytest
+
+from journal import TradeJournal
+
+ORDER = {"exchange": "NSE", "tradingsymbol": "RELIANCE-EQ", "symboltoken": "2885", "transactiontype": "BUY",
+         "ordertype": "MARKET", "producttype": "INTRADAY", "quantity": 10, "price": 0}
+
+
+@pytest.mark.parametrize("response, status, order_id", [
+    ("250101000000001", 1, "250101000000001"),
+    (None, 0, None),
+    ({"status": True, "message": "SUCCESS", "data": {"orderid": "250101000000002"}}, 1, "250101000000002"),
+    ({"status": False, "message": "LIVE_TRADING is disabled. Order not placed."}, 0, None),
+])
+def test_record_order(tmp_path, response, status, order_id):
+    journal = TradeJournal(str(tmp_path / "journal.db"))
+    journal.record_order(ORDER, response, live=True)
+    row = journal.orders().iloc[0]
+    assert row["status"] == status
+    assert row["order_id"] == order_id
+
+
+def test_open_trade_has_no_exit_time(tmp_path):
+    journal = TradeJournal(str(tmp_path / "journal.db"))
+    journal.record_trade({"Entry Time": "2025-04-02 09:20:00+05:30", "Direction": "BUY", "Entry Price": 1252.05})
+    journal.record_trade({"Entry Time": "2025-04-02 10:05:00+05:30", "Direction": "SELL", "Entry Price": 1290.0,
+                          "Exit Time": "2025-04-02 10:40:00+05:30", "Exit Price": 1281.5, "Result": "TP", "PnL": 8.5})
+    trades = journal.trades()
+    assert trades["Entry Time"].tolist() == ["2025-04-02 09:20:00+05:30", "2025-04-02 10:05:00+05:30"]
+    assert trades["Exit Time"].tolist() == [None, "2025-04-02 10:40:00+05:30"]
+    assert journal.trades(start="2026-01-01").empty
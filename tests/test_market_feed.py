@@ -0,0 +1,69 @@
+import os
+import time
+
+import pytest
+
+from datastore import load_frame
+from market_feed import MarketFeed, ReplayServer, TickBuffer, encode_tick, load_replay_ticks, parse_tick
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RAW_PATH = os.path.join(ROOT, "RELIANCE_3months_raw.csv")
+
+
+@pytest.fixture
+def replay_csv(tmp_path):
+    path = str(tmp_path / "bars.csv")
+    load_frame(RAW_PATH, time_strings=True).iloc[:50].to_csv(path, index=False)
+    return path
+
+
+def wait_for(condition, timeout=10):
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_tick_round_trip():
+    tick = parse_tick(encode_tick("2885", 1301.55, 1736394300.25, sequence=7))
+    assert tick == {"mode": 1, "exchange_type": 1, "token": "2885", "sequence": 7,
+                    "exchange_timestamp": 1736394300.25, "ltp": 1301.55}
+
+
+def test_tick_buffer_keeps_the_newest():
+    buffer = TickBuffer(capacity=4)
+    for i in range(10):
+        buffer.append(float(i), i, i)
+    assert len(buffer) == 4
+    assert buffer.last() == [6.0, 7.0, 8.0, 9.0]
+    assert buffer.last(2) == [8.0, 9.0]
+    assert buffer.latest() == (9.0, 9, 9)
+
+
+def test_replay_ticks_follow_the_bar_path(replay_csv):
+    ticks = load_replay_ticks(replay_csv)
+    bars = load_frame(replay_csv)
+    assert len(ticks) == 4 * len(bars)
+    first = bars.iloc[0]
+    assert ticks[0][1] == first["open"] and ticks[3][1] == first["close"]
+    assert {ticks[1][1], ticks[2][1]} == {first["high"], first["low"]}
+
+
+@pytest.mark.parametrize("disconnect_every", [None, 60])
+def test_feed_receives_every_tick_across_reconnects(replay_csv, disconnect_every):
+    server = ReplayServer(replay_csv, disconnect_every=disconnect_every).start()
+    feed = MarketFeed("key", "client", "feed", "jwt", url=server.url, max_reconnect_delay=1)
+    received = []
+    feed.add_listener(lambda token, price, exchange_time, received_time: received.append((exchange_time, price)))
+    feed.subscribe("NSE", "2885")
+    try:
+        feed.start()
+        assert feed.wait_until_connected(5)
+        assert wait_for(lambda: len(received) == len(server.ticks))
+    finally:
+        feed.stop()
+        server.stop()
+    assert received == server.ticks
+    assert feed.connections == (1 if disconnect_every is None else -(-len(server.ticks) // disconnect_every))
+    assert feed.get_ltp("2885") == server.ticks[-1][1]
+    assert feed.get_ltp("2885", max_age=0) is None
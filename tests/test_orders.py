@@ -0,0 +1,101 @@
+import pytest
+
+from orders import FILLED, OPEN, PENDING, REJECTED, MockBroker, OrderManager, order_ack
+from trading_engine import TradingEngine, default_rules
+
+PARAMS = {
+    "variety": "NORMAL", "tradingsymbol": "RELIANCE-EQ", "symboltoken": "2885", "transactiontype": "BUY",
+    "exchange": "NSE", "ordertype": "MARKET", "producttype": "INTRADAY", "duration": "DAY", "quantity": 10,
+}
+INSTRUMENT = {"symbol": "RELIANCE-EQ", "token": "2885", "exchange": "NSE"}
+
+
+class ReplyBroker:
+    """Acknowledges every order with the given replies in turn; the order book reports them complete"""
+
+    def __init__(self, *replies, price=1300.0):
+        self.replies = list(replies)
+        self.price = price
+        self.placed = []
+
+    def placeOrder(self, params):
+        reply = self.replies.pop(0) if len(self.replies) > 1 else self.replies[0]
+        if isinstance(reply, Exception):
+            raise reply
+        self.placed.append(params)
+        return reply
+
+    def orderBook(self):
+        order_id = order_ack(self.replies[0])["data"]["orderid"]
+        quantity = self.placed[-1]["quantity"]
+        return {"status": True, "data": [{"orderid": order_id, "orderstatus": "complete", "filledshares": str(quantity),
+                                          "averageprice": self.price}]}
+
+
+@pytest.mark.parametrize("reply", [
+    {"status": True, "message": "SUCCESS", "data": {"orderid": "250101000000001"}},
+    "250101000000001",
+])
+def test_acknowledged_order_opens(reply):
+    manager = OrderManager(ReplyBroker(reply))
+    order = manager.submit(dict(PARAMS))
+    assert order.status == PENDING
+    manager.drain()
+    assert order.status == OPEN
+    assert order.order_id == "250101000000001"
+    assert manager.working_orders() == [order]
+
+
+@pytest.mark.parametrize("reply", [
+    None,
+    "",
+    {"status": False, "message": "RMS:Margin Exceeds", "data": None},
+    {"status": True, "data": "unexpected"},
+    RuntimeError("connection reset"),
+])
+def test_failed_order_is_rejected(reply):
+    manager = OrderManager(ReplyBroker(reply))
+    order = manager.submit(dict(PARAMS))
+    manager.drain()
+    assert order.status == REJECTED
+    assert order.wait(0)
+    assert manager.working_orders() == []
+
+
+def test_submit_thread_survives_bad_replies():
+    manager = OrderManager(ReplyBroker(None, "250101000000002"), poll_interval=0.01).start()
+    try:
+        rejected = manager.submit(dict(PARAMS))
+        filled = manager.submit(dict(PARAMS))
+        assert rejected.wait(5) and rejected.status == REJECTED
+        assert filled.wait(5) and filled.status == FILLED
+        assert filled.order_id == "250101000000002"
+    finally:
+        manager.stop()
+
+
+def test_fills_update_positions():
+    broker = MockBroker(price_fn=lambda: 1300.0, latency=0, fill_delay=0)
+    manager = OrderManager(broker)
+    buy = manager.submit(dict(PARAMS))
+    sell = manager.submit(dict(PARAMS, transactiontype="SELL", quantity=4, ordertype="LIMIT", price=1310.0))
+    manager.drain()
+    manager.poll()
+    assert buy.status == FILLED and sell.status == FILLED
+    assert sell.average_price == 1310.0
+    assert manager.positions.get("NSE", "2885") == {"quantity": 6, "average_price": 1300.0, "realized_pnl": 40.0}
+
+
+def test_engine_pending_order_clears_on_bare_id_reply():
+    class Api:
+        reliance_token = INSTRUMENT
+
+    manager = OrderManager(ReplyBroker("250101000000003", price=1200.0))
+    engine = TradingEngine(Api(), default_rules(price_threshold=2500), orders=manager)
+    order = engine.on_price(1200.0)
+    assert engine.state.pending_order is order
+    manager.drain()
+    manager.poll()
+    assert order.status == FILLED
+    assert engine.state.pending_order is None
+    assert engine.state.last_buy_price == 1200.0
@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+import clock
+import orders
+import paper
+from trading_engine import default_rules
+
+SESSION_OPEN = 1736394300  # 2025-01-09 09:15 IST
+BARS_PER_DAY = 75
+
+
+def make_bars(days=3, seed=0):
+    """Synthetic 5-minute session bars for `days` consecutive days"""
+    rng = np.random.default_rng(seed)
+    timestamp = np.concatenate([SESSION_OPEN + day * 86400 + np.arange(BARS_PER_DAY) * 300 for day in range(days)])
+    close = 1300 + np.cumsum(rng.normal(0, 1, len(timestamp)))
+    open_ = np.concatenate([[1300], close[:-1]])
+    return {"timestamp": timestamp, "open": open_, "high": np.maximum(open_, close) + 0.5,
+            "low": np.minimum(open_, close) - 0.5, "close": close, "volume": np.full(len(timestamp), 100000)}
+
+
+def market(side, quantity=10, **params):
+    return {"variety": "NORMAL", "tradingsymbol": "RELIANCE-EQ", "symboltoken": "2885", "transactiontype": side,
+            "exchange": "NSE", "ordertype": "MARKET", "producttype": "INTRADAY", "duration": "DAY",
+            "quantity": quantity, **params}
+
+
+def test_market_order_fills_after_latency_with_slippage():
+    bars = make_bars(1)
+    broker = paper.PaperBroker(bars, latency=60, slippage_bps=10)
+    order_id = broker.placeOrder(market("BUY"))["data"]["orderid"]
+    broker.advance(SESSION_OPEN + 30)
+    assert broker.orderBook()["data"][0]["filledshares"] == "0"
+    broker.advance(SESSION_OPEN + 61)
+    record = broker.orderBook()["data"][0]
+    assert record["orderid"] == order_id and record["orderstatus"] == "complete"
+    assert record["averageprice"] == pytest.approx(broker.price_at(SESSION_OPEN + 60) * 1.001)
+
+
+def test_flush_fills_market_and_cancels_limit():
+    bars = make_bars(1)
+    broker = paper.PaperBroker(bars, latency=10 ** 6)
+    broker.placeOrder(market("BUY"))
+    broker.placeOrder(market("SELL", ordertype="LIMIT", price=10 ** 6))
+    broker.advance(int(bars["timestamp"][-1]) + 300)
+    broker.flush()
+    statuses = [record["orderstatus"] for record in broker.orderBook()["data"]]
+    assert statuses == ["complete", "cancelled"]
+
+
+@pytest.mark.parametrize("latency", [0.25, 600, 3600])
+def test_every_session_ends_flat(monkeypatch, latency):
+    """Orders still working at the close (high latency) are settled before the square-off"""
+    managers, positions = [], []
+
+    class RecordingManager(orders.OrderManager):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            managers.append(self)
+
+    add_listener = clock.ReplayClock.add_session_end_listener
+
+    def add_session_end_listener(self, callback):
+        def after(close_time):
+            callback(close_time)
+            positions.append(managers[-1].positions.get("NSE", "2885")["quantity"])
+        add_listener(self, after)
+
+    monkeypatch.setattr(orders, "OrderManager", RecordingManager)
+    monkeypatch.setattr(clock.ReplayClock, "add_session_end_listener", add_session_end_listener)
+
+    # Enter whenever flat with a tight stop, so orders are always in flight
+    result = paper.simulate(make_bars(3), rules=lambda: default_rules(10 ** 6, 1000, 0.0005), latency=latency, seed=1)
+    assert result["days"] == 3
+    assert positions == [0, 0, 0]
+    assert sum(result["orders"].values()) > 3
@@ -0,0 +1,78 @@
+import time
+
+import pytest
+
+from price_sources import PriceRacer, PriceSource, _stub_server, parse_moneycontrol, parse_yahoo
+
+MONEYCONTROL = {"data": {"pricecurrent": "1301.5"}}
+YAHOO = {"quoteResponse": {"result": [{"regularMarketPrice": 1301.45}]}}
+
+
+@pytest.fixture
+def servers():
+    started = []
+
+    def start(payload, delay=0.0, status=200):
+        server, url = _stub_server(payload, delay, status)
+        started.append(server)
+        return url
+
+    yield start
+    for server in started:
+        server.shutdown()
+
+
+def test_parsers():
+    assert parse_moneycontrol(MONEYCONTROL) == 1301.5
+    assert parse_moneycontrol({"data": {}}) is None
+    assert parse_yahoo(YAHOO) == 1301.45
+    assert parse_yahoo({"quoteResponse": {"result": []}}) is None
+
+
+def test_fastest_valid_source_wins(servers):
+    racer = PriceRacer([
+        PriceSource("Slow", servers(MONEYCONTROL, delay=0.3), parse_moneycontrol),
+        PriceSource("Fast", servers(YAHOO, delay=0.01), parse_yahoo),
+        PriceSource("Broken", servers({}, status=503), parse_yahoo),
+    ], timeout=2)
+    try:
+        start = time.perf_counter()
+        assert racer.get_price() == (1301.45, "Fast")
+        assert time.perf_counter() - start < 0.25
+        time.sleep(0.4)
+        stats = racer.stats()
+        assert stats["Fast"]["wins"] == 1 and stats["Slow"]["wins"] == 0
+        # The slow source finished in the background and still counts
+        assert stats["Slow"]["attempts"] == 1 and stats["Slow"]["success_rate"] == 1.0
+        assert stats["Broken"]["success_rate"] == 0.0
+    finally:
+        racer.close()
+
+
+def test_falls_back_when_the_fast_source_fails(servers):
+    racer = PriceRacer([
+        PriceSource("Broken", servers({}, status=503), parse_yahoo),
+        PriceSource("Slow", servers(MONEYCONTROL, delay=0.1), parse_moneycontrol),
+    ], timeout=2)
+    try:
+        assert racer.get_price() == (1301.5, "Slow")
+    finally:
+        racer.close()
+
+
+def test_all_sources_fail_within_timeout(servers):
+    racer = PriceRacer([PriceSource("Hung", servers(YAHOO, delay=1.0), parse_yahoo, timeout=0.2)], timeout=0.5)
+    try:
+        start = time.perf_counter()
+        assert racer.get_price() == (None, None)
+        assert time.perf_counter() - start < 1.0
+    finally:
+        racer.close()
+
+
+def test_failed_attempts_are_timed(servers):
+    source = PriceSource("Hung", servers(YAHOO, delay=0.5), parse_yahoo, timeout=0.1)
+    assert source.fetch() is None
+    stats = source.stats()
+    assert stats["success_rate"] == 0.0 and stats["latency_ms"] is None
+    assert stats["failure_latency_ms"]["max"] >= 100
@@ -0,0 +1,86 @@
+import threading
+import time
+
+from session import SessionManager, _mock_jwt, is_auth_error, jwt_expiry
+
+
+class Backend:
+    """Counts logins and refreshes; each one issues a JWT valid for `lifetime` seconds"""
+
+    def __init__(self, lifetime=3600, latency=0.05, refresh_ok=True):
+        self.lifetime = lifetime
+        self.latency = latency
+        self.refresh_ok = refresh_ok
+        self.logins = 0
+        self.refreshes = 0
+
+    def login(self):
+        self.logins += 1
+        time.sleep(self.latency)
+        return {"jwtToken": _mock_jwt(self.lifetime), "refreshToken": "refresh"}
+
+    def refresh(self, token):
+        self.refreshes += 1
+        time.sleep(self.latency)
+        return {"jwtToken": _mock_jwt(self.lifetime), "refreshToken": token} if self.refresh_ok else None
+
+
+def run_threads(target, count=16):
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(target())) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_concurrent_cold_start_logs_in_once():
+    backend = Backend()
+    session = SessionManager(backend.login, backend.refresh)
+    assert all(run_threads(session.ensure))
+    assert backend.logins == 1 and backend.refreshes == 0
+    assert session.generation == 1
+
+
+def test_auth_error_burst_renews_once():
+    backend = Backend()
+    session = SessionManager(backend.login, backend.refresh)
+    session.ensure()
+    generation = session.generation
+    assert all(run_threads(lambda: session.reconnect(generation)))
+    assert backend.logins + backend.refreshes == 2
+    assert session.generation == generation + 1
+
+
+def test_refresh_before_expiry():
+    backend = Backend(lifetime=10, latency=0)
+    session = SessionManager(backend.login, backend.refresh, margin=60)
+    session.ensure()
+    # Inside the margin: renewed with the refresh token, not a new login
+    assert session.ensure()
+    assert backend.logins == 1 and backend.refreshes == 1
+
+
+def test_failed_refresh_falls_back_to_login():
+    backend = Backend(lifetime=10, latency=0, refresh_ok=False)
+    session = SessionManager(backend.login, backend.refresh, margin=60)
+    session.ensure()
+    assert session.ensure()
+    assert backend.logins == 2 and backend.refreshes == 1
+
+
+def test_failed_login():
+    session = SessionManager(lambda: None)
+    assert not session.ensure()
+    assert session.stats["failures"] == 1 and not session.is_valid
+
+
+def test_jwt_expiry_and_auth_errors():
+    assert abs(jwt_expiry(_mock_jwt(100)) - (time.time() + 100)) < 2
+    assert jwt_expiry("not a token") is None
+    assert is_auth_error({"status": False, "errorcode": "AG8001", "message": "Invalid Token"})
+    assert is_auth_error({"status": False, "message": "Token Expired"})
+    assert not is_auth_error({"status": False, "errorcode": "AB1004", "message": "Something Went Wrong"})
+    assert not is_auth_error({"status": True, "data": {}})
+    assert not is_auth_error("250101000000001")
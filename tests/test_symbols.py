@@ -0,0 +1,65 @@
+import threading
+import time
+
+from symbols import QuoteCache, SymbolRegistry, batch_tokens
+
+QUOTE = {"exchange": "NSE", "symbolToken": "2885", "ltp": 1300.0}
+
+
+def test_concurrent_misses_share_one_fetch():
+    cache = QuoteCache(ttl=60)
+    calls = []
+    release = threading.Event()
+
+    def fetch():
+        calls.append(1)
+        release.wait(5)
+        return QUOTE
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_fetch("NSE", "2885", fetch)))
+               for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    # Every caller is either fetching or waiting on the fetch before it returns
+    deadline = time.time() + 5
+    while sum(cache.stats().values()) < 20 and time.time() < deadline:
+        time.sleep(0.001)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+    assert results == [QUOTE] * 20
+    assert cache.stats() == {"hits": 0, "misses": 1, "coalesced": 19, "errors": 0}
+
+
+def test_fresh_quote_is_a_hit_and_stale_one_refetches():
+    cache = QuoteCache(ttl=60)
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return dict(QUOTE, ltp=1300.0 + len(calls))
+
+    assert cache.get_or_fetch("NSE", "2885", fetch)["ltp"] == 1301.0
+    assert cache.get_or_fetch("NSE", 2885, fetch)["ltp"] == 1301.0
+    cache.set("NSE", "2885", QUOTE, fetched_at=time.time() - 120)
+    assert cache.get_or_fetch("NSE", "2885", fetch)["ltp"] == 1302.0
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 2
+
+
+def test_failed_fetch_is_not_cached():
+    cache = QuoteCache(ttl=60)
+    assert cache.get_or_fetch("NSE", "2885", lambda: None) is None
+    assert cache.get_or_fetch("NSE", "2885", lambda: QUOTE) == QUOTE
+    assert cache.stats()["errors"] == 1
+
+
+def test_stale_and_batching():
+    cache = QuoteCache()
+    registry = SymbolRegistry()
+    instruments = registry.resolve(["RELIANCE-EQ", "TCS-EQ"])
+    cache.set("NSE", "2885", QUOTE)
+    assert cache.stale(instruments, max_age=5) == [registry.get("TCS-EQ")]
+    batches = list(batch_tokens([{"exchange": "NSE", "token": str(i)} for i in range(120)]))
+    assert [len(batch["NSE"]) for batch in batches] == [50, 50, 20]
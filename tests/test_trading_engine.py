@@ -0,0 +1,43 @@
+import time
+
+from trading_engine import TradingEngine, default_rules
+
+
+class RecordingAPI:
+    reliance_token = {"exchange": "NSE", "token": "2885", "symbol": "RELIANCE-EQ"}
+
+    def __init__(self):
+        self.orders = []
+
+    def place_order(self, **params):
+        self.orders.append(params)
+        return {"status": True, "data": {"orderid": str(len(self.orders))}}
+
+
+def run_queued(engine, prices):
+    """Queue every price before the engine thread starts, then let it drain them"""
+    for price in prices:
+        engine.submit_price(price)
+    engine.start()
+    deadline = time.time() + 5
+    while not engine._queue.empty() and time.time() < deadline:
+        time.sleep(0.01)
+    time.sleep(0.05)
+    engine.stop()
+
+
+def test_stop_loss_breach_is_not_coalesced_away():
+    api = RecordingAPI()
+    engine = TradingEngine(api, default_rules(price_threshold=0, stop_loss_pct=0.02))
+    engine.state.last_buy_price = 100.0
+    run_queued(engine, [99.0, 97.0, 101.0])
+    assert [o["transactiontype"] for o in api.orders] == ["SELL"]
+    assert engine.state.last_buy_price is None
+
+
+def test_entries_use_the_latest_queued_price():
+    api = RecordingAPI()
+    engine = TradingEngine(api, default_rules(price_threshold=100, stop_loss_pct=0.02))
+    run_queued(engine, [99.0, 98.0, 97.0])
+    assert [o["transactiontype"] for o in api.orders] == ["BUY"]
+    assert engine.state.last_buy_price == 97.0
@@ -0,0 +1,236 @@
+import argparse
+import json
+import logging
+import random
+import time
+
+import numpy as np
+import pandas as pd
+
+from candle_store import IST_OFFSET, CandleStore
+from datastore import load_table, to_epoch
+
+logger = logging.getLogger("TradeChart")
+
+RAW_DATA_PATH = "RELIANCE_3months_raw.csv"
+BAR_SECONDS = 300
+# Bars shown before the entry and after the exit
+PADDING_BARS = 6
+
+
+def load_trade_bars(entry_time, exit_time, raw_path=RAW_DATA_PATH, store=None, symbol="RELIANCE-EQ",
+                    interval="FIVE_MINUTE", padding=PADDING_BARS):
+    """
+    Real 5-minute bars around a trade, from the local candle store if it has the day(s),
+    otherwise from the raw data file. Returns a dict of arrays (timestamp in epoch seconds),
+    or None if neither covers the trade.
+    """
+    entry, exit_ = to_epoch([entry_time, exit_time]).tolist()
+    first_day = pd.Timestamp(entry + IST_OFFSET, unit="s").date()
+    last_day = pd.Timestamp(exit_ + IST_OFFSET, unit="s").date()
+
+    candles = (store or CandleStore()).load(symbol, interval, first_day, last_day, sync=False)
+    if len(candles):
+        source = {name: candles[name] for name in candles.dtype.names}
+    else:
+        try:
+            source = load_table(raw_path)
+        except OSError:
+            return None
+
+    timestamp = np.asarray(source["timestamp"], dtype=np.int64)
+    lo = np.searchsorted(timestamp, entry, side="right") - 1
+    hi = np.searchsorted(timestamp, exit_, side="right")
+    if lo < 0 or timestamp[lo] + BAR_SECONDS <= entry or timestamp[hi - 1] + BAR_SECONDS <= exit_:
+        return None
+    lo, hi = max(lo - padding, 0), min(hi + padding, len(timestamp))
+    return {name: np.asarray(source[name][lo:hi], dtype=np.int64 if name == "timestamp" else np.float64)
+            for name in ("timestamp", "open", "high", "low", "close")}
+
+
+def simulate_trade_bars(trade, seed=None):
+    """
+    Illustrative 5-minute candles for a trade with no stored history (e.g. dashboard predictions):
+    a piecewise path from entry to exit shaped by direction and result, with deterministic noise.
+    """
+    entry, exit_ = to_epoch([trade["Entry Time"], trade["Exit Time"]]).tolist()
+    entry_price, exit_price = float(trade["Entry Price"]), float(trade["Exit Price"])
+    rng = np.random.default_rng(entry if seed is None else seed)
+
+    minutes = max((exit_ - entry) / 60, 120)
+    points = max(8, int(minutes / 5) + 1)
+    sign = 1 if trade["Direction"] == "BUY" else -1
+    # Waypoints as multiples of the entry price: TP trades trend to the exit, SL trades fail
+    if trade["Result"] == "TP":
+        waypoints = [1, 1 + 0.002 * sign, 1 + 0.001 * sign, 1 + 0.008 * sign, 1 + 0.006 * sign]
+    else:
+        waypoints = [1, 1 + 0.004 * sign, 1 + 0.002 * sign, 1 + 0.005 * sign, 1 - 0.002 * sign]
+    knots = np.append(np.array(waypoints) * entry_price, exit_price)
+    path = np.interp(np.linspace(0, len(knots) - 1, points), np.arange(len(knots)), knots)
+    path += rng.normal(0, abs(exit_price - entry_price) * 0.01 + 1e-6, points)
+
+    opens, closes = path[:-1], path[1:]
+    body = np.abs(closes - opens)
+    return {
+        "timestamp": np.linspace(entry, exit_, points)[:-1].astype(np.int64),
+        "open": opens,
+        "high": np.maximum(opens, closes) + body * rng.uniform(0.1, 0.4, points - 1),
+        "low": np.minimum(opens, closes) - body * rng.uniform(0.05, 0.5, points - 1),
+        "close": closes,
+    }
+
+
+def trade_levels(trade):
+    """Take-profit and stop-loss levels implied by the trade's result (0.7 risk/reward ratio)"""
+    entry_price, exit_price = trade["Entry Price"], trade["Exit Price"]
+    sign = 1 if trade["Direction"] == "BUY" else -1
+    tp_level, sl_level = entry_price * (1 + 0.015 * sign), entry_price * (1 - 0.01 * sign)
+    if trade["Result"] == "TP":
+        tp_level, sl_level = exit_price, entry_price - (exit_price - entry_price) * 0.7
+    elif trade["Result"] == "SL":
+        sl_level, tp_level = exit_price, entry_price + (entry_price - exit_price) / 0.7
+    return tp_level, sl_level
+
+
+def _times(epoch):
+    return pd.to_datetime(np.asarray(epoch, dtype=np.int64), unit="s", utc=True).tz_convert("Asia/Kolkata")
+
+
+def build_trade_figure(trade, bars):
+    """Trade Analysis chart: candles, entry/exit markers, TP/SL levels and a one-trace mini chart"""
+    import plotly.graph_objects as go
+
+    times = _times(bars["timestamp"])
+    entry_time, exit_time = _times(to_epoch([trade["Entry Time"], trade["Exit Time"]]))
+    entry_price, exit_price = trade["Entry Price"], trade["Exit Price"]
+    direction_symbol = "triangle-up" if trade["Direction"] == "BUY" else "triangle-down"
+    exit_color = "green" if trade["Result"] == "TP" else "red"
+    pnl_color = "green" if trade["PnL"] > 0 else "red"
+
+    fig = go.Figure(go.Candlestick(x=times, open=bars["open"], high=bars["high"], low=bars["low"],
+                                   close=bars["close"], increasing_line_color="green",
+                                   decreasing_line_color="red", name="Price"))
+    fig.add_trace(go.Scatter(x=[entry_time], y=[entry_price], mode="markers+text", text=["Entry"],
+                             textposition="top center", name="Entry Point",
+                             marker=dict(size=14, color="blue", symbol=direction_symbol,
+                                         line=dict(width=2, color="white"))))
+    fig.add_trace(go.Scatter(x=[exit_time], y=[exit_price], mode="markers+text", text=["Exit"],
+                             textposition="top center", name="Exit Point",
+                             marker=dict(size=14, color=exit_color, symbol="circle",
+                                         line=dict(width=2, color="white"))))
+
+    tp_level, sl_level = trade_levels(trade)
+    fig.add_shape(type="line", x0=entry_time, y0=entry_price, x1=exit_time, y1=exit_price,
+                  line=dict(color=pnl_color, width=2, dash="dot"))
+    fig.add_shape(type="line", x0=entry_time, y0=tp_level, x1=exit_time, y1=tp_level,
+                  line=dict(color="green", width=1, dash="dash"))
+    fig.add_shape(type="line", x0=entry_time, y0=sl_level, x1=exit_time, y1=sl_level,
+                  line=dict(color="red", width=1, dash="dash"))
+    fig.add_annotation(x=entry_time, y=tp_level, text="Take Profit", showarrow=False, yshift=10,
+                       font=dict(size=10, color="green"))
+    fig.add_annotation(x=entry_time, y=sl_level, text="Stop Loss", showarrow=False, yshift=-15,
+                       font=dict(size=10, color="red"))
+
+    # Mini chart: the same candles scaled into a band below the main chart, as one trace
+    low, high = float(np.min(bars["low"])), float(np.max(bars["high"]))
+    price_range = (high - low) or 1.0
+    mini_base = low - price_range * 0.6
+    scale = 0.2
+
+    def mini(values):
+        return mini_base + (np.asarray(values) - low) * scale
+
+    fig.add_trace(go.Candlestick(x=times, open=mini(bars["open"]), high=mini(bars["high"]), low=mini(bars["low"]),
+                                 close=mini(bars["close"]), increasing_line_color="green",
+                                 decreasing_line_color="red", showlegend=False, hoverinfo="skip", name="Mini"))
+    mini_mid = mini_base + price_range * scale / 2
+    fig.add_trace(go.Scatter(x=[entry_time, exit_time], y=[mini_mid, mini_mid], mode="markers", showlegend=False,
+                             marker=dict(size=10, color=["blue", exit_color], symbol=[direction_symbol, "circle"])))
+
+    max_price = max(high, tp_level, sl_level) * 1.002
+    min_price = mini_base - (max_price - min(low, tp_level, sl_level)) * 0.05
+    fig.update_layout(
+        title=f'{trade["Direction"]} Trade Analysis: {trade["Result"]} ({trade["PnL"]})',
+        xaxis_title="Time",
+        yaxis_title="Price (₹)",
+        autosize=True,
+        margin=dict(l=10, r=10, b=10, t=50),
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+        plot_bgcolor="#0E1117",
+        paper_bgcolor="#0E1117",
+        font=dict(color="white"),
+        xaxis=dict(gridcolor="rgba(80, 80, 80, 0.3)", showgrid=True, rangeslider=dict(visible=False)),
+        yaxis=dict(gridcolor="rgba(80, 80, 80, 0.3)", showgrid=True, tickprefix="₹", tickformat=".2f"),
+    )
+    fig.update_yaxes(range=[min_price, max_price])
+    return fig
+
+
+def _legacy_figure(trade, bars):
+    """The previous construction: per-candle Python loop with random wicks and two shapes per mini candle"""
+    import plotly.graph_objects as go
+
+    times = _times(bars["timestamp"])
+    price_data = np.append(bars["open"], bars["close"][-1])
+    opens, highs, lows, closes = [], [], [], []
+    for i in range(len(price_data) - 1):
+        open_price, close_price = price_data[i], price_data[i + 1]
+        if random.random() > 0.8:
+            body_mid = (open_price + close_price) / 2
+            open_price = body_mid - (close_price - open_price) * 0.1
+            close_price = body_mid + (close_price - open_price) * 0.1
+        highs.append(max(open_price, close_price) + abs(close_price - open_price) * random.uniform(0.1, 0.4))
+        lows.append(min(open_price, close_price) - abs(close_price - open_price) * random.uniform(0.05, 0.3))
+        opens.append(open_price)
+        closes.append(close_price)
+    fig = go.Figure(go.Candlestick(x=times, open=opens, high=highs, low=lows, close=closes))
+    mini_range = max(highs) - min(lows)
+    mini_base = min(lows) - mini_range * 0.6
+    scale = mini_range * 0.2 / mini_range
+    mini = lambda values: [(v - mini_base) * scale + mini_base for v in values]
+    mini_opens, mini_highs, mini_lows, mini_closes = mini(opens), mini(highs), mini(lows), mini(closes)
+    for i in range(len(opens)):
+        color = "green" if mini_closes[i] > mini_opens[i] else "red"
+        fig.add_shape(type="line", x0=times[i], y0=mini_lows[i], x1=times[i], y1=mini_highs[i],
+                      line=dict(color=color, width=1))
+        fig.add_shape(type="rect", x0=times[i] - pd.Timedelta(minutes=1), x1=times[i] + pd.Timedelta(minutes=1),
+                      y0=mini_opens[i], y1=mini_closes[i], fillcolor=color, line=dict(color=color, width=1))
+    return fig
+
+
+def benchmark(sizes=(24, 75), repeat=3, raw_path=RAW_DATA_PATH):
+    """Build + serialize time (ms) and JSON payload size (KB) of the old and new chart per candle count"""
+    table = load_table(raw_path)
+    results = []
+    for size in sizes:
+        bars = {name: np.asarray(table[name][:size], dtype=np.int64 if name == "timestamp" else np.float64)
+                for name in ("timestamp", "open", "high", "low", "close")}
+        trade = {"Entry Time": int(bars["timestamp"][PADDING_BARS]), "Exit Time": int(bars["timestamp"][-PADDING_BARS]),
+                 "Entry Price": float(bars["close"][PADDING_BARS]), "Exit Price": float(bars["close"][-PADDING_BARS]),
+                 "Direction": "BUY", "Result": "TP", "PnL": 1.0}
+        row = {"candles": size}
+        for name, build in (("legacy", _legacy_figure), ("vectorized", build_trade_figure)):
+            times = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                payload = build(trade, bars).to_json()
+                times.append(time.perf_counter() - start)
+            row[f"{name}_ms"] = round(min(times) * 1000, 1)
+            row[f"{name}_kb"] = round(len(payload) / 1024, 1)
+        results.append(row)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Trade Analysis chart")
+    parser.add_argument("--sizes", default="24,75", help="Candle counts to benchmark (the legacy chart is quadratic)")
+    parser.add_argument("--raw", default=RAW_DATA_PATH)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    results = benchmark(tuple(int(size) for size in args.sizes.split(",")), raw_path=args.raw)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
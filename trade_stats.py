@@ -0,0 +1,86 @@
+import math
+
+STATE_FIELDS = [
+    "trades", "wins", "losses", "total_pnl", "gross_profit", "gross_loss", "mean", "m2",
+    "equity", "peak", "max_drawdown", "streak", "max_win_streak", "max_loss_streak",
+]
+
+
+class TradeStats:
+    """
+    Running trading-performance statistics, updated in O(1) per closed trade.
+    Sharpe is per trade (mean PnL / sample std of PnL, not annualized); the variance uses
+    Welford's update. `streak` is positive for consecutive wins, negative for losses.
+    """
+
+    def __init__(self):
+        for field in STATE_FIELDS:
+            setattr(self, field, 0)
+
+    def update(self, pnl):
+        pnl = float(pnl or 0)
+        self.trades += 1
+        self.total_pnl += pnl
+        if pnl > 0:
+            self.wins += 1
+            self.gross_profit += pnl
+            self.streak = self.streak + 1 if self.streak > 0 else 1
+            self.max_win_streak = max(self.max_win_streak, self.streak)
+        elif pnl < 0:
+            self.losses += 1
+            self.gross_loss -= pnl
+            self.streak = self.streak - 1 if self.streak < 0 else -1
+            self.max_loss_streak = max(self.max_loss_streak, -self.streak)
+        else:
+            self.streak = 0
+
+        delta = pnl - self.mean
+        self.mean += delta / self.trades
+        self.m2 += delta * (pnl - self.mean)
+
+        self.equity += pnl
+        self.peak = max(self.peak, self.equity)
+        self.max_drawdown = max(self.max_drawdown, self.peak - self.equity)
+
+    def extend(self, pnls):
+        for pnl in pnls:
+            self.update(pnl)
+        return self
+
+    @property
+    def win_rate(self):
+        return self.wins / self.trades * 100 if self.trades else 0.0
+
+    @property
+    def sharpe(self):
+        if self.trades < 2 or self.m2 <= 0:
+            return None
+        return self.mean / math.sqrt(self.m2 / (self.trades - 1))
+
+    @property
+    def profit_factor(self):
+        return self.gross_profit / self.gross_loss if self.gross_loss else None
+
+    def summary(self):
+        return {
+            "trades": self.trades,
+            "win_rate": round(self.win_rate, 2),
+            "total_pnl": round(self.total_pnl, 2),
+            "avg_pnl": round(self.mean, 2),
+            "max_drawdown": round(self.max_drawdown, 2),
+            "sharpe": None if self.sharpe is None else round(self.sharpe, 3),
+            "profit_factor": None if self.profit_factor is None else round(self.profit_factor, 3),
+            "streak": self.streak,
+            "max_win_streak": self.max_win_streak,
+            "max_loss_streak": self.max_loss_streak,
+        }
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in STATE_FIELDS}
+
+    @classmethod
+    def from_dict(cls, state):
+        stats = cls()
+        for field in STATE_FIELDS:
+            setattr(stats, field, state.get(field, 0))
+        return stats
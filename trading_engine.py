@@ -0,0 +1,256 @@
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+from clock import WallClock
+from metrics import latency_percentiles
+
+logger = logging.getLogger("TradingEngine")
+
+
+class TradingState:
+    """Per-day state the rules look at"""
+
+    def __init__(self, trade_date=None):
+        self.trades_today = 0
+        self.last_buy_price = None
+        self.trade_date = trade_date or datetime.now().date()
+        # Order submitted through an OrderManager and not resolved yet; no new signals until it is
+        self.pending_order = None
+
+    def roll(self, today):
+        """Reset the daily counters when the date changes"""
+        if today != self.trade_date:
+            self.trades_today = 0
+            self.last_buy_price = None
+            self.trade_date = today
+
+
+class Rule:
+    """
+    Base class for trading rules.
+    signal() proposes an order side ("BUY"/"SELL") for a price; allow() can veto a proposed side.
+    """
+
+    def signal(self, price, state):
+        return None
+
+    def allow(self, side, state):
+        return True
+
+
+class StopLossRule(Rule):
+    """Sell when price falls stop_loss_pct below the last buy price"""
+
+    def __init__(self, stop_loss_pct=0.02):
+        self.stop_loss_pct = stop_loss_pct
+
+    def signal(self, price, state):
+        if state.last_buy_price and price < state.last_buy_price * (1 - self.stop_loss_pct):
+            logger.info(f"Stop-loss triggered! Price {price} < {state.last_buy_price * (1 - self.stop_loss_pct)}.")
+            return "SELL"
+        return None
+
+
+class ThresholdEntryRule(Rule):
+    """Buy when price drops below price_threshold and no position is open"""
+
+    def __init__(self, price_threshold=2500):
+        self.price_threshold = price_threshold
+
+    def signal(self, price, state):
+        if state.last_buy_price is None and price < self.price_threshold:
+            return "BUY"
+        return None
+
+
+class MaxTradesPerDayRule(Rule):
+    """Block new entries once max_trades_per_day orders have been placed today (exits are always allowed)"""
+
+    def __init__(self, max_trades_per_day=5):
+        self.max_trades_per_day = max_trades_per_day
+
+    def allow(self, side, state):
+        if side == "BUY" and state.trades_today >= self.max_trades_per_day:
+            return False
+        return True
+
+
+def default_rules(price_threshold=2500, max_trades_per_day=5, stop_loss_pct=0.02):
+    """The rule set used by AngelOneAPI.start_automated_trading"""
+    return [
+        StopLossRule(stop_loss_pct),
+        MaxTradesPerDayRule(max_trades_per_day),
+        ThresholdEntryRule(price_threshold),
+    ]
+
+
+class TradingEngine:
+    """
+    Event-driven trading engine.
+    Every price update is evaluated against the rules as soon as it arrives; while no position
+    is open, updates that pile up are coalesced so entries are decided on the latest price.
+    With an OrderManager (orders=...), orders are submitted without blocking and the position
+    state follows the actual fills (average fill price) instead of the price that triggered them.
+    Time (daily rollover, latencies) comes from `clock`, a WallClock unless replaying history.
+    """
+
+    def __init__(self, api, rules, quantity=1, latency_window=10000, orders=None, clock=None):
+        self.api = api
+        self.rules = rules
+        self.quantity = quantity
+        self.instrument = api.reliance_token
+        self.clock = clock or WallClock()
+        self.state = TradingState(self.clock.today())
+        self.orders = orders
+        if orders is not None:
+            orders.add_listener(self.on_order)
+        # Tick arrival time of the pending order's trigger, for tick_to_ack
+        self._pending_received = None
+        self._state_lock = threading.Lock()
+
+        # Seconds from tick arrival to order submission, and to broker response
+        self.tick_to_order = deque(maxlen=latency_window)
+        self.tick_to_ack = deque(maxlen=latency_window)
+
+        self._queue = queue.Queue()
+        self._thread = None
+        self._running = False
+
+    def on_tick(self, token, price, exchange_time, received_time):
+        """MarketFeed listener: hand the tick to the engine thread"""
+        if token == self.instrument["token"]:
+            self._queue.put((price, received_time))
+
+    def submit_price(self, price, received_time=None):
+        """Push a price from any other source (e.g. polling) into the engine"""
+        self._queue.put((price, received_time or self.clock.time()))
+
+    @property
+    def is_running(self):
+        return self._running
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="TradingEngine", daemon=True)
+        self._thread.start()
+        logger.info("Trading engine started.")
+
+    def stop(self):
+        self._running = False
+        self._queue.put(None)
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=5)
+        logger.info(f"Trading engine stopped. Latency: {self.latency_report()}")
+
+    def _run(self):
+        while self._running:
+            item = self._queue.get()
+            # Flat, only the newest price matters, so drop anything that queued up behind it.
+            # With a position open every price is evaluated, so a stop-loss breach is never skipped.
+            while item is not None and self.state.last_buy_price is None:
+                try:
+                    newer = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                item = newer
+            if item is None:
+                break
+            try:
+                self.on_price(*item)
+            except Exception as e:
+                logger.error(f"Trading engine error: {str(e)}")
+
+    def on_price(self, price, received_time=None):
+        """Evaluate the rules for one price update and place an order if one fires"""
+        if received_time is None:
+            received_time = self.clock.time()
+        with self._state_lock:
+            self.state.roll(self.clock.today())
+            if self.state.pending_order is not None:
+                return None
+
+            for rule in self.rules:
+                side = rule.signal(price, self.state)
+                if side and all(r.allow(side, self.state) for r in self.rules):
+                    return self._execute(side, price, received_time)
+        return None
+
+    def _execute(self, side, price, received_time):
+        logger.info(f"Placing {side} order at {price}.")
+        order_params = dict(
+            variety="NORMAL",
+            tradingsymbol=self.instrument["symbol"],
+            symboltoken=self.instrument["token"],
+            transactiontype=side,
+            exchange=self.instrument["exchange"],
+            ordertype="MARKET",
+            producttype="INTRADAY",
+            duration="DAY",
+            quantity=self.quantity
+        )
+        self.tick_to_order.append(self.clock.time() - received_time)
+        if self.orders is not None:
+            self.state.pending_order = self.orders.submit(order_params)
+            self._pending_received = received_time
+            return self.state.pending_order
+
+        order_resp = self.api.place_order(**order_params)
+        self.tick_to_ack.append(self.clock.time() - received_time)
+
+        if side == "SELL":
+            self.state.last_buy_price = None
+            self.state.trades_today += 1
+        elif order_resp and order_resp.get("status"):
+            self.state.last_buy_price = price
+            self.state.trades_today += 1
+        return order_resp
+
+    def on_order(self, order):
+        """OrderManager listener: move the position state on from the pending order's fills"""
+        with self._state_lock:
+            if order is not self.state.pending_order:
+                return
+            if self._pending_received is not None and order.acked_at:
+                self.tick_to_ack.append(order.acked_at - self._pending_received)
+                self._pending_received = None
+            if not order.is_done:
+                return
+            self.state.pending_order = None
+            if not order.filled_quantity:
+                return
+            if order.side == "BUY":
+                self.state.last_buy_price = order.average_price
+                logger.info(f"Bought {order.filled_quantity} at average {order.average_price}.")
+            else:
+                self.state.last_buy_price = None
+            self.state.trades_today += 1
+
+    def latency_report(self):
+        """p50/p99/max tick-to-order and tick-to-ack latency in milliseconds"""
+        return {
+            "orders": len(self.tick_to_order),
+            "tick_to_order_ms": latency_percentiles(self.tick_to_order),
+            "tick_to_ack_ms": latency_percentiles(self.tick_to_ack),
+        }
+
+
+
+def run_polling(get_price, on_price, clock, interval, running):
+    """
+    Poll a price every `interval` seconds of `clock` and hand it to on_price(price, time).
+    start_automated_trading runs this on a WallClock when streaming is unavailable;
+    paper.simulate runs the same loop on a ReplayClock.
+    """
+    while running():
+        price = get_price()
+        if price is not None:
+            on_price(price, clock.time())
+        else:
+            logger.warning("Could not fetch Reliance price.")
+        clock.sleep(interval)